@@ -1,48 +1,70 @@
 # lfc_teens/admin.py
+from cloudinary.models import CloudinaryField
 from django.contrib import admin
+from .direct_upload import DirectUploadField
 from .models import *
 
+class DirectUploadAdmin(admin.ModelAdmin):
+    # Image fields upload straight from the browser to storage (app/direct_upload.py)
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if isinstance(db_field, CloudinaryField):
+            options = {key: value for key, value in db_field.options.items() if not callable(value)}
+            return db_field.formfield(form_class=DirectUploadField, options=options, **kwargs)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
 @admin.register(HeroSlide)
-class HeroSlideAdmin(admin.ModelAdmin):
+class HeroSlideAdmin(DirectUploadAdmin):
     list_display = ['title', 'is_active', 'created_at']
     list_filter = ['is_active']
     list_editable = ['is_active']
     search_fields = ['title', 'subtitle']
 
 @admin.register(Leader)
-class LeaderAdmin(admin.ModelAdmin):
+class LeaderAdmin(DirectUploadAdmin):
     list_display = ['name', 'position', 'order', 'is_active']
     list_editable = ['order', 'is_active']
     search_fields = ['name', 'position']
 
 @admin.register(BiblePost)
-class BiblePostAdmin(admin.ModelAdmin):
+class BiblePostAdmin(DirectUploadAdmin):
     list_display = ['scriptures', 'likes', 'created_at', 'is_active']
     list_editable = ['is_active']
     search_fields = ['scriptures', 'message']
+    # Saving a stale form value would overwrite concurrent likes or what
+    # compact_reviews folded in meanwhile
+    readonly_fields = ['likes', 'folded_likes']
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # A full-row save would write back the counters loaded with the form,
+        # undoing likes app/counters.py recorded since (list_editable too)
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name not in self.readonly_fields
+        ])
 @admin.register(Announcement)
-class AnnouncementAdmin(admin.ModelAdmin):
+class AnnouncementAdmin(DirectUploadAdmin):
     list_display = ['topic', 'date', 'is_active']
     list_editable = ['is_active']
     list_filter = ['date', 'is_active']
     search_fields = ['topic', 'announcement']
 
 @admin.register(Testimony)
-class TestimonyAdmin(admin.ModelAdmin):
+class TestimonyAdmin(DirectUploadAdmin):
     list_display = ['testifier', 'topic', 'date', 'is_approved']
     list_editable = ['is_approved']
     list_filter = ['is_approved', 'date']
     search_fields = ['testifier', 'topic', 'testimony']
 
 @admin.register(MinistryUnit)
-class MinistryUnitAdmin(admin.ModelAdmin):
+class MinistryUnitAdmin(DirectUploadAdmin):
     list_display = ['name', 'leader', 'leader_whatsapp', 'order', 'is_active']
     list_editable = ['order', 'is_active']
     search_fields = ['name', 'leader', 'duty']
 
 @admin.register(Belief)
-class BeliefAdmin(admin.ModelAdmin):
+class BeliefAdmin(DirectUploadAdmin):
     list_display = ['name', 'order', 'is_active']
     list_editable = ['order', 'is_active']
     search_fields = ['name', 'detail']
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from django.conf import settings
+        from .ratelimit import check_shared_cache
+        from .signals import connect_content_signals
+        connect_content_signals()
+        check_shared_cache()
+        if settings.CLOUDINARY_FAKE:
+            from .fake_cloudinary import install
+            install()
+        elif settings.IMAGE_BACKEND == 'cloudinary':
+            # Configured here rather than in settings: the models' CloudinaryField
+            # has imported the SDK by now, so this costs nothing extra
+            import cloudinary
+            storage = settings.CLOUDINARY_STORAGE
+            cloudinary.config(
+                cloud_name=storage['CLOUD_NAME'], api_key=storage['API_KEY'],
+                api_secret=storage['API_SECRET'], secure=True,
+            )
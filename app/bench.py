@@ -0,0 +1,70 @@
+# app/bench.py
+# Small timing helpers shared by the bench_* management commands
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+# Benchmarks fill and clear the cache; a configured Redis may be shared
+# with the running site
+SCRATCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'}}
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'runs': len(ordered),
+        'total_s': total,
+        'per_sec': len(ordered) / total if total else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+    }
+
+
+def time_calls(fn, runs, warmup=3):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def bench_client():
+    # Client defaults to the 'testserver' host, which ALLOWED_HOSTS rejects
+    # outside the test runner
+    return Client(HTTP_HOST='localhost')
+
+
+def format_row(label, stats):
+    return (
+        f"{label:<28} {stats['per_sec']:>10.1f}/s "
+        f"p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms"
+    )
+
+
+@contextmanager
+def scratch_database():
+    """
+    Point the default connection at a freshly migrated throwaway database,
+    and the default cache at a private in-memory one, so write benchmarks
+    never touch the real ones.
+    """
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=SCRATCH_CACHES):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
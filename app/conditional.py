@@ -0,0 +1,94 @@
+# app/conditional.py
+"""
+HTTP validators for the home page and its fragments.
+
+One UNION query reads MAX(updated_at) of every content model, each answered
+from its updated_at index, plus the HomeSnapshot row. Deletions leave no
+updated_at behind, but every content change bumps HomeSnapshot.generation
+in its own transaction (app/snapshot.py) and a rebuild moves built_at, so
+the generation carries them into the ETag and built_at into Last-Modified.
+With the page cache on, the result is cached per content and likes
+version, so a revalidation costs no queries.
+django.views.decorators.http.condition checks the validators before the
+view body runs.
+"""
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BigIntegerField, CharField, Max, Value
+from django.views.decorators.http import condition
+
+from .models import (
+    Announcement, Belief, BiblePost, ContactInfo, HeroSlide, HomeSnapshot, Leader, MinistryUnit, Testimony,
+)
+from .page_cache import get_likes_version, page_cache_key
+from .snapshot import SNAPSHOT_PK
+
+CONTENT_MODELS = [HeroSlide, Leader, BiblePost, Announcement, Testimony, MinistryUnit, Belief, ContactInfo]
+
+
+def _latest(queryset, field, generation):
+    label = Value(queryset.model._meta.label_lower, output_field=CharField())
+    return (
+        queryset.order_by().annotate(model=label).values('model')
+        .annotate(last=Max(field), generation=generation).values_list('model', 'last', 'generation')
+    )
+
+
+def content_changes():
+    """[(model label, last changed, snapshot generation)] for every content model, in one query."""
+    untracked = Value(0, output_field=BigIntegerField())
+    parts = [_latest(model.objects.all(), 'updated_at', untracked) for model in CONTENT_MODELS]
+    snapshot = _latest(HomeSnapshot.objects.filter(pk=SNAPSHOT_PK), 'built_at', Max('generation'))
+    return list(parts[0].union(*parts[1:], snapshot, all=True))
+
+
+@lru_cache(maxsize=None)
+def template_version():
+    # A deploy that changes the markup must not be answered with 304
+    digest = hashlib.sha256()
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(Path(directory).rglob('*.html')):
+            stat = path.stat()
+            digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def compute_validators():
+    changes = content_changes()
+    digest = hashlib.sha256(template_version().encode())
+    for label, last, generation in sorted(changes):
+        digest.update(f'{label}:{last and last.isoformat()}:{generation}'.encode())
+    last_modified = max((last for _, last, _ in changes if last), default=None)
+    return digest.hexdigest()[:32], last_modified
+
+
+def validators(request):
+    """(etag, last_modified) for the current content, computed once per request."""
+    if not hasattr(request, '_content_validators'):
+        if not settings.PAGE_CACHE_ENABLED:
+            request._content_validators = compute_validators()
+            return request._content_validators
+        # Likes move BiblePost.updated_at without bumping the content version
+        key = f"{page_cache_key('validators')}:{get_likes_version()}"
+        result = cache.get(key)
+        if result is None:
+            result = compute_validators()
+            cache.set(key, result, settings.PAGE_CACHE_TIMEOUT)
+        request._content_validators = result
+    return request._content_validators
+
+
+def content_etag(request, *args, **kwargs):
+    return validators(request)[0]
+
+
+def content_last_modified(request, *args, **kwargs):
+    return validators(request)[1]
+
+
+# Answers If-None-Match / If-Modified-Since with 304 before the view runs
+content_conditional = condition(etag_func=content_etag, last_modified_func=content_last_modified)
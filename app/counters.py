@@ -0,0 +1,106 @@
+# app/counters.py
+# BiblePost.likes is the single like counter. It is only ever changed with
+# atomic F() updates touching that one column, never with a full-row save().
+# It equals the post's Review rows plus folded_likes, the likes whose rows
+# compact_reviews() has dropped; their reviewers are kept in FoldedReviews.
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .like_filter import filter_key, remember_like
+from .models import BiblePost, FoldedReviews, Review, reviewer_digest
+from .page_cache import bump_likes_version
+
+
+def increment_likes(post_id, amount=1):
+    updated = BiblePost.objects.filter(pk=post_id).update(likes=F('likes') + amount, updated_at=timezone.now())
+    # queryset.update() skips post_save. Cached pages keep their HTML and
+    # only re-read the like counts
+    bump_likes_version()
+    return updated
+
+
+def get_likes(post_id):
+    return BiblePost.objects.filter(pk=post_id).values_list('likes', flat=True).first() or 0
+
+
+def record_like(post_id, reviewer_id):
+    """
+    Store a Review and bump the counter in one transaction. Returns False if
+    this reviewer had already liked the post.
+    """
+    digest = reviewer_digest(reviewer_id)
+    try:
+        with transaction.atomic():
+            Review.objects.create(bible_post_id=post_id, reviewer=digest)
+            increment_likes(post_id)
+            # Checked under the post's row lock, which compact_reviews() holds
+            # while it moves Review rows into FoldedReviews
+            folded = FoldedReviews.objects.filter(bible_post_id=post_id).first()
+            if folded is not None and digest in folded:
+                transaction.set_rollback(True)
+                return False
+    except IntegrityError:
+        return False
+    remember_like(post_id, reviewer_id)
+    return True
+
+
+def review_counts():
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(bible_post=OuterRef('pk'))
+            .order_by()
+            .values('bible_post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        Value(0),
+    )
+
+
+def drifted_posts():
+    """Posts whose counter disagrees with their Review rows and folded likes."""
+    return (
+        BiblePost.objects.annotate(counted=review_counts() + F('folded_likes'))
+        .exclude(likes=F('counted'))
+        .values_list('pk', 'likes', 'counted')
+    )
+
+
+def reconcile_likes():
+    """Recompute every counter from the Review table and folded likes in a single UPDATE."""
+    updated = BiblePost.objects.update(likes=review_counts() + F('folded_likes'), updated_at=timezone.now())
+    bump_likes_version()
+    return updated
+
+
+def compact_reviews(before):
+    """
+    Fold the Review rows of posts created before `before` into
+    BiblePost.folded_likes and delete them, one transaction per post. The
+    like counter is unchanged and the reviewers move into the post's
+    FoldedReviews, so repeat likes are still rejected. Returns
+    (posts, rows folded).
+    """
+    post_ids = list(
+        BiblePost.objects.filter(created_at__lt=before, post_reviews__isnull=False)
+        .order_by('pk').distinct().values_list('pk', flat=True)
+    )
+    folded = 0
+    for post_id in post_ids:
+        with transaction.atomic():
+            # Likes take this lock before checking FoldedReviews
+            BiblePost.objects.select_for_update().only('pk').get(pk=post_id)
+            reviews = Review.objects.filter(bible_post_id=post_id)
+            digests = list(reviews.values_list('reviewer', flat=True))
+            reviews.delete()
+            reviewers, _ = FoldedReviews.objects.get_or_create(bible_post_id=post_id)
+            reviewers.add(digests)
+            reviewers.save()
+            BiblePost.objects.filter(pk=post_id).update(folded_likes=F('folded_likes') + len(digests))
+        cache.delete(filter_key(post_id))
+        folded += len(digests)
+    return len(post_ids), folded
@@ -0,0 +1,120 @@
+# app/derivatives.py
+"""
+Resized/WebP derivatives for self-hosted images (IMAGE_BACKEND = 'local').
+
+Without Cloudinary there is nobody to resize images on the fly, so the first
+request for a width renders it with Pillow. Derivatives live under
+DERIVATIVE_ROOT keyed by the source's content hash and are evicted least
+recently used first once the directory grows past DERIVATIVE_CACHE_MAX_BYTES.
+"""
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+from .images import IMAGE_SLOTS
+
+FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpg': ('JPEG', 'image/jpeg')}
+
+_lock = threading.Lock()
+
+
+def allowed_widths():
+    return {width for slot in IMAGE_SLOTS.values() for width in slot['widths']}
+
+
+def source_path(name):
+    """Resolve a stored image name inside MEDIA_ROOT, or None."""
+    root = Path(settings.MEDIA_ROOT).resolve()
+    path = (root / name).resolve()
+    if root not in path.parents:
+        return None
+    if path.is_file():
+        return path
+    # CloudinaryField values usually omit the extension
+    return next((p for p in sorted(path.parent.glob(path.name + '.*')) if p.is_file()), None)
+
+
+@lru_cache(maxsize=1024)
+def _file_hash(path, mtime_ns, size):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def content_hash(path):
+    # Keyed on mtime and size, so an edited file is hashed again
+    stat = path.stat()
+    return _file_hash(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def derivative_path(digest, width, ext):
+    return Path(settings.DERIVATIVE_ROOT) / digest[:2] / f'{digest}-{width}.{ext}'
+
+
+def render_derivative(source, target, width, ext):
+    """Render source into target. Returns False when source is not an image."""
+    # Pillow is only needed for self-hosted images, so Cloudinary deployments
+    # never pay for importing it at worker boot
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        opened = Image.open(source)
+    except UnidentifiedImageError:
+        return False
+    with opened as image:
+        image = ImageOps.exif_transpose(image)
+        # Like Cloudinary's c_limit: shrink to fit, never upscale
+        image.thumbnail((width, width * 10))
+        pil_format = FORMATS[ext][0]
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f'{target.name}.{os.getpid()}.tmp')
+        if pil_format == 'WEBP':
+            image.save(tmp, pil_format, quality=80, method=4)
+        else:
+            image.save(tmp, pil_format, quality=82, optimize=True, progressive=True)
+        os.replace(tmp, target)
+    return True
+
+
+def get_derivative(name, width, ext):
+    """
+    Path to the derivative of image `name` at `width`, rendering it on first
+    use. Returns None when the source does not exist or is not an image.
+    """
+    source = source_path(name)
+    if source is None:
+        return None
+    target = derivative_path(content_hash(source), width, ext)
+    if target.exists():
+        # Touch so eviction sees this derivative as recently used
+        os.utime(target)
+        return target
+    with _lock:
+        if not target.exists():
+            if not render_derivative(source, target, width, ext):
+                return None
+            evict(settings.DERIVATIVE_CACHE_MAX_BYTES, keep=target)
+    return target
+
+
+def evict(max_bytes, keep=None):
+    """Delete least recently used derivatives until the cache fits max_bytes."""
+    root = Path(settings.DERIVATIVE_ROOT)
+    if not root.exists():
+        return 0
+    files = [(p.stat().st_mtime, p.stat().st_size, p) for p in root.glob('*/*') if p.is_file()]
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
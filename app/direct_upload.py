@@ -0,0 +1,153 @@
+# app/direct_upload.py
+"""
+Direct-to-storage uploads for the admin's image fields.
+
+Image bytes never pass through Django: every CloudinaryField in the admin is
+rendered as a file picker carrying upload parameters the server has signed
+(folder and timestamp), and static/direct_upload.js sends the chosen file
+straight to the upload URL. What comes back is written to a hidden input as
+"image/upload/v<version>/<public id>.<format>#<signature>", and the form
+only accepts it if the signature checks out, so a public ID can only come
+from a real upload or be the value the form was rendered with.
+
+With IMAGE_BACKEND = 'local' the upload URL is the local_upload view, a
+stand-in for Cloudinary's upload API that checks the same signatures
+(keyed by SECRET_KEY), writes the file into MEDIA_ROOT and answers in
+Cloudinary's format.
+"""
+import json
+import re
+import time
+
+import cloudinary
+import cloudinary.utils
+from cloudinary import CloudinaryResource
+from cloudinary.models import CLOUDINARY_FIELD_DB_RE
+from django import forms
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.utils.html import format_html
+
+from .images import image_url
+
+# Never part of the string Cloudinary signs
+UNSIGNED_PARAMS = {'file', 'api_key', 'signature', 'resource_type', 'cloud_name'}
+
+
+def credentials():
+    """(api_key, api_secret, signature algorithm) for the current IMAGE_BACKEND."""
+    if settings.IMAGE_BACKEND == 'local':
+        return 'local', settings.SECRET_KEY, cloudinary.utils.SIGNATURE_SHA256
+    config = cloudinary.config()
+    return config.api_key, config.api_secret, config.signature_algorithm
+
+
+def sign(params):
+    _, secret, algorithm = credentials()
+    return cloudinary.utils.api_sign_request(params, secret, algorithm)
+
+
+def upload_url(resource_type='image'):
+    if settings.IMAGE_BACKEND == 'local':
+        return reverse('local_upload')
+    return cloudinary.utils.cloudinary_api_url('upload', resource_type=resource_type)
+
+
+def upload_params(options):
+    """Signed form fields to post along with the file."""
+    params = cloudinary.utils.cleanup_params({**options, 'timestamp': int(time.time())})
+    params['signature'] = sign(params)
+    params['api_key'] = credentials()[0]
+    return params
+
+
+def valid_upload(params):
+    """True when params (an upload request) carry our signature and have not expired."""
+    signed = {key: value for key, value in params.items() if key not in UNSIGNED_PARAMS}
+    timestamp = str(signed.get('timestamp', ''))
+    return (
+        timestamp.isdigit()
+        and abs(time.time() - int(timestamp)) <= settings.DIRECT_UPLOAD_MAX_AGE
+        and params.get('api_key') == credentials()[0]
+        and constant_time_compare(params.get('signature', ''), sign(signed))
+    )
+
+
+def resource_signature(resource):
+    # What Cloudinary returns as an upload's "signature"
+    return sign({'public_id': resource.public_id, 'version': resource.version})
+
+
+def signed_value(resource):
+    return f'{resource.get_prep_value()}#{resource_signature(resource)}'
+
+
+def stored_value(value):
+    if isinstance(value, CloudinaryResource):
+        return value.get_prep_value()
+    return value or ''
+
+
+class DirectUploadInput(forms.Widget):
+    def __init__(self, attrs=None, options=None):
+        super().__init__(attrs)
+        self.options = options or {}
+
+    class Media:
+        js = ['direct_upload.js']
+
+    def format_value(self, value):
+        if isinstance(value, CloudinaryResource):
+            return signed_value(value)
+        return value or ''
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        resource_type = self.options.get('resource_type', 'image')
+        params = {key: value for key, value in self.options.items() if key != 'resource_type'}
+        preview = image_url(value, 96) if isinstance(value, CloudinaryResource) else ''
+        return format_html(
+            '<div class="direct-upload">'
+            '<img class="direct-upload-preview" src="{}" alt="" width="96"{}>'
+            '<input type="hidden" name="{}" id="{}" value="{}">'
+            '<input type="file" accept="image/*" data-direct-upload="{}" data-url="{}" data-params="{}">'
+            '<span class="direct-upload-status"></span>'
+            '</div>',
+            preview, '' if preview else format_html(' hidden'), name, attrs.get('id', ''),
+            self.format_value(value), name, upload_url(resource_type), json.dumps(upload_params(params)),
+        )
+
+
+class DirectUploadField(forms.Field):
+    """
+    Form field for a CloudinaryField whose file has already been uploaded by
+    the browser. Cleans to the CloudinaryResource the upload created.
+    """
+    default_error_messages = {
+        'invalid': 'The upload could not be verified. Please choose the file again.',
+    }
+
+    def __init__(self, options=None, autosave=False, **kwargs):
+        kwargs.setdefault('widget', DirectUploadInput(options=options))
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if isinstance(value, CloudinaryResource) or not value:
+            return value or None
+        stored, _, signature = value.partition('#')
+        match = re.match(CLOUDINARY_FIELD_DB_RE, stored)
+        resource = CloudinaryResource(
+            match['public_id'], format=match['format'], version=match['version'], signature=signature,
+            type=match['type'] or 'upload', resource_type=match['resource_type'] or 'image',
+        )
+        if not resource.public_id or not constant_time_compare(signature, resource_signature(resource)):
+            raise forms.ValidationError(self.error_messages['invalid'], code='invalid')
+        return resource
+
+    def has_changed(self, initial, data):
+        try:
+            data = self.to_python(data)
+        except forms.ValidationError:
+            return True
+        return stored_value(initial) != stored_value(data)
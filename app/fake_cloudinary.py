@@ -0,0 +1,300 @@
+# app/fake_cloudinary.py
+"""
+Offline stand-in for Cloudinary (CLOUDINARY_FAKE = True), so tests and
+benchmarks can run the Cloudinary code paths without the network.
+
+install() points the SDK at a fake cloud. Requests from cloudinary.uploader
+(upload, destroy) are answered in-process by FakeTransport. It checks the
+request signature the way the real API does, keeps the bytes under
+CLOUDINARY_FAKE_ROOT, and answers with Cloudinary-shaped JSON: random
+20-character public IDs and second-resolution versions. Browser uploads
+(app/direct_upload.py) reach the same handler through the
+fake_cloudinary_api view.
+
+Delivery URLs point at the fake_cloudinary_asset view. It serves the stored
+original, or a resized/WebP variant for the w_ and f_auto transformations
+the site asks for. FakeCloudinaryStorage is the matching storage for
+STORAGES['default'].
+
+CLOUDINARY_FAKE_UPLOAD_LATENCY and CLOUDINARY_FAKE_URL_LATENCY add a fixed
+delay to every upload and to every built URL. Performance tests use them
+to model a slow Cloudinary deterministically.
+"""
+import glob
+import json
+import re
+import secrets
+import string
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+import cloudinary.utils
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import constant_time_compare
+from PIL import Image
+
+from .derivatives import FORMATS, render_derivative
+
+CLOUD_NAME = 'fake'
+API_KEY = 'fake-key'
+API_SECRET = 'fake-secret'
+PUBLIC_ID_ALPHABET = string.ascii_lowercase + string.digits
+DELIVERY_PREFIX = f'https://res.cloudinary.com/{CLOUD_NAME}/'
+# The only resource and delivery types Cloudinary has; both become directories
+RESOURCE_TYPES = ('image', 'raw', 'video')
+UPLOAD_TYPES = ('upload', 'private', 'authenticated')
+
+_original_build_url = cloudinary.CloudinaryResource.build_url
+_saved = None
+
+
+def delay(seconds):
+    # time.sleep(0) still yields the GIL, which would skew URL timings
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def root():
+    return Path(settings.CLOUDINARY_FAKE_ROOT)
+
+
+def asset_dir(resource_type='image', upload_type='upload'):
+    """Where assets of this type are kept, or None for a type Cloudinary does not have."""
+    if resource_type not in RESOURCE_TYPES or upload_type not in UPLOAD_TYPES:
+        return None
+    return root() / resource_type / upload_type
+
+
+def asset_path(resource_type, upload_type, name):
+    """asset_dir()/name resolved, or None if it would leave the fake cloud's root."""
+    base = asset_dir(resource_type, upload_type)
+    if base is None or not name:
+        return None
+    path = (base / name).resolve()
+    if root().resolve() / resource_type / upload_type not in path.parents:
+        return None
+    return path
+
+
+def find_asset(resource_type, upload_type, public_id):
+    """The stored original for public_id, whatever its extension, or None."""
+    path = asset_path(resource_type, upload_type, public_id)
+    if path is None:
+        return None
+    return next((p for p in sorted(path.parent.glob(glob.escape(path.name) + '.*')) if p.is_file()), None)
+
+
+class APIError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def check_signature(params):
+    signed = {key: value for key, value in params.items() if key not in {'signature', 'api_key', 'resource_type'}}
+    if params.get('api_key') != API_KEY:
+        raise APIError('Invalid api_key', 401)
+    expected = cloudinary.utils.api_sign_request(signed, API_SECRET, cloudinary.config().signature_algorithm)
+    if not constant_time_compare(str(params.get('signature', '')), expected):
+        raise APIError('Invalid Signature', 401)
+
+
+def upload(params, filename, data, resource_type='image'):
+    """Store an upload; returns Cloudinary's response for it."""
+    delay(settings.CLOUDINARY_FAKE_UPLOAD_LATENCY)
+    if not data:
+        raise APIError('Missing required parameter - file')
+    try:
+        with Image.open(BytesIO(data)) as image:
+            width, height = image.size
+            fmt = 'jpg' if image.format == 'JPEG' else image.format.lower()
+    except Exception:
+        raise APIError('Invalid image file')
+
+    upload_type = params.get('type') or 'upload'
+    public_id = params.get('public_id') or ''.join(secrets.choice(PUBLIC_ID_ALPHABET) for _ in range(20))
+    if params.get('folder') and not params.get('public_id'):
+        public_id = f"{params['folder'].strip('/')}/{public_id}"
+    if asset_dir(resource_type, upload_type) is None:
+        raise APIError('Invalid resource_type or type')
+    path = asset_path(resource_type, upload_type, f'{public_id}.{fmt}')
+    if path is None:
+        raise APIError('Invalid public_id or folder')
+    previous = find_asset(resource_type, upload_type, public_id)
+    if previous:
+        previous.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+    version = int(time.time())
+    url = f'{settings.CLOUDINARY_FAKE_URL}{resource_type}/{upload_type}/v{version}/{public_id}.{fmt}'
+    return {
+        'asset_id': secrets.token_hex(16),
+        'public_id': public_id,
+        'version': version,
+        'signature': cloudinary.utils.api_sign_request(
+            {'public_id': public_id, 'version': version}, API_SECRET, cloudinary.config().signature_algorithm,
+        ),
+        'width': width,
+        'height': height,
+        'format': fmt,
+        'resource_type': resource_type,
+        'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'bytes': len(data),
+        'type': upload_type,
+        'url': url,
+        'secure_url': url,
+        'original_filename': Path(filename or 'file').stem,
+    }
+
+
+def destroy(params, resource_type='image'):
+    path = find_asset(resource_type, params.get('type') or 'upload', params.get('public_id', ''))
+    if path is None:
+        return {'result': 'not found'}
+    path.unlink()
+    return {'result': 'ok'}
+
+
+def handle(action, resource_type, params, filename=None, data=None):
+    """Answer one upload API call. Returns (status, response dict)."""
+    try:
+        if action not in ('upload', 'destroy'):
+            raise APIError(f'{action} is not supported by the fake cloud', 404)
+        check_signature(params)
+        if action == 'upload':
+            return 200, upload(params, filename, data, resource_type)
+        return 200, destroy(params, resource_type)
+    except APIError as exc:
+        return exc.status, {'error': {'message': str(exc)}}
+
+
+class FakeResponse:
+    def __init__(self, status, result):
+        self.status = status
+        self.data = json.dumps(result).encode()
+
+
+class FakeTransport:
+    """Takes the place of the SDK's urllib3 pool: same request(), no network."""
+
+    def request(self, method, url, fields=None, headers=None, **kwargs):
+        # .../v1_1/<cloud>/<resource_type>/<action>
+        resource_type, action = url.rstrip('/').split('/')[-2:]
+        params = {}
+        filename = data = None
+        for key, value in fields or []:
+            if key == 'file':
+                filename, data = value if isinstance(value, tuple) else ('file', value)
+            elif key.endswith('[]'):
+                params.setdefault(key[:-2], []).append(value)
+            else:
+                params[key] = value
+        return FakeResponse(*handle(action, resource_type, params, filename, data))
+
+
+def build_url(resource, **options):
+    delay(settings.CLOUDINARY_FAKE_URL_LATENCY)
+    url = _original_build_url(resource, **options)
+    if url and url.startswith(DELIVERY_PREFIX):
+        return settings.CLOUDINARY_FAKE_URL + url[len(DELIVERY_PREFIX):]
+    return url
+
+
+def install():
+    """Point the cloudinary SDK at the fake cloud until uninstall()."""
+    global _saved
+    if _saved is not None:
+        return
+    config = cloudinary.config()
+    _saved = (dict(vars(config)), cloudinary.uploader._http)
+    cloudinary.config(
+        cloud_name=CLOUD_NAME, api_key=API_KEY, api_secret=API_SECRET, secure=True,
+        upload_prefix=settings.CLOUDINARY_FAKE_URL.rstrip('/'),
+    )
+    cloudinary.uploader._http = FakeTransport()
+    cloudinary.CloudinaryResource.build_url = build_url
+
+
+def uninstall():
+    global _saved
+    if _saved is None:
+        return
+    config_vars, http = _saved
+    config = cloudinary.config()
+    vars(config).clear()
+    vars(config).update(config_vars)
+    cloudinary.uploader._http = http
+    cloudinary.CloudinaryResource.build_url = _original_build_url
+    _saved = None
+
+
+@contextmanager
+def fake_cloud():
+    installed = _saved is not None
+    install()
+    try:
+        yield
+    finally:
+        if not installed:
+            uninstall()
+
+
+def parse_transformation(segment):
+    """{'w': '480', 'f': 'auto', ...} for a segment like c_limit,f_auto,w_480, or None."""
+    parts = segment.split(',')
+    if not all(re.fullmatch(r'[a-z]{1,3}_[^,/]+', part) for part in parts):
+        return None
+    return dict(part.split('_', 1) for part in parts)
+
+
+def variant(resource_type, upload_type, path, accepts_webp):
+    """
+    (file, extension) to serve for a delivery path of the form
+    [<transformation>/][v<version>/]<public id>[.<format>], or None.
+    """
+    segments = path.split('/')
+    transformation = (parse_transformation(segments[0]) if len(segments) > 1 else None) or {}
+    if transformation:
+        segments = segments[1:]
+    if len(segments) > 1 and re.fullmatch(r'v\d+', segments[0]):
+        segments = segments[1:]
+    public_id, _, ext = '/'.join(segments).rpartition('.')
+    if not public_id:
+        public_id, ext = ext, ''
+    source = find_asset(resource_type, upload_type, public_id)
+    if source is None:
+        return None
+
+    ext = ext or source.suffix[1:]
+    if transformation.get('f') == 'auto':
+        ext = 'webp' if accepts_webp else 'jpg'
+    width = int(transformation['w']) if transformation.get('w', '').isdigit() else None
+    if width is None and ext == source.suffix[1:]:
+        return source, ext
+    if ext not in FORMATS:
+        ext = 'jpg'
+    target = root() / 'variants' / resource_type / upload_type / public_id / f'{width or "full"}.{ext}'
+    if not target.exists() or target.stat().st_mtime < source.stat().st_mtime:
+        # c_limit never upscales, so an unbounded width keeps the original size
+        render_derivative(source, target, width or 100_000, ext)
+    return target, ext
+
+
+class FakeCloudinaryStorage(FileSystemStorage):
+    """MediaCloudinaryStorage's offline counterpart: files land in the fake cloud."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('location', asset_dir() / 'media')
+        kwargs.setdefault('base_url', settings.CLOUDINARY_FAKE_URL + 'image/upload/media/')
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        delay(settings.CLOUDINARY_FAKE_UPLOAD_LATENCY)
+        return super()._save(name, content)
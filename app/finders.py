@@ -0,0 +1,29 @@
+# app/finders.py
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+from .tailwind import TAILWIND_CSS_PATH, output_path, write_css
+
+
+class TailwindFinder(BaseFinder):
+    """
+    Serves the purged Tailwind stylesheet as a static file. Listing files
+    (which collectstatic does) rebuilds it first, so the compiled CSS is
+    fingerprinted by the manifest storage like any other asset.
+    """
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        if path != TAILWIND_CSS_PATH:
+            return [] if find_all else None
+        css_path = output_path()
+        if not css_path.exists():
+            write_css()
+        return [str(css_path)] if find_all else str(css_path)
+
+    def list(self, ignore_patterns):
+        write_css()
+        yield TAILWIND_CSS_PATH, FileSystemStorage(location=str(settings.TAILWIND_BUILD_DIR))
@@ -0,0 +1,24 @@
+# app/forms.py
+from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+
+from .models import Testimony
+
+
+class TestimonyForm(forms.ModelForm):
+    # Uploaded to the image field in the background (app/uploads.py), so
+    # it is a plain file here rather than the model's CloudinaryField
+    photo = forms.ImageField(required=False)
+
+    class Meta:
+        model = Testimony
+        fields = ['testifier', 'topic', 'testimony']
+
+    def clean_photo(self):
+        photo = self.cleaned_data.get('photo')
+        if photo and photo.size > settings.TESTIMONY_PHOTO_MAX_BYTES:
+            raise forms.ValidationError(
+                f'Please choose a photo under {filesizeformat(settings.TESTIMONY_PHOTO_MAX_BYTES)}.'
+            )
+        return photo
@@ -0,0 +1,158 @@
+# app/images.py
+# Responsive image URLs for CloudinaryField values: width-bounded, with
+# automatic format (WebP/AVIF where supported) and automatic quality.
+# Self-hosted deployments (IMAGE_BACKEND = 'local') get the same URLs served
+# by app.views.image_derivative instead.
+#
+# Built URLs are memoized in a process-wide LRU (IMAGE_URL_CACHE_SIZE
+# entries, 0 = off) keyed by backend, public ID, version, format and width.
+# The key covers everything the URL is built from, so a replaced image can
+# never be served a stale URL; saving or deleting a model drops its entries
+# early (app/signals.py) rather than waiting for them to age out.
+import threading
+from collections import OrderedDict
+
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.urls import reverse
+
+DELIVERY_OPTIONS = {'crop': 'limit', 'fetch_format': 'auto', 'quality': 'auto', 'secure': True}
+
+# Every image slot in index.html, keyed by layout. 'sizes' mirrors the
+# Tailwind grid the slot sits in.
+IMAGE_SLOTS = {
+    'card': {
+        'widths': [320, 480, 720, 960, 1280],
+        'sizes': '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw',
+    },
+    'avatar': {'widths': [48, 96, 144], 'sizes': '48px'},
+    'hero': {'widths': [640, 1280, 1920], 'sizes': '100vw'},
+}
+
+
+class ResolvedImage:
+    """An image whose delivery URLs were built ahead of time (app/snapshot.py)."""
+
+    def __init__(self, resource, urls):
+        self.resource = resource
+        self.urls = urls
+
+    def __str__(self):
+        return str(self.resource)
+
+
+def resolve_image(image, slot):
+    """Every URL `slot` can ask for, keyed by width (None = original)."""
+    widths = [None, *IMAGE_SLOTS[slot]['widths']]
+    return ResolvedImage(as_resource(image), {width: image_url(image, width) for width in widths})
+
+
+def as_resource(image):
+    if isinstance(image, ResolvedImage):
+        return image.resource
+    if isinstance(image, CloudinaryResource):
+        return image
+    if isinstance(image, str) and image:
+        return CloudinaryResource(image)
+    return None
+
+
+def stored_name(resource):
+    return f'{resource.public_id}.{resource.format}' if resource.format else resource.public_id
+
+
+class URLCache:
+    def __init__(self):
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            url = self._urls.get(key)
+            if url is not None:
+                self._urls.move_to_end(key)
+                return url
+        url = build()
+        with self._lock:
+            self._urls[key] = url
+            while len(self._urls) > settings.IMAGE_URL_CACHE_SIZE:
+                self._urls.popitem(last=False)
+        return url
+
+    def forget(self, public_id):
+        with self._lock:
+            for key in [key for key in self._urls if key[1] == public_id]:
+                del self._urls[key]
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+    def __len__(self):
+        return len(self._urls)
+
+
+url_cache = URLCache()
+
+
+def forget_image(image):
+    resource = as_resource(image)
+    if resource:
+        url_cache.forget(resource.public_id)
+
+
+def local_image_url(resource, width=None):
+    if not width:
+        return settings.MEDIA_URL + stored_name(resource)
+    return reverse('image_derivative', kwargs={'width': int(width), 'name': stored_name(resource)})
+
+
+def image_url(image, width=None):
+    if isinstance(image, ResolvedImage) and width in image.urls:
+        return image.urls[width]
+    resource = as_resource(image)
+    if not resource:
+        return ''
+    width = int(width) if width else None
+    if settings.IMAGE_URL_CACHE_SIZE <= 0:
+        return build_url(resource, width)
+    key = (
+        settings.IMAGE_BACKEND, resource.public_id, resource.version, resource.format,
+        resource.type, resource.resource_type, width,
+    )
+    return url_cache.get_or_build(key, lambda: build_url(resource, width))
+
+
+def build_url(resource, width=None):
+    if settings.IMAGE_BACKEND == 'local':
+        return local_image_url(resource, width)
+    options = dict(DELIVERY_OPTIONS)
+    if width:
+        options['width'] = int(width)
+    return resource.build_url(**options)
+
+
+def image_srcset(image, slot):
+    return ', '.join(f'{image_url(image, width)} {width}w' for width in IMAGE_SLOTS[slot]['widths'])
+
+
+def pick_width(slot, css_width, dpr=1):
+    """The srcset candidate a browser picks for a slot rendered css_width px wide."""
+    widths = IMAGE_SLOTS[slot]['widths']
+    return next((w for w in widths if w >= css_width * dpr), widths[-1])
+
+
+def background_css(selector, image, slot, overlay=''):
+    """
+    CSS for a full-bleed background: the smallest variant by default, larger
+    ones behind min-width media queries so phones never fetch desktop sizes.
+    """
+    widths = IMAGE_SLOTS[slot]['widths']
+    layers = f'{overlay}, ' if overlay else ''
+    rules = [f'{selector} {{ background: {layers}url("{image_url(image, widths[0])}") center/cover; }}']
+    for smaller, width in zip(widths, widths[1:]):
+        rules.append(
+            f'@media (min-width: {smaller + 1}px) {{ {selector} {{ '
+            f'background-image: {layers}url("{image_url(image, width)}"); }} }}'
+        )
+    return '\n'.join(rules)
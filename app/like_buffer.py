@@ -0,0 +1,190 @@
+# app/like_buffer.py
+"""
+Write-behind buffering for likes (LIKES_WRITE_BEHIND = True).
+
+add_like appends each like to an on-disk journal instead of writing to the
+database. The journal is periodically rotated and flushed in one
+transaction with one counter UPDATE per post, so a burst of likes costs a
+handful of write transactions instead of three per click. Counters only
+grow by the Review rows the flush actually inserted: a like that a
+synchronous record_like() stored meanwhile is skipped, not counted twice.
+A journal left behind by a killed worker is picked up by the next flush.
+"""
+import fcntl
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+
+from .counters import increment_likes
+from .like_filter import maybe_liked, remember_like
+from .models import BiblePost, FoldedReviews, Review, reviewer_digest
+
+logger = logging.getLogger(__name__)
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def journal_path():
+    return Path(settings.LIKES_JOURNAL_PATH)
+
+
+def append_like(post_id, reviewer_id):
+    path = journal_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = f'{int(post_id)}\t{reviewer_id}\n'.encode()
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            # The flusher may have rotated the file between open() and
+            # flock(); if so, retry against the fresh journal
+            try:
+                current = os.stat(path).st_ino
+            except FileNotFoundError:
+                current = None
+            if os.fstat(fd).st_ino == current:
+                os.write(fd, line)
+                break
+        finally:
+            os.close(fd)
+    ensure_flusher()
+
+
+def _rotate():
+    path = journal_path()
+    rotated = path.with_name(f'{path.name}.{os.getpid()}.{time.time_ns()}.flushing')
+    try:
+        os.rename(path, rotated)
+    except FileNotFoundError:
+        pass
+
+
+def _read_batch(path):
+    with open(path, 'rb') as journal:
+        # Wait for writers that opened the file before it was rotated
+        fcntl.flock(journal, fcntl.LOCK_EX)
+        data = journal.read().decode()
+
+    likes = set()
+    for line in data.splitlines():
+        post_id, _, reviewer_id = line.partition('\t')
+        if post_id.isdigit() and reviewer_id:
+            likes.add((int(post_id), reviewer_id))
+    return likes
+
+
+def insert_reviews(likes):
+    """
+    Insert a Review for each (post_id, reviewer_id), each in its own
+    savepoint, and return the pairs actually inserted. A pair whose row
+    already exists, e.g. stored by a concurrent record_like() since it was
+    checked, is left out so it never reaches the counter.
+    """
+    inserted = set()
+    for post_id, reviewer_id in likes:
+        try:
+            with transaction.atomic():
+                Review.objects.create(bible_post_id=post_id, reviewer=reviewer_digest(reviewer_id))
+        except IntegrityError:
+            continue
+        inserted.add((post_id, reviewer_id))
+    return inserted
+
+
+def apply_likes(likes):
+    """Persist a batch of (post_id, reviewer_id) pairs. Returns likes added."""
+    if not likes:
+        return 0
+
+    with transaction.atomic():
+        # Locked like compact_reviews() does, so FoldedReviews cannot change
+        # under the flush
+        post_ids = set(
+            BiblePost.objects.select_for_update().filter(pk__in={p for p, _ in likes}).values_list('pk', flat=True)
+        )
+        folded = {reviewers.bible_post_id: reviewers for reviewers in FoldedReviews.objects.filter(pk__in=post_ids)}
+        likes = {
+            (p, r) for p, r in likes
+            if p in post_ids and not (p in folded and reviewer_digest(r) in folded[p])
+        }
+
+        # Only likes the filters cannot rule out need checking against Review.
+        # A stale filter only costs a failed insert: the counters grow by the
+        # rows insert_reviews() actually adds, never by what the filter said.
+        maybe = {(p, r) for p, r in likes if maybe_liked(p, r)}
+        existing = set()
+        if maybe:
+            match = Q()
+            for post_id in {p for p, _ in maybe}:
+                match |= Q(bible_post_id=post_id, reviewer__in=[reviewer_digest(r) for p, r in maybe if p == post_id])
+            existing = set(Review.objects.filter(match).values_list('bible_post_id', 'reviewer'))
+        new_likes = insert_reviews(sorted((p, r) for p, r in likes if (p, reviewer_digest(r)) not in existing))
+        for post_id, count in Counter(p for p, _ in new_likes).items():
+            increment_likes(post_id, count)
+    for post_id, reviewer_id in new_likes:
+        remember_like(post_id, reviewer_id)
+    return len(new_likes)
+
+
+def flush_likes():
+    """
+    Rotate the journal and apply every pending batch, including ones left by
+    a previous crash. Only one process flushes at a time; others return 0.
+    """
+    path = journal_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_fd = os.open(path.with_name(path.name + '.lock'), os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        _rotate()
+        added = 0
+        for batch in sorted(path.parent.glob(path.name + '.*.flushing')):
+            added += apply_likes(_read_batch(batch))
+            batch.unlink()
+        return added
+    finally:
+        os.close(lock_fd)
+
+
+def pending_likes():
+    path = journal_path()
+    batches = [path] + sorted(path.parent.glob(path.name + '.*.flushing'))
+    return sum(len(b.read_bytes().splitlines()) for b in batches if b.exists())
+
+
+def _flush_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            close_old_connections()
+            flush_likes()
+        except Exception:
+            logger.exception('Flushing buffered likes failed; will retry')
+
+
+def ensure_flusher():
+    """
+    Start this process's periodic flush thread on first use. With an interval
+    of 0 nothing is started and flushing is left to the flush_likes command.
+    """
+    global _flusher
+    if _flusher is not None or settings.LIKES_FLUSH_INTERVAL <= 0:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_forever, args=(settings.LIKES_FLUSH_INTERVAL,),
+                name='like-flusher', daemon=True,
+            )
+            _flusher.start()
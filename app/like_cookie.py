@@ -0,0 +1,57 @@
+# app/like_cookie.py
+"""
+Like deduplication without sessions (LIKES_SIGNED_COOKIE = True).
+
+The visitor's random viewer token and the IDs of the posts they have liked
+live in a cookie signed with Django's HMAC signer, so add_like can reject a
+repeat click without a lookup or write and anonymous readers never get a
+django_session row. Only the LIKES_COOKIE_MAX_IDS most recent likes are
+kept to stay well under the 4 KB cookie limit; a like on an older post is
+still deduplicated by Review's unique constraint.
+"""
+import secrets
+
+from django.conf import settings
+from django.utils.http import base36_to_int, int_to_base36
+
+COOKIE_NAME = 'liked'
+SALT = 'app.like_cookie'
+MAX_AGE = 365 * 24 * 60 * 60
+
+
+def encode(viewer_id, post_ids):
+    return f"{viewer_id}:{'.'.join(int_to_base36(post_id) for post_id in post_ids)}"
+
+
+def decode(value):
+    viewer_id, _, ids = value.partition(':')
+    try:
+        return viewer_id, [base36_to_int(part) for part in ids.split('.') if part]
+    except ValueError:
+        return viewer_id, []
+
+
+def read_cookie(request):
+    """(viewer_id, [post ids]), or (None, []) without a valid cookie."""
+    value = request.get_signed_cookie(COOKIE_NAME, default=None, salt=SALT, max_age=MAX_AGE)
+    viewer_id, post_ids = decode(value) if value else (None, [])
+    return (viewer_id, post_ids) if viewer_id else (None, [])
+
+
+def read_likes(request):
+    """
+    (viewer_id, [post ids]) from the cookie; a missing, expired or tampered
+    cookie starts a new viewer with no likes.
+    """
+    viewer_id, post_ids = read_cookie(request)
+    if viewer_id:
+        return viewer_id, post_ids
+    return secrets.token_urlsafe(16), []
+
+
+def store_likes(response, viewer_id, post_ids):
+    post_ids = post_ids[-settings.LIKES_COOKIE_MAX_IDS:]
+    response.set_signed_cookie(
+        COOKIE_NAME, encode(viewer_id, post_ids), salt=SALT, max_age=MAX_AGE,
+        secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+    )
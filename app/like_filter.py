@@ -0,0 +1,121 @@
+# app/like_filter.py
+"""
+Per-post Bloom filters of the reviewer digests that have liked each post,
+kept in the shared cache (LIKE_FILTER_ENABLED = True).
+
+A reviewer missing from the filter has definitely not liked the post, so
+the Review lookup is skipped; a hit is only probable and is confirmed
+against the database. A filter is built from Review the first time its
+post is liked after a cache restart (`manage.py rebuild_like_filters`
+builds them all up front) and is sized for twice the post's likes at
+LIKE_FILTER_FP_RATE, so it is rebuilt larger once it fills up.
+
+Adding is a read-modify-write of the cached filter, so two simultaneous
+likes can lose one bit. That only turns a later duplicate into a "not
+liked" answer, which Review's unique constraint still rejects.
+"""
+import hashlib
+import math
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Review, reviewer_digest
+
+
+def filter_key(post_id):
+    return f'app:like_filter:{post_id}'
+
+
+def filter_size(capacity, fp_rate):
+    """(bits, hash functions) holding `capacity` items at fp_rate false positives."""
+    bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+class BloomFilter:
+    def __init__(self, capacity, fp_rate):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size, self.hashes = filter_size(capacity, fp_rate)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, item):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+    @property
+    def full(self):
+        return self.count > self.capacity
+
+
+def new_filter(digests):
+    bloom = BloomFilter(max(settings.LIKE_FILTER_MIN_CAPACITY, 2 * len(digests)), settings.LIKE_FILTER_FP_RATE)
+    for digest in digests:
+        bloom.add(digest)
+    return bloom
+
+
+def build_filter(post_id):
+    digests = list(Review.objects.filter(bible_post_id=post_id).values_list('reviewer', flat=True))
+    bloom = new_filter(digests)
+    cache.set(filter_key(post_id), bloom, None)
+    return bloom
+
+
+def get_filter(post_id):
+    bloom = cache.get(filter_key(post_id))
+    if bloom is None or bloom.fp_rate != settings.LIKE_FILTER_FP_RATE:
+        bloom = build_filter(post_id)
+    return bloom
+
+
+def rebuild_like_filters():
+    """Build every post's filter from Review in one pass. Returns the number of posts."""
+    rows = Review.objects.order_by('bible_post_id').values_list('bible_post_id', 'reviewer').iterator()
+    posts = 0
+    for post_id, group in groupby(rows, key=lambda row: row[0]):
+        cache.set(filter_key(post_id), new_filter([digest for _, digest in group]), None)
+        posts += 1
+    return posts
+
+
+def maybe_liked(post_id, reviewer_id):
+    """False only when reviewer_id has certainly not liked the post."""
+    if not settings.LIKE_FILTER_ENABLED:
+        return True
+    return reviewer_digest(reviewer_id) in get_filter(post_id)
+
+
+def has_liked(post_id, reviewer_id):
+    return maybe_liked(post_id, reviewer_id) and Review.objects.filter(
+        bible_post_id=post_id, reviewer=reviewer_digest(reviewer_id),
+    ).exists()
+
+
+def remember_like(post_id, reviewer_id):
+    if not settings.LIKE_FILTER_ENABLED:
+        return
+    key = filter_key(post_id)
+    bloom = cache.get(key)
+    if bloom is None:
+        # Built from Review, which already holds this like, on next use
+        return
+    bloom.add(reviewer_digest(reviewer_id))
+    if bloom.full:
+        cache.delete(key)
+    else:
+        cache.set(key, bloom, None)
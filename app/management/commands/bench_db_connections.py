@@ -0,0 +1,108 @@
+# app/management/commands/bench_db_connections.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+from app.bench import scratch_database, summarize
+from app.perf import seed_models
+
+
+def server_sessions():
+    """Sessions ever opened on the current database (pg_stat_database, Postgres 14+)."""
+    # Backends report their stats with a short delay
+    time.sleep(1)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_stat_clear_snapshot()')
+        cursor.execute('SELECT sessions FROM pg_stat_database WHERE datname = current_database()')
+        return cursor.fetchone()[0]
+
+
+def modes(threads):
+    return [
+        ('connection per request', {'CONN_MAX_AGE': 0}, None),
+        ('persistent (CONN_MAX_AGE)', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}, None),
+        ('psycopg pool', {'CONN_MAX_AGE': 0}, {'min_size': threads, 'max_size': threads, 'timeout': 10}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare connection-per-request, persistent and pooled Postgres connections for concurrent '
+        'home requests (needs DATABASE_URL pointing at Postgres; runs on a scratch database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=100, help='Requests per thread')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Set DATABASE_URL to a Postgres database to run this benchmark')
+
+        handler = WSGIHandler()
+
+        def get_home():
+            # Through the WSGI handler, not the test Client, so request_finished
+            # closes or returns the connection exactly as under gunicorn
+            environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/', 'HTTP_HOST': 'localhost'}
+            setup_testing_defaults(environ)
+            response = handler(environ, lambda status, headers: None)
+            assert response.status_code == 200, response.status_code
+            b''.join(response)
+            response.close()
+
+        def worker():
+            timings = []
+            try:
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    get_home()
+                    timings.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+            return timings
+
+        threads = options['threads']
+        settings_dict = connection.settings_dict
+        original = {key: settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        original_options = dict(settings_dict.get('OPTIONS', {}))
+        with scratch_database(), override_settings(PAGE_CACHE_ENABLED=False):
+            seed_models(12)
+            try:
+                for label, overrides, pool in modes(threads):
+                    self.stdout.write(self.run_mode(label, overrides, pool, threads, worker))
+            finally:
+                connection.close()
+                connection.close_pool()
+                settings_dict.update(original)
+                settings_dict['OPTIONS'] = original_options
+
+    def run_mode(self, label, overrides, pool, threads, worker):
+        settings_dict = connection.settings_dict
+        connection.close()
+        connection.close_pool()
+        settings_dict.update(overrides)
+        options = {key: value for key, value in settings_dict.get('OPTIONS', {}).items() if key != 'pool'}
+        settings_dict['OPTIONS'] = {**options, 'pool': pool} if pool else options
+
+        sessions = server_sessions()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            results = [future.result() for future in [executor.submit(worker) for _ in range(threads)]]
+        elapsed = time.perf_counter() - start
+        stats = summarize([t for timings in results for t in timings])
+        if pool:
+            # pg_stat_database misses sessions of pooled connections closed in bulk
+            opened = connection.pool.get_stats()['connections_num']
+            connection.close_pool()
+        else:
+            opened = server_sessions() - sessions
+        return (
+            f"{label:<28} {stats['runs'] / elapsed:>9.1f} req/s  p50 {stats['p50_ms']:>7.2f} ms  "
+            f"p95 {stats['p95_ms']:>7.2f} ms  {opened:>5} connections opened"
+        )
@@ -0,0 +1,44 @@
+# app/management/commands/bench_home.py
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from app.bench import bench_client, format_row, scratch_database, time_calls
+from app.perf import seed_models
+from app.snapshot import rebuild_snapshot
+
+MODES = [
+    ('live queries', {'PAGE_CACHE_ENABLED': False, 'HOME_SNAPSHOT_ENABLED': False}),
+    ('snapshot', {'PAGE_CACHE_ENABLED': False, 'HOME_SNAPSHOT_ENABLED': True}),
+    ('page cache on', {'PAGE_CACHE_ENABLED': True}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark requests/sec and queries for the home page from live queries, the snapshot and the page cache '
+        '(runs on a scratch database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--rows', type=int, default=10, help='Rows per content model')
+
+    def handle(self, *args, **options):
+        client = bench_client()
+
+        def get_home():
+            response = client.get('/')
+            assert response.status_code == 200, response.status_code
+
+        with scratch_database():
+            seed_models(options['rows'])
+            rebuild_snapshot()
+            for label, overrides in MODES:
+                cache.clear()
+                with override_settings(**overrides):
+                    stats = time_calls(get_home, options['requests'])
+                    with CaptureQueriesContext(connection) as queries:
+                        get_home()
+                self.stdout.write(f'{format_row(label, stats)}  {len(queries)} queries')
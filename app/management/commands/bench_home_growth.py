@@ -0,0 +1,42 @@
+# app/management/commands/bench_home_growth.py
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from app.bench import bench_client, format_row, scratch_database, time_calls
+from app.models import Announcement, BiblePost, Testimony
+
+
+def grow_to(rows):
+    """Top up posts, announcements and testimonies to `rows` each."""
+    today = datetime.date.today()
+    for model, make in (
+        (BiblePost, lambda i: BiblePost(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm')),
+        (Announcement, lambda i: Announcement(topic=f'Notice {i}', announcement='Details', date=today)),
+        (Testimony, lambda i: Testimony(testifier=f'Member {i}', topic='Grace', testimony='Thankful', is_approved=True)),
+    ):
+        existing = model.objects.count()
+        model.objects.bulk_create([make(i) for i in range(existing, rows)], batch_size=500)
+
+
+class Command(BaseCommand):
+    help = 'Show home render time as posts/announcements/testimonies grow (runs on a scratch database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000, 5000])
+
+    def handle(self, *args, **options):
+        client = bench_client()
+
+        def get_home():
+            response = client.get('/')
+            assert response.status_code == 200, response.status_code
+
+        with scratch_database(), override_settings(PAGE_CACHE_ENABLED=False):
+            for rows in sorted(options['rows']):
+                grow_to(rows)
+                size = len(client.get('/').content)
+                stats = time_calls(get_home, options['requests'])
+                self.stdout.write(f'{format_row(f"{rows:,} rows/section", stats)}  {size:>9,} bytes')
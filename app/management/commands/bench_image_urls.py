@@ -0,0 +1,58 @@
+# app/management/commands/bench_image_urls.py
+from cloudinary import CloudinaryResource
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.test.utils import override_settings
+
+from app.bench import format_row, time_calls
+from app.fake_cloudinary import fake_cloud
+from app.images import url_cache
+
+# The image-heavy parts of index.html: hero backgrounds plus card and
+# avatar grids
+PAGE = Template(
+    "{% load images %}"
+    "{% for image in hero %}{% background_css '.hero' image 'hero' %}{% endfor %}"
+    "{% for image in cards %}{% responsive_img image 'card' alt='card' %}{% endfor %}"
+    "{% for image in avatars %}{% responsive_img image 'avatar' alt='avatar' %}{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare rendering an image-heavy page with and without the memoized image URLs (Cloudinary URLs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=60)
+        parser.add_argument('--renders', type=int, default=300)
+        parser.add_argument(
+            '--url-latency', type=float, default=0.0,
+            help='Seconds the fake cloud adds to every URL it builds',
+        )
+
+    def handle(self, *args, **options):
+        # URLs are built against the offline fake cloud, never fetched
+        with fake_cloud(), override_settings(CLOUDINARY_FAKE_URL_LATENCY=options['url_latency']):
+            self.run(options)
+
+    def run(self, options):
+        count = options['images']
+        images = [
+            CloudinaryResource(f'lfc_teens/bench/image-{i}', format='jpg', version=str(1700000000 + i))
+            for i in range(count)
+        ]
+        hero = images[:5]
+        context = Context({'hero': hero, 'cards': images[5:count // 2 + 5], 'avatars': images[count // 2 + 5:]})
+        with override_settings(IMAGE_BACKEND='cloudinary'):
+            urls = PAGE.render(context).count('/image/upload/')
+        self.stdout.write(f'{count} images, {urls} URLs per render')
+
+        rows = []
+        for label, size in (('built every render', 0), ('memoized', 4096)):
+            url_cache.clear()
+            with override_settings(IMAGE_BACKEND='cloudinary', IMAGE_URL_CACHE_SIZE=size):
+                rows.append((label, time_calls(lambda: PAGE.render(context), options['renders'])))
+        url_cache.clear()
+
+        baseline = rows[0][1]['p50_ms']
+        for label, stats in rows:
+            self.stdout.write(f"{format_row(label, stats)}  {baseline - stats['p50_ms']:+.2f} ms saved p50")
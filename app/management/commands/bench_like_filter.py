@@ -0,0 +1,81 @@
+# app/management/commands/bench_like_filter.py
+import random
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from app.bench import scratch_database
+from app.counters import record_like
+from app.like_filter import BloomFilter, has_liked, rebuild_like_filters
+from app.models import BiblePost
+
+REVIEWERS = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Report like filter memory per 10k reviewers and the Review lookups it saves '
+        'for a stream of first and repeat likes (runs on a scratch database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clicks', type=int, default=5000)
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--repeat-ratio', type=float, default=0.3)
+        parser.add_argument('--fp-rates', type=float, nargs='+', default=[0.1, 0.01, 0.001])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"fp rate":>8} {"hashes":>7} {"bytes/10k":>10} {"measured fp":>12}')
+        for fp_rate in options['fp_rates']:
+            bloom = BloomFilter(REVIEWERS, fp_rate)
+            for i in range(REVIEWERS):
+                bloom.add(f'member-{i}')
+            strangers = 100_000
+            measured = sum(f'stranger-{i}' in bloom for i in range(strangers)) / strangers
+            self.stdout.write(f'{fp_rate:>8} {bloom.hashes:>7} {len(bloom.bits):>10,} {measured:>12.4%}')
+
+        self.stdout.write('')
+        clicks = self.clicks(options)
+        with scratch_database():
+            for enabled in (False, True):
+                self.stdout.write(self.run_clicks(clicks, options['posts'], enabled))
+
+    def clicks(self, options):
+        rng = random.Random(0)
+        seen = []
+        clicks = []
+        for i in range(options['clicks']):
+            if seen and rng.random() < options['repeat_ratio']:
+                clicks.append(rng.choice(seen))
+            else:
+                click = (rng.randrange(options['posts']), f'viewer-{i}')
+                seen.append(click)
+                clicks.append(click)
+        return clicks
+
+    def run_clicks(self, clicks, posts, enabled):
+        BiblePost.objects.all().delete()
+        post_ids = [
+            post.pk for post in BiblePost.objects.bulk_create(
+                [BiblePost(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm') for i in range(posts)]
+            )
+        ]
+        cache.clear()
+        with override_settings(LIKE_FILTER_ENABLED=enabled):
+            rebuild_like_filters()
+            lookups = []
+
+            def count_lookups(execute, sql, params, many, context):
+                lookups.append(1)
+                return execute(sql, params, many, context)
+
+            for index, reviewer_id in clicks:
+                with connection.execute_wrapper(count_lookups):
+                    liked = has_liked(post_ids[index], reviewer_id)
+                if not liked:
+                    record_like(post_ids[index], reviewer_id)
+            lookups = len(lookups)
+        label = 'filter on' if enabled else 'filter off'
+        return f'{label:<11} {len(clicks):,} likes, {lookups:,} Review lookups ({lookups / len(clicks):.1%} of clicks)'
@@ -0,0 +1,59 @@
+# app/management/commands/bench_likes.py
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from app.bench import bench_client, scratch_database
+from app.counters import get_likes
+from app.like_buffer import flush_likes
+from app.models import BiblePost
+
+
+class Command(BaseCommand):
+    help = 'Compare like throughput of the synchronous path and the write-behind buffer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--likes', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent clients, like gunicorn workers')
+
+    def burst(self, post_id, likes, workers):
+        def like(n):
+            try:
+                client = bench_client()
+                response = client.post('/add-like/', {'post_id': post_id}, REMOTE_ADDR=f'10.0.{n // 256}.{n % 256}')
+                return response.status_code == 200
+            except Exception:
+                return False
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            ok = sum(pool.map(like, range(likes)))
+        return time.perf_counter() - start, likes - ok
+
+    def handle(self, *args, **options):
+        likes, workers = options['likes'], options['workers']
+        with scratch_database(), tempfile.TemporaryDirectory() as tmp:
+            post = BiblePost.objects.create(scriptures='Bench', message='Bench', image='bench')
+            elapsed, errors = self.burst(post.id, likes, workers)
+            self.stdout.write(
+                f'synchronous    {likes / elapsed:>8.1f} likes/s  errors {errors}  stored {get_likes(post.id)}'
+            )
+
+            post = BiblePost.objects.create(scriptures='Bench', message='Bench', image='bench')
+            with override_settings(LIKES_WRITE_BEHIND=True, LIKES_FLUSH_INTERVAL=0,
+                                   LIKES_JOURNAL_PATH=str(Path(tmp) / 'likes.journal')):
+                elapsed, errors = self.burst(post.id, likes, workers)
+                start = time.perf_counter()
+                flush_likes()
+                flushed = time.perf_counter() - start
+            self.stdout.write(
+                f'write-behind   {likes / elapsed:>8.1f} likes/s  errors {errors}  stored {get_likes(post.id)}  '
+                f'(flush {flushed * 1000:.1f} ms, {likes / (elapsed + flushed):.1f} likes/s incl. flush)'
+            )
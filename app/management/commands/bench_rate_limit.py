@@ -0,0 +1,45 @@
+# app/management/commands/bench_rate_limit.py
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from app.bench import format_row, time_calls
+from app.ratelimit import rate_limit
+
+
+def plain_view(request):
+    return HttpResponse('ok')
+
+
+limited_view = rate_limit('bench')(plain_view)
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of the rate limiter on allowed requests, against the configured cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        # Buckets large enough that every request is allowed
+        limits = {'bench': {'ip': (10**9, 10**9), 'session': (10**9, 10**9)}}
+        anonymous = factory.post('/add-like/', REMOTE_ADDR='10.1.2.3')
+        with_session = factory.post('/add-like/', REMOTE_ADDR='10.1.2.3')
+        with_session.COOKIES[settings.SESSION_COOKIE_NAME] = 'bench-session'
+
+        self.stdout.write(f"cache: {settings.CACHES['default']['BACKEND']}")
+        cache.clear()
+        with override_settings(RATE_LIMITS=limits, RATE_LIMIT_ENABLED=True):
+            baseline = time_calls(lambda: plain_view(anonymous), options['requests'])
+            rows = [
+                ('no limiter', baseline),
+                ('IP bucket', time_calls(lambda: limited_view(anonymous), options['requests'])),
+                ('IP + session buckets', time_calls(lambda: limited_view(with_session), options['requests'])),
+            ]
+        for label, stats in rows:
+            overhead = (stats['p50_ms'] - baseline['p50_ms']) * 1000
+            self.stdout.write(f'{format_row(label, stats)}  +{overhead:.1f} us p50')
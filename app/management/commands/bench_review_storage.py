@@ -0,0 +1,101 @@
+# app/management/commands/bench_review_storage.py
+import hashlib
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app.bench import percentile, scratch_database
+from app.models import BiblePost, Review, reviewer_digest
+
+# app_review as it was before migration 0023: an MD5 hex string per like
+LEGACY_TABLE = 'legacy_review'
+LEGACY_DDL = [
+    f'CREATE TABLE {LEGACY_TABLE} (id integer NOT NULL PRIMARY KEY AUTOINCREMENT, '
+    'bible_post_id bigint NOT NULL, reviewer_id varchar(100) NOT NULL, created_at datetime NOT NULL)',
+    f'CREATE INDEX legacy_review_post ON {LEGACY_TABLE} (bible_post_id)',
+    f'CREATE UNIQUE INDEX legacy_review_uniq ON {LEGACY_TABLE} (bible_post_id, reviewer_id)',
+]
+BATCH_SIZE = 50_000
+
+
+def table_bytes(cursor, table):
+    """Bytes used by a table and its indexes (SQLite dbstat)."""
+    cursor.execute(
+        'SELECT SUM(s.pgsize) FROM dbstat s JOIN sqlite_master m ON s.name = m.name WHERE m.tbl_name = %s', [table],
+    )
+    return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare table size and duplicate-lookup latency of the old MD5-string Review layout '
+        'against the 64-bit digest one (SQLite, runs on a scratch database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--posts', type=int, default=50)
+        parser.add_argument('--lookups', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('bench_review_storage measures SQLite pages (unset DATABASE_URL)')
+        rows, posts = options['rows'], options['posts']
+        with scratch_database():
+            post_ids = [
+                post.pk for post in BiblePost.objects.bulk_create(
+                    [BiblePost(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm') for i in range(posts)]
+                )
+            ]
+            reviewers = [hashlib.md5(str(i).encode()).hexdigest() for i in range(rows)]
+            likes = [(post_ids[i % posts], reviewer) for i, reviewer in enumerate(reviewers)]
+            now = timezone.now().isoformat()
+            new_table = Review._meta.db_table
+
+            with connection.cursor() as cursor:
+                for statement in LEGACY_DDL:
+                    cursor.execute(statement)
+                for start in range(0, rows, BATCH_SIZE):
+                    batch = likes[start:start + BATCH_SIZE]
+                    with transaction.atomic():
+                        cursor.executemany(
+                            f'INSERT INTO {LEGACY_TABLE} (bible_post_id, reviewer_id, created_at) VALUES (%s, %s, %s)',
+                            [(post_id, reviewer, now) for post_id, reviewer in batch],
+                        )
+                        cursor.executemany(
+                            f'INSERT INTO {new_table} (bible_post_id, reviewer, created_at) VALUES (%s, %s, %s)',
+                            [(post_id, reviewer_digest(reviewer), now) for post_id, reviewer in batch],
+                        )
+                cursor.execute('ANALYZE')
+
+                rng = random.Random(0)
+                # Half repeat likes, half new visitors
+                probes = [
+                    rng.choice(likes) if rng.random() < 0.5 else (rng.choice(post_ids), hashlib.md5(f'new-{i}'.encode()).hexdigest())
+                    for i in range(options['lookups'])
+                ]
+                layouts = [
+                    ('md5 varchar (before)', LEGACY_TABLE, 'reviewer_id', lambda reviewer: reviewer),
+                    ('64-bit digest (after)', new_table, 'reviewer', reviewer_digest),
+                ]
+                self.stdout.write(f'{rows:,} rows over {posts} posts')
+                self.stdout.write(f'{"":<24} {"MB":>8} {"bytes/row":>10} {"lookup p50 us":>14} {"p95 us":>8}')
+                for label, table, column, value in layouts:
+                    timings = []
+                    for post_id, reviewer in probes:
+                        start = time.perf_counter()
+                        cursor.execute(
+                            f'SELECT 1 FROM {table} WHERE bible_post_id = %s AND {column} = %s LIMIT 1',
+                            [post_id, value(reviewer)],
+                        )
+                        cursor.fetchone()
+                        timings.append(time.perf_counter() - start)
+                    timings.sort()
+                    size = table_bytes(cursor, table)
+                    self.stdout.write(
+                        f'{label:<24} {size / 1024 / 1024:>8.1f} {size / rows:>10.1f} '
+                        f'{percentile(timings, 50) * 1e6:>14.1f} {percentile(timings, 95) * 1e6:>8.1f}'
+                    )
@@ -0,0 +1,64 @@
+# app/management/commands/bench_ttfb.py
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from app.bench import bench_client, percentile, scratch_database
+from app.perf import seed_models
+from app.snapshot import rebuild_snapshot
+
+MODES = [
+    ('buffered, live queries', {'HOME_STREAMING': False, 'HOME_SNAPSHOT_ENABLED': False}),
+    ('streamed, live queries', {'HOME_STREAMING': True, 'HOME_SNAPSHOT_ENABLED': False}),
+    ('buffered, snapshot', {'HOME_STREAMING': False, 'HOME_SNAPSHOT_ENABLED': True}),
+    ('streamed, snapshot', {'HOME_STREAMING': True, 'HOME_SNAPSHOT_ENABLED': True}),
+]
+
+
+def timed_get(client):
+    """
+    (first byte, first preload hint, last byte) in seconds for one home
+    request. The preload hint counts as available once a chunk containing
+    rel="preload" (or a Link header) has been produced.
+    """
+    start = time.perf_counter()
+    response = client.get('/')
+    assert response.status_code == 200, response.status_code
+    headers = time.perf_counter() - start
+    if not response.streaming:
+        return headers, headers, headers
+    first = hint = headers if 'Link' in response else None
+    for chunk in response.streaming_content:
+        now = time.perf_counter() - start
+        first = first or now
+        if hint is None and b'rel="preload"' in chunk:
+            hint = now
+    return first, hint or now, now
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare time to first byte, to the first preload hint and to the last byte for the '
+        'buffered and streamed home page (runs on a scratch database, page cache off)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--rows', type=int, default=12)
+
+    def handle(self, *args, **options):
+        client = bench_client()
+        with scratch_database(), override_settings(PAGE_CACHE_ENABLED=False):
+            seed_models(options['rows'])
+            rebuild_snapshot()
+            self.stdout.write(f'{"":<24} {"first byte":>12} {"first hint":>12} {"last byte":>12}   (p50 ms)')
+            for label, overrides in MODES:
+                cache.clear()
+                with override_settings(**overrides):
+                    for _ in range(3):
+                        timed_get(client)
+                    samples = [timed_get(client) for _ in range(options['requests'])]
+                columns = [sorted(column) for column in zip(*samples)]
+                self.stdout.write(f'{label:<24} ' + ' '.join(f'{percentile(c, 50) * 1000:>12.2f}' for c in columns))
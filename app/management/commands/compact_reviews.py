@@ -0,0 +1,29 @@
+# app/management/commands/compact_reviews.py
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.counters import compact_reviews
+from app.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Fold the Review rows of old posts into BiblePost.folded_likes and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.REVIEW_COMPACT_AFTER_DAYS,
+            help='Compact posts created more than this many days ago (default: REVIEW_COMPACT_AFTER_DAYS)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be folded')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+        if options['dry_run']:
+            rows = Review.objects.filter(bible_post__created_at__lt=before).count()
+            self.stdout.write(f'{rows} review row(s) on posts older than {options["days"]} days')
+            return
+        posts, rows = compact_reviews(before)
+        self.stdout.write(self.style.SUCCESS(f'Folded {rows} review row(s) from {posts} post(s)'))
@@ -0,0 +1,56 @@
+# app/management/commands/explain_home.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from app.bench import bench_client
+
+EXPLAIN = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+
+
+def is_full_scan(line):
+    # SQLite: "SCAN app_leader" (a covering "SCAN ... USING INDEX" is fine);
+    # Postgres: "Seq Scan on app_leader"
+    return ('SCAN ' in line and 'USING' not in line) or 'Seq Scan' in line
+
+
+def plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(EXPLAIN[connection.vendor] + sql)
+        rows = cursor.fetchall()
+    # SQLite rows are (id, parent, notused, detail); Postgres rows are (line,)
+    return [row[-1] for row in rows]
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plan of every query the home page issues without the page cache '
+        'and snapshot, flagging full table scans'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Page to explain (default: home)')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in EXPLAIN:
+            raise CommandError(f'EXPLAIN is not supported for {connection.vendor}')
+
+        # The snapshot would answer in two queries and hide the section queries
+        # its rebuilds and the live fallback run
+        overrides = override_settings(PAGE_CACHE_ENABLED=False, HOME_SNAPSHOT_ENABLED=False)
+        with overrides, CaptureQueriesContext(connection) as queries:
+            bench_client().get(options['path'])
+
+        scans = 0
+        for number, query in enumerate(queries, 1):
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f'#{number} {sql}'))
+            for line in plan(sql):
+                if is_full_scan(line):
+                    scans += 1
+                    self.stdout.write(self.style.WARNING(f'    {line}   <- full scan'))
+                else:
+                    self.stdout.write(f'    {line}')
+        self.stdout.write(f'{len(queries)} queries, {scans} full table scans')
@@ -0,0 +1,13 @@
+# app/management/commands/flush_likes.py
+from django.core.management.base import BaseCommand
+
+from app.like_buffer import flush_likes, pending_likes
+
+
+class Command(BaseCommand):
+    help = 'Write buffered likes from the write-behind journal to the database'
+
+    def handle(self, *args, **options):
+        pending = pending_likes()
+        added = flush_likes()
+        self.stdout.write(f'{pending} journal entries, {added} new like(s) written')
@@ -0,0 +1,60 @@
+# app/management/commands/image_savings.py
+import urllib.request
+
+from django.core.management.base import BaseCommand
+
+from app.images import IMAGE_SLOTS, image_url, pick_width
+from app.models import Announcement, BiblePost, Belief, HeroSlide, Leader, MinistryUnit, Testimony
+
+# (section, queryset, slot, rendered CSS width on the reference phone)
+SECTIONS = [
+    ('hero', HeroSlide.objects.filter(is_active=True), 'hero', None),
+    ('leaders', Leader.objects.filter(is_active=True), 'card', None),
+    ('bible posts', BiblePost.objects.filter(is_active=True), 'card', None),
+    ('announcements', Announcement.objects.filter(is_active=True), 'avatar', 48),
+    ('testimonies', Testimony.objects.filter(is_approved=True), 'avatar', 48),
+    ('units', MinistryUnit.objects.filter(is_active=True), 'card', None),
+    ('beliefs', Belief.objects.filter(is_active=True), 'avatar', 48),
+]
+
+
+def content_length(url):
+    # Accept mirrors a modern mobile browser so f_auto negotiates WebP/AVIF
+    request = urllib.request.Request(url, headers={'Accept': 'image/avif,image/webp,*/*'})
+    with urllib.request.urlopen(request, timeout=20) as response:
+        return len(response.read())
+
+
+class Command(BaseCommand):
+    help = 'Estimate bytes saved per home-page section by responsive Cloudinary delivery (needs network)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--viewport', type=int, default=360, help='Phone viewport width in CSS px')
+        parser.add_argument('--dpr', type=float, default=2.0, help='Device pixel ratio')
+
+    def handle(self, *args, **options):
+        viewport, dpr = options['viewport'], options['dpr']
+        self.stdout.write(f'{"section":<16} {"images":>6} {"original":>12} {"responsive":>12} {"saved":>7}')
+        total_before = total_after = 0
+        for label, queryset, slot, css_width in SECTIONS:
+            if slot == 'hero':
+                # Backgrounds switch by CSS width via media queries, not DPR
+                width = next(w for w in IMAGE_SLOTS[slot]['widths'] if w >= viewport)
+            else:
+                width = pick_width(slot, css_width or viewport, dpr)
+            before = after = count = 0
+            for obj in queryset:
+                if not obj.image:
+                    continue
+                try:
+                    before += content_length(obj.image.url)
+                    after += content_length(image_url(obj.image, width))
+                except OSError as exc:
+                    self.stderr.write(f'{label}: could not fetch {obj.image.public_id} ({exc})')
+                    continue
+                count += 1
+            total_before += before
+            total_after += after
+            saved = f'{100 - after * 100 / before:.0f}%' if before else '-'
+            self.stdout.write(f'{label:<16} {count:>6} {before:>12,} {after:>12,} {saved:>7}')
+        self.stdout.write(f'{"total":<16} {"":>6} {total_before:>12,} {total_after:>12,}')
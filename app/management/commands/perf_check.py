@@ -0,0 +1,48 @@
+# app/management/commands/perf_check.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from app.bench import scratch_database
+from app.perf import SIZES, load_results, measure, regressions, save_results, seed_models
+
+
+class Command(BaseCommand):
+    help = (
+        'Time home (view and template render) and count home/add_like queries at several table sizes '
+        'on a scratch database; fail if slower than the baseline by more than the threshold'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+        parser.add_argument('--runs', type=int, default=30)
+        parser.add_argument('--output', default=settings.PERF_RESULTS_PATH, help='Where to write this run (JSON)')
+        parser.add_argument('--baseline', default=settings.PERF_BASELINE_PATH, help='Run to compare against (JSON)')
+        parser.add_argument('--threshold', type=float, default=settings.PERF_REGRESSION_THRESHOLD,
+                            help='Allowed slowdown as a fraction, e.g. 0.25 for 25%%')
+        parser.add_argument('--update-baseline', action='store_true', help='Save this run as the new baseline')
+
+    def handle(self, *args, **options):
+        results = {}
+        with scratch_database(), override_settings(PAGE_CACHE_ENABLED=False):
+            for size in sorted(options['sizes']):
+                seed_models(size)
+                run = measure(options['runs'])
+                results[str(size)] = run
+                self.stdout.write(
+                    f"{size:>7,} rows  view p50 {run['view']['p50_ms']:7.2f} p95 {run['view']['p95_ms']:7.2f} ms  "
+                    f"render p50 {run['render']['p50_ms']:7.2f} p95 {run['render']['p95_ms']:7.2f} ms  "
+                    f"queries {run['queries']}"
+                )
+
+        save_results(options['output'], results)
+        self.stdout.write(f"Results written to {options['output']}")
+        if options['update_baseline']:
+            save_results(options['baseline'], results)
+            self.stdout.write(f"Baseline updated: {options['baseline']}")
+            return
+
+        problems = regressions(results, load_results(options['baseline']), options['threshold'])
+        if problems:
+            raise CommandError('Performance regression:\n  ' + '\n  '.join(problems))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,12 @@
+# app/management/commands/rebuild_like_filters.py
+from django.core.management.base import BaseCommand
+
+from app.like_filter import rebuild_like_filters
+
+
+class Command(BaseCommand):
+    help = 'Build the per-post like filters in the cache from the Review table (run after a deploy or cache restart)'
+
+    def handle(self, *args, **options):
+        posts = rebuild_like_filters()
+        self.stdout.write(self.style.SUCCESS(f'Built like filters for {posts} post(s)'))
@@ -0,0 +1,14 @@
+# app/management/commands/rebuild_snapshot.py
+from django.core.management.base import BaseCommand
+
+from app.snapshot import rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Build the home page snapshot from live queries (run after a deploy; edits rebuild it afterwards)'
+
+    def handle(self, *args, **options):
+        if rebuild_snapshot():
+            self.stdout.write(self.style.SUCCESS('Built the home snapshot'))
+        else:
+            self.stdout.write('Content changed during the build; the change will rebuild the snapshot')
@@ -0,0 +1,21 @@
+# app/management/commands/reconcile_likes.py
+from django.core.management.base import BaseCommand
+
+from app.counters import drifted_posts, reconcile_likes
+
+
+class Command(BaseCommand):
+    help = 'Recompute BiblePost.likes from the Review table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list posts whose counter has drifted')
+
+    def handle(self, *args, **options):
+        drifted = list(drifted_posts())
+        for post_id, likes, counted in drifted:
+            self.stdout.write(f'BiblePost {post_id}: counter {likes}, reviews {counted}')
+        if options['dry_run']:
+            self.stdout.write(f'{len(drifted)} post(s) drifted')
+            return
+        updated = reconcile_likes()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {updated} post(s), {len(drifted)} had drifted'))
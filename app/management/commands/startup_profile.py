@@ -0,0 +1,84 @@
+# app/management/commands/startup_profile.py
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter so nothing is imported yet. It prints only
+# the timings, as one JSON line.
+COLD_START = '''
+import json, time
+start = time.perf_counter()
+from project.wsgi import application
+ready = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.perf_counter()
+print(json.dumps({'wsgi_ms': (ready - start) * 1000, 'urls_ms': (routed - ready) * 1000}))
+'''
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """[(module, self us, cumulative us, depth)] from -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the import-time breakdown (as from python -X importtime) and the total time '
+        'until project.wsgi.application is ready, each run in a fresh interpreter'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts to take the median of')
+        parser.add_argument('--top', type=int, default=15, help='Packages and modules to list')
+
+    def cold_start(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'project.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', COLD_START],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Cold start failed:\n{result.stderr[-2000:]}')
+        return json.loads(result.stdout), parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self.cold_start() for _ in range(options['runs'])]
+        # Breakdown from the median run by WSGI time
+        timings, modules = sorted(runs, key=lambda run: run[0]['wsgi_ms'])[len(runs) // 2]
+
+        packages = defaultdict(int)
+        for module, self_us, _, _ in modules:
+            packages[module.split('.')[0]] += self_us
+        total_us = sum(packages.values())
+
+        self.stdout.write(f'{len(modules)} modules imported, {total_us / 1000:.1f} ms import time (self)')
+        self.stdout.write(f'\n{"package":<32} {"self ms":>9} {"share":>7}')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{package:<32} {self_us / 1000:>9.1f} {self_us / total_us:>7.1%}')
+
+        self.stdout.write(f'\n{"module":<48} {"self ms":>9} {"cumul ms":>9}')
+        for module, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[1])[:options['top']]:
+            self.stdout.write(f'{module:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}')
+
+        wsgi = statistics.median(run[0]['wsgi_ms'] for run in runs)
+        urls = statistics.median(run[0]['urls_ms'] for run in runs)
+        self.stdout.write(
+            f'\nmedian of {len(runs)} cold starts: WSGI application ready {wsgi:.1f} ms, '
+            f'+ URLconf {urls:.1f} ms = {wsgi + urls:.1f} ms to first request'
+        )
@@ -0,0 +1,28 @@
+# app/management/commands/static_image_report.py
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from app.storage import IMAGE_MANIFEST_NAME
+
+
+class Command(BaseCommand):
+    help = 'Print the bytes saved per image by the last collectstatic run'
+
+    def handle(self, *args, **options):
+        if not hasattr(staticfiles_storage, 'load_image_manifest'):
+            raise CommandError('STATICFILES_STORAGE does not optimize images')
+        manifest = staticfiles_storage.load_image_manifest()
+        if not manifest:
+            raise CommandError(f'No {IMAGE_MANIFEST_NAME} in STATIC_ROOT; run collectstatic first')
+
+        self.stdout.write(f'{"file":<32} {"original":>10} {"optimized":>10} {"saved":>6} {"webp":>10} {"saved":>6}')
+        totals = [0, 0, 0]
+        for name, entry in sorted(manifest.items()):
+            sizes = [entry['original'], entry['optimized'], entry['webp']]
+            totals = [t + s for t, s in zip(totals, sizes)]
+            self.stdout.write(self.row(name, *sizes))
+        self.stdout.write(self.row('total', *totals))
+
+    def row(self, name, original, optimized, webp):
+        saved = lambda size: f'{100 - size * 100 / original:.0f}%' if original else '-'
+        return f'{name:<32} {original:>10,} {optimized:>10,} {saved(optimized):>6} {webp:>10,} {saved(webp):>6}'
@@ -0,0 +1,101 @@
+# app/management/commands/stress_sqlite.py
+import logging
+import multiprocessing
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+
+from app.bench import bench_client, percentile, scratch_database
+from app.models import BiblePost
+from app.perf import seed_models
+
+# What DATABASES['default']['OPTIONS'] looked like before the tuning
+UNTUNED = {'init_command': 'PRAGMA journal_mode=DELETE', 'timeout': 5, 'transaction_mode': None}
+
+
+def run_worker(options, post_ids, seconds, write_ratio, seed):
+    """
+    Mix home reads and like writes against the shared database file for
+    `seconds`; returns counts and per-request timings.
+    """
+    connection.settings_dict['OPTIONS'] = options
+    # Lock errors are counted below; don't log a traceback for each one
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    rng = random.Random(seed)
+    reader = bench_client()
+    result = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0, 'timings': []}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        write = rng.random() < write_ratio
+        start = time.perf_counter()
+        try:
+            if write:
+                # A new visitor per like, so each one also saves a session row
+                response = bench_client().post('/add-like/', {'post_id': rng.choice(post_ids)})
+            else:
+                response = reader.get('/')
+            if response.status_code != 200:
+                result['errors'] += 1
+                continue
+        except OperationalError as exc:
+            result['locked' if 'locked' in str(exc) else 'errors'] += 1
+            continue
+        result['timings'].append(time.perf_counter() - start)
+        result['writes' if write else 'reads'] += 1
+    connection.close()
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer a scratch SQLite database from several processes with home reads and like writes, '
+        'untuned vs the configured pragmas, and report throughput and "database is locked" errors'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('stress_sqlite needs the SQLite backend (unset DATABASE_URL)')
+        configured = dict(settings.DATABASES['default'].get('OPTIONS', {}))
+        modes = [('untuned', UNTUNED), ('configured', configured)]
+        original = connection.settings_dict.get('OPTIONS', {})
+        with scratch_database(), override_settings(
+            PAGE_CACHE_ENABLED=False, LIKES_WRITE_BEHIND=False, RATE_LIMIT_ENABLED=False,
+        ):
+            seed_models(12)
+            post_ids = list(BiblePost.objects.values_list('pk', flat=True))
+            self.stdout.write(f'{"":<12} {"req/s":>9} {"reads":>7} {"writes":>7} {"locked":>7} {"lock %":>7} {"p95 ms":>9}')
+            try:
+                for label, mode in modes:
+                    # Apply the (persistent) journal mode once before the workers connect
+                    connection.close()
+                    connection.settings_dict['OPTIONS'] = mode
+                    connection.ensure_connection()
+                    connection.close()
+                    self.stdout.write(self.run_mode(label, mode, post_ids, options))
+            finally:
+                connection.close()
+                connection.settings_dict['OPTIONS'] = original
+
+    def run_mode(self, label, mode, post_ids, options):
+        workers = options['processes']
+        args = [(mode, post_ids, options['seconds'], options['write_ratio'], seed) for seed in range(workers)]
+        # fork, so every worker inherits the configured Django and the scratch database name
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.starmap(run_worker, args)
+        total = {key: sum(r[key] for r in results) for key in ('reads', 'writes', 'locked', 'errors')}
+        timings = sorted(t for r in results for t in r['timings'])
+        attempts = total['reads'] + total['writes'] + total['locked'] + total['errors']
+        lock_rate = total['locked'] / attempts * 100 if attempts else 0.0
+        return (
+            f'{label:<12} {len(timings) / options["seconds"]:>9.1f} {total["reads"]:>7} {total["writes"]:>7} '
+            f'{total["locked"]:>7} {lock_rate:>6.1f}% {percentile(timings, 95) * 1000:>9.1f}'
+        )
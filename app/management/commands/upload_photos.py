@@ -0,0 +1,19 @@
+# app/management/commands/upload_photos.py
+from django.core.management.base import BaseCommand
+
+from app.uploads import pending_photos, release_stale_claims, upload_photo
+
+
+class Command(BaseCommand):
+    help = 'Upload testimony photos still waiting in the upload spool'
+
+    def handle(self, *args, **options):
+        uploaded = failed = 0
+        release_stale_claims()
+        for path in pending_photos():
+            try:
+                uploaded += upload_photo(path)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{path.name}: {exc}')
+        self.stdout.write(f'{uploaded} photo(s) uploaded, {failed} failed')
@@ -0,0 +1,28 @@
+# app/management/commands/warm_derivatives.py
+from django.core.management.base import BaseCommand
+
+from app.derivatives import allowed_widths, get_derivative
+from app.images import as_resource, stored_name
+from app.models import Announcement, BiblePost, Belief, HeroSlide, Leader, MinistryUnit, Testimony
+
+MODELS = [HeroSlide, Leader, BiblePost, Announcement, Testimony, MinistryUnit, Belief]
+
+
+class Command(BaseCommand):
+    help = 'Render every local image derivative ahead of the first request (IMAGE_BACKEND=local)'
+
+    def handle(self, *args, **options):
+        rendered = missing = 0
+        for model in MODELS:
+            for image in model.objects.values_list('image', flat=True):
+                resource = as_resource(image)
+                if not resource:
+                    continue
+                name = stored_name(resource)
+                paths = [get_derivative(name, w, ext) for w in sorted(allowed_widths()) for ext in ('webp', 'jpg')]
+                if None in paths:
+                    missing += 1
+                    self.stderr.write(f'{model.__name__}: {name} not found under MEDIA_ROOT')
+                    continue
+                rendered += len(paths)
+        self.stdout.write(f'{rendered} derivatives ready, {missing} missing source images')
@@ -0,0 +1,27 @@
+# app/middleware.py
+from django.conf import settings
+
+from .preload import link_header, preload_assets
+
+
+class PreloadLinkMiddleware:
+    """
+    Adds a Link: rel=preload header for the home page's critical assets.
+    Gunicorn cannot send 103 Early Hints itself, but a CDN in front of it
+    (e.g. Cloudflare) turns these headers into 103 responses for later
+    visitors; browsers also act on the header before parsing the body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        if (
+            match and match.url_name in settings.PRELOAD_URL_NAMES
+            and request.method == 'GET' and response.status_code == 200
+            and 'Link' not in response
+        ):
+            response['Link'] = link_header(preload_assets())
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:47
+
+from django.db import migrations
+from django.db.models import F
+
+
+def copy_reviews_to_likes(apps, schema_editor):
+    # 'reviews' is the counter add_like has been maintaining; 'likes' went stale
+    BiblePost = apps.get_model('app', 'BiblePost')
+    BiblePost.objects.update(likes=F('reviews'))
+
+
+def copy_likes_to_reviews(apps, schema_editor):
+    BiblePost = apps.get_model('app', 'BiblePost')
+    BiblePost.objects.update(reviews=F('likes'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_biblepost_reviews_review'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_reviews_to_likes, copy_likes_to_reviews),
+        migrations.RemoveField(
+            model_name='biblepost',
+            name='reviews',
+        ),
+    ]
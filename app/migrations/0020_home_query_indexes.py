@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_biblepost_single_like_counter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='announce_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='belief',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order'], name='belief_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biblepost',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='biblepost_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='heroslide',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='heroslide_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leader',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order'], name='leader_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leader',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_counselor', True)), fields=['order'], name='leader_counselor_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ministryunit',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order'], name='unit_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimony',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-date', '-id'], name='testimony_approved_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_home_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
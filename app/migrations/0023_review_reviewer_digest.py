@@ -0,0 +1,91 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:40
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+BATCH_SIZE = 5000
+
+
+def reviewer_digest(reviewer_id):
+    # Copy of app.models.reviewer_digest as of this migration
+    return int.from_bytes(hashlib.blake2b(reviewer_id.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def fill_digests(apps, schema_editor):
+    Review = apps.get_model('app', 'Review')
+    last = 0
+    while True:
+        batch = list(Review.objects.filter(pk__gt=last).order_by('pk').only('pk', 'reviewer_id')[:BATCH_SIZE])
+        if not batch:
+            break
+        for review in batch:
+            review.reviewer = reviewer_digest(review.reviewer_id)
+        Review.objects.bulk_update(batch, ['reviewer'])
+        last = batch[-1].pk
+    # Two IDs sharing a digest on one post would break the new unique
+    # constraint; keep the earliest like
+    collisions = (
+        Review.objects.values('bible_post', 'reviewer').annotate(rows=Count('pk'), first=Min('pk')).filter(rows__gt=1)
+    )
+    for row in collisions:
+        Review.objects.filter(bible_post=row['bible_post'], reviewer=row['reviewer']).exclude(pk=row['first']).delete()
+
+
+def restore_ids(apps, schema_editor):
+    # The original IDs are gone; the digest text keeps each row unique
+    Review = apps.get_model('app', 'Review')
+    Review.objects.update(reviewer_id=models.functions.Cast('reviewer', models.CharField(max_length=100)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='biblepost',
+            name='folded_likes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='reviewer',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='reviewer_id',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.RunPython(fill_digests, restore_ids),
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='review',
+            name='reviewer_id',
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='reviewer',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together={('bible_post', 'reviewer')},
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='bible_post',
+            field=models.ForeignKey(
+                db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_reviews',
+                to='app.biblepost',
+            ),
+        ),
+    ]
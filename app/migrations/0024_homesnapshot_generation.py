@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+def stale_to_generation(apps, schema_editor):
+    # A stale snapshot becomes one a generation behind, so it is rebuilt
+    HomeSnapshot = apps.get_model('app', 'HomeSnapshot')
+    HomeSnapshot.objects.filter(is_stale=True).update(generation=1)
+
+
+def generation_to_stale(apps, schema_editor):
+    HomeSnapshot = apps.get_model('app', 'HomeSnapshot')
+    HomeSnapshot.objects.exclude(built_generation=models.F('generation')).update(is_stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_review_reviewer_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homesnapshot',
+            name='built_generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='homesnapshot',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(stale_to_generation, generation_to_stale),
+        migrations.RemoveField(
+            model_name='homesnapshot',
+            name='is_stale',
+        ),
+    ]
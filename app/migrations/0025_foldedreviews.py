@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_homesnapshot_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoldedReviews',
+            fields=[
+                ('bible_post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='folded_reviews', serialize=False, to='app.biblepost')),
+                ('reviewers', models.BinaryField(default=b'')),
+            ],
+        ),
+    ]
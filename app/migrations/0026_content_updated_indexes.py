@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_foldedreviews'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['updated_at'], name='announce_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='belief',
+            index=models.Index(fields=['updated_at'], name='belief_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biblepost',
+            index=models.Index(fields=['updated_at'], name='biblepost_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactinfo',
+            index=models.Index(fields=['updated_at'], name='contactinfo_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='heroslide',
+            index=models.Index(fields=['updated_at'], name='heroslide_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leader',
+            index=models.Index(fields=['updated_at'], name='leader_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ministryunit',
+            index=models.Index(fields=['updated_at'], name='unit_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimony',
+            index=models.Index(fields=['updated_at'], name='testimony_updated_idx'),
+        ),
+    ]
@@ -2,9 +2,19 @@
 from django.db import models
 from django.utils import timezone
 from cloudinary.models import CloudinaryField
+from array import array
+from bisect import bisect_left
+import hashlib
+import sys
 import uuid
+from . import images
 
-class HeroSlide(models.Model):
+class ImageURLMixin:
+    def image_url(self, width=None):
+        """Delivery URL of self.image, optionally limited to `width` px, memoized per process."""
+        return images.image_url(self.image, width)
+
+class HeroSlide(ImageURLMixin, models.Model):
     title = models.CharField(max_length=200)
     subtitle = models.TextField()
     image = CloudinaryField('hero_image', folder='lfc_teens/hero')
@@ -12,11 +22,18 @@ class HeroSlide(models.Model):
     btn_link = models.CharField(max_length=200, default='#')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='heroslide_updated_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_active=True), name='heroslide_active_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-class Leader(models.Model):
+class Leader(ImageURLMixin, models.Model):
     name = models.CharField(max_length=100)
     position = models.CharField(max_length=100)
     description = models.TextField()
@@ -25,56 +42,124 @@ class Leader(models.Model):
     is_counselor = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['updated_at'], name='leader_updated_idx'),
+            models.Index(fields=['order'], condition=models.Q(is_active=True), name='leader_active_order_idx'),
+            models.Index(
+                fields=['order'], condition=models.Q(is_active=True, is_counselor=True),
+                name='leader_counselor_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.position}"
 
-class BiblePost(models.Model):
+class BiblePost(ImageURLMixin, models.Model):
     scriptures = models.CharField(max_length=200)
     message = models.TextField()
     image = CloudinaryField('bible_image', folder='lfc_teens/bible')
-    likes = models.IntegerField(default=0)
-    reviews = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)  # Updated only through app/counters.py
+    # Likes whose Review rows were dropped by manage.py compact_reviews
+    folded_likes = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='biblepost_updated_idx'),
+            # Keyset pagination in app/sections.py: newest first, id breaks ties
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(is_active=True), name='biblepost_active_recent_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.scriptures
 
+def reviewer_digest(reviewer_id):
+    """Signed 64-bit digest of a reviewer ID, the form Review stores it in."""
+    return int.from_bytes(hashlib.blake2b(reviewer_id.encode(), digest_size=8).digest(), 'big', signed=True)
+
 class Review(models.Model):
-    bible_post = models.ForeignKey(BiblePost, on_delete=models.CASCADE, related_name='post_reviews')
-    reviewer_id = models.CharField(max_length=100)  # Simple identifier for preventing duplicates
+    # The unique (bible_post, reviewer) index also serves lookups by post
+    bible_post = models.ForeignKey(BiblePost, on_delete=models.CASCADE, related_name='post_reviews', db_index=False)
+    reviewer = models.BigIntegerField()  # reviewer_digest() of the viewer fingerprint, for preventing duplicates
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        unique_together = ['bible_post', 'reviewer_id']
-
-class Announcement(models.Model):
+        unique_together = ['bible_post', 'reviewer']
+
+class FoldedReviews(models.Model):
+    # The reviewers of the Review rows manage.py compact_reviews dropped,
+    # sorted and packed 8 bytes each, so a folded post still rejects repeat likes
+    bible_post = models.OneToOneField(
+        BiblePost, on_delete=models.CASCADE, primary_key=True, related_name='folded_reviews',
+    )
+    reviewers = models.BinaryField(default=b'')
+
+    def digests(self):
+        packed = array('q', bytes(self.reviewers))
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        return packed
+
+    def __contains__(self, digest):
+        packed = self.digests()
+        i = bisect_left(packed, digest)
+        return i < len(packed) and packed[i] == digest
+
+    def add(self, digests):
+        packed = array('q', sorted({*self.digests(), *digests}))
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        self.reviewers = packed.tobytes()
+
+class Announcement(ImageURLMixin, models.Model):
     topic = models.CharField(max_length=200)
     announcement = models.TextField()
     date = models.DateField()
     image = CloudinaryField('announcement_image', folder='lfc_teens/announcements', null=True, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='announce_updated_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(is_active=True), name='announce_active_recent_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.topic
 
-class Testimony(models.Model):
+class Testimony(ImageURLMixin, models.Model):
     testifier = models.CharField(max_length=100)
     topic = models.CharField(max_length=200)
     testimony = models.TextField()
     image = CloudinaryField('testimony_image', folder='lfc_teens/testimonies', null=True, blank=True)
     date = models.DateField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='testimony_updated_idx'),
+            models.Index(
+                fields=['-date', '-id'], condition=models.Q(is_approved=True), name='testimony_approved_recent_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.testifier} - {self.topic}"
 
-class MinistryUnit(models.Model):
+class MinistryUnit(ImageURLMixin, models.Model):
     name = models.CharField(max_length=100)
     duty = models.CharField(max_length=200)
     description = models.TextField()
@@ -83,22 +168,32 @@ class MinistryUnit(models.Model):
     image = CloudinaryField('unit_image', folder='lfc_teens/units')
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['updated_at'], name='unit_updated_idx'),
+            models.Index(fields=['order'], condition=models.Q(is_active=True), name='unit_active_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
-class Belief(models.Model):
+class Belief(ImageURLMixin, models.Model):
     name = models.CharField(max_length=100)
     detail = models.TextField()
     image = CloudinaryField('belief_image', folder='lfc_teens/beliefs')
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['updated_at'], name='belief_updated_idx'),
+            models.Index(fields=['order'], condition=models.Q(is_active=True), name='belief_active_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -110,9 +205,24 @@ class ContactInfo(models.Model):
     email = models.EmailField()
     whatsapp_number = models.CharField(max_length=20)
     service_times = models.TextField(help_text="Enter service times with days and times")
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return "Contact Information"
 
     class Meta:
-        verbose_name_plural = "Contact Information"
\ No newline at end of file
+        verbose_name_plural = "Contact Information"
+        indexes = [
+            models.Index(fields=['updated_at'], name='contactinfo_updated_idx'),
+        ]
+
+class HomeSnapshot(models.Model):
+    # Denormalized home page content, maintained by app/snapshot.py
+    data = models.JSONField(default=dict)
+    # Bumped by every content change; data reflects built_generation
+    generation = models.PositiveBigIntegerField(default=0)
+    built_generation = models.PositiveBigIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Home snapshot ({self.built_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,108 @@
+# app/page_cache.py
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from .models import BiblePost
+
+CONTENT_VERSION_KEY = 'app:content_version'
+# Like counts change far more often than content, so they have their own
+# version and are filled into the cached HTML per response
+LIKES_VERSION_KEY = 'app:likes_version'
+
+# Rendered into the cached HTML in place of the real CSRF token and swapped
+# for a fresh per-visitor token on every response.
+CSRF_PLACEHOLDER = '__lfc_csrf_token__'
+
+# Rendered by {% like_count %} in place of a post's like count
+LIKES_PLACEHOLDER = '__lfc_likes_{}__'
+LIKES_PATTERN = re.compile(r'__lfc_likes_(\d+)__')
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a cache restart never reuses an old version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key was evicted - any fresh seed is newer than the old pages
+        return get_version(key)
+
+
+def get_content_version():
+    return get_version(CONTENT_VERSION_KEY)
+
+
+def bump_content_version():
+    return bump_version(CONTENT_VERSION_KEY)
+
+
+def get_likes_version():
+    return get_version(LIKES_VERSION_KEY)
+
+
+def bump_likes_version():
+    return bump_version(LIKES_VERSION_KEY)
+
+
+def page_cache_key(name):
+    return f'app:page:{name}:{get_content_version()}'
+
+
+def like_counts(name, post_ids):
+    """{post id: likes} for the posts on a cached page, cached per likes version."""
+    if not post_ids:
+        return {}
+    key = f'app:likes:{name}:{get_content_version()}:{get_likes_version()}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = dict(BiblePost.objects.filter(pk__in=post_ids).values_list('pk', 'likes'))
+        cache.set(key, counts, settings.PAGE_CACHE_TIMEOUT)
+    return counts
+
+
+def render_cacheable(template_name, context, request):
+    """template_name rendered with the CSRF token and like counts left as placeholders."""
+    context.update(csrf_token=CSRF_PLACEHOLDER, like_placeholders=True)
+    return render_to_string(template_name, context, request=request)
+
+
+def store_page(key, html):
+    entry = (html, sorted({int(post_id) for post_id in LIKES_PATTERN.findall(html)}))
+    cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+    return entry
+
+
+def fill_page(request, name, entry, token=None):
+    """The cached HTML with this visitor's CSRF token and the current like counts."""
+    html, post_ids = entry
+    counts = like_counts(name, post_ids)
+    html = LIKES_PATTERN.sub(lambda match: str(counts.get(int(match[1]), 0)), html)
+    return html.replace(CSRF_PLACEHOLDER, token or get_token(request))
+
+
+def cached_page(request, name, template_name, get_context):
+    """
+    Render template_name once per content version and serve it from the
+    cache afterwards. get_context is only called on a miss, so cache hits
+    never touch the database beyond one like-count read per likes version.
+    """
+    key = page_cache_key(name)
+    entry = cache.get(key)
+    if entry is None:
+        entry = store_page(key, render_cacheable(template_name, get_context(), request))
+
+    # Inject the CSRF token late so the like forms keep working
+    return HttpResponse(fill_page(request, name, entry))
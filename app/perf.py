@@ -0,0 +1,161 @@
+# app/perf.py
+"""
+Performance regression checks for the home page and add_like.
+
+QUERY_BUDGETS are asserted by app.tests and by the perf_check command; the
+command also times the view and the template render separately at several
+table sizes and compares the run against a saved baseline.
+"""
+import datetime
+import json
+import time
+from pathlib import Path
+
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .bench import bench_client, summarize, time_calls
+from .like_filter import rebuild_like_filters
+from .models import (
+    Announcement, Belief, BiblePost, ContactInfo, HeroSlide, Leader, MinistryUnit, Review, Testimony,
+    reviewer_digest,
+)
+from .page_cache import CSRF_PLACEHOLDER
+from .snapshot import rebuild_snapshot
+
+# Queries per request with the page cache off, transaction statements
+# included. home: the ETag/Last-Modified lookup, the HomeSnapshot read and
+# the posts' current like counts. home_live: the lookup plus contact info,
+# hero, leaders, counselors, units, beliefs and one page each of posts,
+# announcements and testimonies. add_like: post lookup, review insert +
+# counter update, the FoldedReviews check and the count read-back; the
+# signed like cookie replaces the session row and the like filter the
+# duplicate check.
+# add_like_repeat: the same visitor liking again, rejected by the cookie;
+# only the current count is read.
+QUERY_BUDGETS = {
+    'home': 3,
+    'home_live': 10,
+    'add_like': 7,
+    'add_like_repeat': 1,
+}
+
+SIZES = [10, 1000, 10000]
+
+
+def seed_models(rows):
+    """Top up every content model to `rows` rows (one ContactInfo)."""
+    today = datetime.date.today()
+    factories = [
+        (HeroSlide, lambda i: HeroSlide(title=f'Slide {i}', subtitle='Welcome', image='lfc_teens/hero/welcome')),
+        (Leader, lambda i: Leader(
+            name=f'Leader {i}', position='Pastor', description='Leads', image='lfc_teens/leaders/jane',
+            is_counselor=i % 10 == 0, order=i,
+        )),
+        (BiblePost, lambda i: BiblePost(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm')),
+        (Announcement, lambda i: Announcement(topic=f'Notice {i}', announcement='Details', date=today)),
+        (Testimony, lambda i: Testimony(testifier=f'Member {i}', topic='Grace', testimony='Thankful', is_approved=True)),
+        (MinistryUnit, lambda i: MinistryUnit(
+            name=f'Unit {i}', duty='Serve', description='Serves', leader='Ada', image='lfc_teens/units/choir', order=i,
+        )),
+        (Belief, lambda i: Belief(name=f'Belief {i}', detail='By grace', image='lfc_teens/beliefs/grace', order=i)),
+    ]
+    for model, make in factories:
+        existing = model.objects.count()
+        model.objects.bulk_create([make(i) for i in range(existing, rows)], batch_size=500)
+
+    post = BiblePost.objects.order_by('pk').first()
+    existing = Review.objects.filter(bible_post=post).count()
+    Review.objects.bulk_create(
+        [Review(bible_post=post, reviewer=reviewer_digest(f'seed-{i}')) for i in range(existing, rows)], batch_size=500,
+    )
+    if not ContactInfo.objects.exists():
+        ContactInfo.objects.create(address='Byazhin', phone_number='0901', email='a@b.com',
+                                   whatsapp_number='0901', service_times='Sun')
+
+
+def count_queries(fn):
+    with CaptureQueriesContext(connection) as queries:
+        fn()
+    return len(queries)
+
+
+def measure(runs):
+    """
+    Time the home view and its template render separately, and count the
+    queries for home and add_like, against the current database. It
+    rebuilds the snapshot and like filters and fills the cache, so run it
+    inside app.bench.scratch_database.
+    """
+    from .views import home_context
+
+    client = bench_client()
+    # As after a deploy's rebuild_like_filters and rebuild_snapshot
+    rebuild_like_filters()
+    rebuild_snapshot()
+    post_id = BiblePost.objects.order_by('pk').values_list('pk', flat=True).first()
+    like_form = {'post_id': post_id}
+
+    def get_home():
+        assert client.get('/').status_code == 200
+
+    def render_home():
+        context = home_context()
+        # Evaluate every queryset first so only template work is timed
+        for value in context.values():
+            if hasattr(value, '_fetch_all'):
+                value._fetch_all()
+        context['csrf_token'] = CSRF_PLACEHOLDER
+        start = time.perf_counter()
+        render_to_string('index.html', context)
+        return time.perf_counter() - start
+
+    renders = [render_home() for _ in range(runs + 2)][2:]
+    liker = bench_client()
+    view = time_calls(get_home, runs, warmup=2)
+    with override_settings(HOME_SNAPSHOT_ENABLED=False):
+        home_live = count_queries(get_home)
+    return {
+        'view': view,
+        'render': summarize(renders),
+        'queries': {
+            'home': count_queries(get_home),
+            'home_live': home_live,
+            'add_like': count_queries(lambda: liker.post('/add-like/', like_form)),
+            'add_like_repeat': count_queries(lambda: liker.post('/add-like/', like_form)),
+        },
+    }
+
+
+def regressions(results, baseline, threshold):
+    """
+    Human-readable list of everything in results that is worse than
+    baseline: p50/p95 slower by more than threshold (0.25 = 25%), or any
+    query count above its budget.
+    """
+    problems = []
+    for size, run in results.items():
+        for name, count in run['queries'].items():
+            if count > QUERY_BUDGETS[name]:
+                problems.append(f'{size} rows: {name} ran {count} queries (budget {QUERY_BUDGETS[name]})')
+        before = baseline.get(size)
+        if not before:
+            continue
+        for part in ('view', 'render'):
+            for stat in ('p50_ms', 'p95_ms'):
+                old, new = before[part][stat], run[part][stat]
+                if old and new > old * (1 + threshold):
+                    problems.append(f'{size} rows: {part} {stat} {old:.2f} -> {new:.2f} ms')
+    return problems
+
+
+def load_results(path):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_results(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True))
@@ -0,0 +1,60 @@
+# app/preload.py
+"""
+Critical assets for the home page, announced before the body is ready:
+as <link rel="preload"> in the streamed <head> and as Link response headers
+(which a CDN such as Cloudflare can turn into 103 Early Hints).
+"""
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from .images import IMAGE_SLOTS, image_url
+from .page_cache import page_cache_key
+
+FONTS_CSS = (
+    'https://fonts.googleapis.com/css2?family=Merriweather:wght@300;400;700;900'
+    '&family=Montserrat:wght@300;400;500;600;700&display=swap'
+)
+
+
+def static_assets():
+    return [
+        (static('css/tailwind.min.css'), 'style', ''),
+        (static('htmx.min.js'), 'script', ''),
+        (static('alpine.js'), 'script', ''),
+        (FONTS_CSS, 'style', ''),
+    ]
+
+
+def hero_assets(image):
+    """
+    One preload per hero width, with the same breakpoints background_css
+    switches on, so the browser preloads exactly the file the CSS will use.
+    """
+    widths = IMAGE_SLOTS['hero']['widths']
+    assets = []
+    for index, width in enumerate(widths):
+        queries = []
+        if index:
+            queries.append(f'(min-width: {widths[index - 1] + 1}px)')
+        if index < len(widths) - 1:
+            queries.append(f'(max-width: {width}px)')
+        assets.append((image_url(image, width), 'image', ' and '.join(queries)))
+    return assets
+
+
+def remember_hero(hero):
+    """Record the first hero slide's image so later heads can preload it before any query runs."""
+    first = next(iter(hero or []), None)
+    cache.set(page_cache_key('hero_preload'), hero_assets(first.image) if first else [], None)
+
+
+def preload_assets():
+    """[(url, as, media)] for everything worth fetching before the body arrives."""
+    return static_assets() + (cache.get(page_cache_key('hero_preload')) or [])
+
+
+def link_header(assets):
+    return ', '.join(
+        f'<{url}>; rel=preload; as={kind}' + (f'; media="{media}"' if media else '')
+        for url, kind, media in assets
+    )
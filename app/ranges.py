@@ -0,0 +1,123 @@
+# app/ranges.py
+"""
+Byte-range file responses (RFC 9110 section 14) for large media such as the
+background audio, so players can seek and resume without re-downloading.
+"""
+import hashlib
+import mimetypes
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags
+
+CHUNK_SIZE = 64 * 1024
+
+# Versioned URLs (?v=<etag>) never change content, so cache them for a year
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+_etags = {}
+
+
+class UnsatisfiableRange(ValueError):
+    pass
+
+
+def file_etag(path):
+    """Strong ETag from the file's content, hashed once per mtime/size."""
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    etag = _etags.get(key)
+    if etag is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        etag = _etags[key] = f'"{digest.hexdigest()[:32]}"'
+    return etag
+
+
+def parse_range(header, size):
+    """
+    The (start, end) byte range, end inclusive, asked for by a Range header,
+    or None when the whole file should be sent: no header, a header we do not
+    understand, or several ranges (which a server may ignore). Raises
+    UnsatisfiableRange when the range lies outside the file.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    specs = header[len('bytes='):].split(',')
+    if len(specs) != 1:
+        return None
+    match = _RANGE_RE.match(specs[0])
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the final `last` bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise UnsatisfiableRange(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange(header)
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(request, path):
+    """Serve `path` honouring Range, If-Range and If-None-Match."""
+    size = path.stat().st_size
+    etag = file_etag(path)
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Last-Modified': http_date(path.stat().st_mtime),
+        'Cache-Control': CACHE_CONTROL,
+    }
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = _body_response(request, path, size, etag, content_type)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def _body_response(request, path, size, etag, content_type):
+    byte_range = None
+    # A stale If-Range means the client's partial copy is out of date
+    if request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    body = [] if request.method == 'HEAD' else _read_range(path, start, length)
+    response = StreamingHttpResponse(body, status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    return response
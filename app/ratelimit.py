@@ -0,0 +1,126 @@
+# app/ratelimit.py
+"""
+Token-bucket rate limiting for public POST endpoints.
+
+Every client gets a bucket per client IP and, once it has a session
+cookie or a signed like cookie, one for that session (keyed by a hash of
+the cookie, never the cookie itself). Buckets live in the default cache,
+so all gunicorn workers only see the same counts when CACHE_URL points at
+a shared cache; with the local-memory default each worker keeps its own
+buckets and a client gets up to one full allowance per worker, which
+check_shared_cache() warns about at startup in production.
+
+A bucket holds up to `burst` tokens and refills at `rate` tokens per
+second; a request takes one token from each of its buckets, or gets a 429
+with Retry-After before the view (and any query) runs. The check is one
+get_many and one set_many, whatever the traffic.
+
+The read-modify-write is not atomic, so a few requests racing across
+workers can share a token. That is acceptable for throttling floods;
+it is not a quota.
+"""
+import hashlib
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .like_cookie import read_cookie
+
+logger = logging.getLogger(__name__)
+
+# Backends that keep their data inside each worker process
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def client_ip(request):
+    """
+    The client address, taking the RATE_LIMIT_PROXY_COUNT-th address from
+    the right of X-Forwarded-For: the one our own proxy appended, which the
+    client cannot forge.
+    """
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+    if proxies and len(forwarded) >= proxies:
+        return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def session_id(request):
+    """
+    The session cookie or, for anonymous likers who never get a session,
+    the viewer token from their signed like cookie.
+    """
+    return request.COOKIES.get(settings.SESSION_COOKIE_NAME) or read_cookie(request)[0]
+
+
+def bucket_keys(name, request):
+    """{cache key: (burst, rate)} for every bucket this request draws from."""
+    limits = settings.RATE_LIMITS[name]
+    keys = {f'app:ratelimit:{name}:ip:{client_ip(request)}': limits['ip']}
+    session = session_id(request)
+    if session and 'session' in limits:
+        # The session cookie is a credential; keep it out of the cache
+        digest = hashlib.blake2b(session.encode(), digest_size=16).hexdigest()
+        keys[f'app:ratelimit:{name}:session:{digest}'] = limits['session']
+    return keys
+
+
+def check_shared_cache():
+    """Warn when rate limits run in production on a cache each worker keeps to itself."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.RATE_LIMIT_ENABLED and not settings.DEBUG and backend in PER_PROCESS_CACHES:
+        logger.warning(
+            'RATE_LIMIT_ENABLED with the per-process %s: every worker counts separately, so clients '
+            'get one allowance per worker. Set CACHE_URL to a shared cache.', backend.rpartition('.')[2],
+        )
+        return False
+    return True
+
+
+def take_token(name, request, now=None):
+    """
+    Take one token from each of the request's buckets. Returns 0 when the
+    request may proceed, otherwise the seconds until it may retry (and no
+    tokens are taken).
+    """
+    now = time.time() if now is None else now
+    keys = bucket_keys(name, request)
+    stored = cache.get_many(keys)
+    buckets = {}
+    wait = 0.0
+    for key, (burst, rate) in keys.items():
+        tokens, stamp = stored.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        if tokens < 1:
+            wait = max(wait, (1 - tokens) / rate)
+        buckets[key] = tokens
+    if wait:
+        return wait
+    # A bucket left alone long enough to refill is simply full, so let it expire
+    refill = max(math.ceil(burst / rate) for burst, rate in keys.values())
+    cache.set_many({key: (tokens - 1, now) for key, tokens in buckets.items()}, refill)
+    return 0
+
+
+def rate_limit(name):
+    """View decorator applying the RATE_LIMITS[name] buckets."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATE_LIMIT_ENABLED:
+                wait = take_token(name, request)
+                if wait:
+                    response = HttpResponse('Too many requests, please slow down.', status=429)
+                    response['Retry-After'] = str(math.ceil(wait))
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
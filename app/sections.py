@@ -0,0 +1,78 @@
+# app/sections.py
+"""
+Keyset pagination for the long home-page sections.
+
+The home page renders the first SECTION_PAGE_SIZE items of each section;
+the rest arrive through /sections/<name>/?after=<cursor> as htmx fragments.
+A cursor is the last item's sort value and id, so every page is an indexed
+range scan no matter how deep the visitor scrolls. Cursors are signed, so
+the fragment view only caches pages for cursors it handed out itself.
+"""
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import Announcement, BiblePost, Testimony
+
+# name -> (queryset, sort field, card template); newest first, id breaks ties
+SECTIONS = {
+    'posts': (BiblePost.objects.filter(is_active=True), 'created_at', 'partials/bible_post.html'),
+    'announcements': (Announcement.objects.filter(is_active=True), 'created_at', 'partials/announcement.html'),
+    'testimonies': (Testimony.objects.filter(is_approved=True), 'date', 'partials/testimony.html'),
+}
+
+
+CURSOR_SALT = 'app.sections.cursor'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj, field):
+    return signing.Signer(salt=CURSOR_SALT).sign(f'{getattr(obj, field).isoformat()}~{obj.pk}')
+
+
+def issued_cursor(cursor):
+    """True when cursor was signed by encode_cursor()."""
+    try:
+        signing.Signer(salt=CURSOR_SALT).unsign(cursor)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def decode_cursor(model, field, cursor):
+    if issued_cursor(cursor):
+        cursor = cursor.rpartition(':')[0]
+    value, sep, pk = cursor.rpartition('~')
+    if not sep or not pk.isdigit():
+        raise InvalidCursor(cursor)
+    try:
+        return model._meta.get_field(field).to_python(value), int(pk)
+    except ValidationError:
+        raise InvalidCursor(cursor)
+
+
+def section_page(name, after=None, size=None):
+    """
+    One page of section `name` as {'items', 'next_url', 'card_template'}.
+    next_url is None on the last page.
+    """
+    queryset, field, card_template = SECTIONS[name]
+    size = size or settings.SECTION_PAGE_SIZE
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    if after:
+        value, pk = decode_cursor(queryset.model, field, after)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+    # One extra row tells us whether another page exists without a COUNT
+    items = list(queryset[:size + 1])
+    next_url = None
+    if len(items) > size:
+        items = items[:size]
+        next_url = f"{reverse('section_page', args=[name])}?{urlencode({'after': encode_cursor(items[-1], field)})}"
+    return {'items': items, 'next_url': next_url, 'card_template': card_template}
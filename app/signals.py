@@ -0,0 +1,46 @@
+# app/signals.py
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import snapshot
+from .images import forget_image
+from .models import FoldedReviews, HomeSnapshot, Review
+from .page_cache import bump_content_version
+
+
+def content_changed(sender, **kwargs):
+    # After commit: a page rendered before then would still show the old
+    # rows, and would be cached under the new version
+    transaction.on_commit(bump_content_version)
+
+
+def remember_image(sender, instance, **kwargs):
+    # The image a save replaces is only in the database until the save runs
+    instance._replaced_image = (
+        sender._base_manager.filter(pk=instance.pk).values_list('image', flat=True).first() if instance.pk else None
+    )
+
+
+def image_changed(sender, instance, **kwargs):
+    # After a save, drop the replaced image's URLs; after a delete, its own
+    forget_image(instance.__dict__.pop('_replaced_image', instance.image))
+
+
+def connect_content_signals():
+    # Every model in app/models.py feeds the home page, so any save or delete
+    # invalidates the cached rendering
+    for model in apps.get_app_config('app').get_models():
+        if model in (FoldedReviews, HomeSnapshot, Review):
+            # Derived from the other models, and a like shows up through
+            # BiblePost.likes, which cached pages fill in per response
+            continue
+        uid = f'content_changed_{model._meta.label_lower}'
+        post_save.connect(content_changed, sender=model, dispatch_uid=uid)
+        post_delete.connect(content_changed, sender=model, dispatch_uid=uid)
+        post_save.connect(snapshot.content_changed, sender=model, dispatch_uid=f'snapshot_{uid}')
+        post_delete.connect(snapshot.content_changed, sender=model, dispatch_uid=f'snapshot_{uid}')
+        if any(field.name == 'image' for field in model._meta.fields):
+            pre_save.connect(remember_image, sender=model, dispatch_uid=f'image_{uid}')
+            post_save.connect(image_changed, sender=model, dispatch_uid=f'image_{uid}')
+            post_delete.connect(image_changed, sender=model, dispatch_uid=f'image_{uid}')
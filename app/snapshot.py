@@ -0,0 +1,186 @@
+# app/snapshot.py
+"""
+Denormalized home page content.
+
+Every home section is serialized into the single HomeSnapshot row with its
+image URLs already built, so a cache miss on the home page costs one
+primary-key read instead of a query per section. Like counts are not part
+of it: they are read live (or filled in by the page cache) on render.
+
+Saving or deleting a model bumps HomeSnapshot.generation in the writer's
+transaction, and after commit the sections that model feeds are rebuilt.
+A rebuild stores its data only if the generation it read is still current
+(compare-and-set), so a change committed while it ran is never marked as
+built. A snapshot behind its generation makes home fall back to live
+queries; the GET path never writes it.
+"""
+from cloudinary.models import CloudinaryField
+from django.db import transaction
+from django.db.models import F
+
+from .images import ResolvedImage, resolve_image
+from .models import (
+    Announcement, Belief, BiblePost, ContactInfo, HeroSlide, HomeSnapshot, Leader, MinistryUnit, Testimony,
+)
+from .sections import section_page
+
+SNAPSHOT_PK = 1
+
+# Bump when the serialized layout changes so old rows are treated as stale
+FORMAT = 2
+
+# section -> (model, image slot, live query)
+HOME_SECTIONS = {
+    'hero': (HeroSlide, 'hero', lambda: HeroSlide.objects.filter(is_active=True)),
+    'leaders': (Leader, 'card', lambda: Leader.objects.filter(is_active=True)),
+    'bible_post': (BiblePost, 'card', lambda: section_page('posts')),
+    'announcement': (Announcement, 'avatar', lambda: section_page('announcements')),
+    'testimony': (Testimony, 'avatar', lambda: section_page('testimonies')),
+    'unit': (MinistryUnit, 'card', lambda: MinistryUnit.objects.filter(is_active=True)),
+    'belief': (Belief, 'avatar', lambda: Belief.objects.filter(is_active=True)),
+    'counselors': (Leader, 'card', lambda: Leader.objects.filter(is_active=True, is_counselor=True)),
+    'contact_info': (ContactInfo, None, lambda: ContactInfo.objects.first()),
+}
+
+
+def live_context():
+    return {name: query() for name, (_, _, query) in HOME_SECTIONS.items()}
+
+
+def sections_for(model):
+    return [name for name, (section_model, _, _) in HOME_SECTIONS.items() if section_model is model]
+
+
+def dump_object(obj, slot):
+    fields = {}
+    for field in obj._meta.concrete_fields:
+        value = getattr(obj, field.attname)
+        if isinstance(field, CloudinaryField):
+            value = dump_image(field, value, slot)
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        fields[field.attname] = value
+    return fields
+
+
+def dump_image(field, value, slot):
+    if not value:
+        return None
+    resolved = resolve_image(value, slot)
+    # JSON object keys must be strings, so keep (width, url) pairs
+    return {'value': field.get_prep_value(value), 'urls': [[w, url] for w, url in resolved.urls.items()]}
+
+
+def load_object(model, fields):
+    values = {}
+    for field in model._meta.concrete_fields:
+        value = fields.get(field.attname)
+        if isinstance(field, CloudinaryField):
+            value = value and ResolvedImage(field.to_python(value['value']), dict(map(tuple, value['urls'])))
+        elif value is not None:
+            value = field.to_python(value)
+        values[field.attname] = value
+    obj = model(**values)
+    obj._state.adding = False
+    return obj
+
+
+def dump_section(name, value):
+    model, slot, _ = HOME_SECTIONS[name]
+    if value is None:
+        return None
+    if isinstance(value, model):
+        return {'object': dump_object(value, slot)}
+    if isinstance(value, dict):
+        return {'page': {**value, 'items': [dump_object(obj, slot) for obj in value['items']]}}
+    return {'objects': [dump_object(obj, slot) for obj in value]}
+
+
+def load_section(name, payload):
+    model = HOME_SECTIONS[name][0]
+    if payload is None:
+        return None
+    if 'object' in payload:
+        return load_object(model, payload['object'])
+    if 'page' in payload:
+        page = payload['page']
+        return {**page, 'items': [load_object(model, fields) for fields in page['items']]}
+    return [load_object(model, fields) for fields in payload['objects']]
+
+
+def current_snapshot():
+    """The snapshot row if it reflects its generation, else None."""
+    snapshot = HomeSnapshot.objects.filter(pk=SNAPSHOT_PK).first()
+    if snapshot and snapshot.built_generation == snapshot.generation and snapshot.data.get('format') == FORMAT:
+        return snapshot
+    return None
+
+
+def save_snapshot(sections, generation):
+    """Store sections as built for generation, unless a writer has moved past it. Returns True if stored."""
+    return bool(
+        HomeSnapshot.objects.filter(pk=SNAPSHOT_PK, generation=generation)
+        .update(data={'format': FORMAT, 'sections': sections}, built_generation=generation)
+    )
+
+
+def rebuild_snapshot(names=None, changed=None):
+    """
+    Recompute the given sections (all of them by default) from live queries
+    and store the snapshot. `changed` is the generation of the change that
+    asked for the rebuild: the other sections are only kept when that change
+    is the single one not yet built. Returns True if the snapshot was stored.
+    """
+    snapshot, _ = HomeSnapshot.objects.get_or_create(
+        pk=SNAPSHOT_PK, defaults={'generation': 1, 'built_generation': 0},
+    )
+    generation, built = snapshot.generation, snapshot.built_generation
+    if changed is not None and built >= changed:
+        # A later rebuild has already picked this change up
+        return False
+    sections = {}
+    if names is not None and changed == generation == built + 1 and snapshot.data.get('format') == FORMAT:
+        sections = dict(snapshot.data['sections'])
+    else:
+        names = list(HOME_SECTIONS)
+    # Read after the generation, so the live data includes every change up to it
+    for name in names:
+        sections[name] = dump_section(name, HOME_SECTIONS[name][2]())
+    return save_snapshot(sections, generation)
+
+
+def bump_generation():
+    """Record a content change. Returns the new generation, or None when there is no snapshot yet."""
+    with transaction.atomic():
+        HomeSnapshot.objects.filter(pk=SNAPSHOT_PK).update(generation=F('generation') + 1)
+        return HomeSnapshot.objects.filter(pk=SNAPSHOT_PK).values_list('generation', flat=True).first()
+
+
+def live_likes(context):
+    """Replace the like counts stored with the posts section by the current ones, in one query."""
+    page = context.get('bible_post')
+    if page and page['items']:
+        likes = dict(BiblePost.objects.filter(pk__in=[post.pk for post in page['items']]).values_list('pk', 'likes'))
+        for post in page['items']:
+            post.likes = likes.get(post.pk, post.likes)
+    return context
+
+
+def snapshot_context(live_like_counts=True):
+    """
+    Home page context from the snapshot in one query (two with
+    live_like_counts), or from live queries when it is missing or behind.
+    """
+    snapshot = current_snapshot()
+    if snapshot is None:
+        return live_context()
+    context = {name: load_section(name, payload) for name, payload in snapshot.data['sections'].items()}
+    return live_likes(context) if live_like_counts else context
+
+
+def content_changed(sender, **kwargs):
+    names = sections_for(sender)
+    if names:
+        changed = bump_generation()
+        # Rebuild after commit so the snapshot never holds rolled-back rows
+        transaction.on_commit(lambda: rebuild_snapshot(names, changed))
@@ -0,0 +1,124 @@
+# app/storage.py
+"""
+Static files storage that optimizes images during collectstatic.
+
+After WhiteNoise has hashed and compressed everything, JPEGs are passed
+through `jpegtran -optimize -progressive` when it is on PATH, which
+rewrites the Huffman tables and scan order without decoding the pixels
+(without it JPEGs are left as they are: a Pillow re-encode, even with
+quality='keep', is not lossless). PNGs are re-packed with optimize=True. A
+result is only kept when it is smaller. Each image also gets a WebP
+sibling next to it (hero.jpg -> hero.jpg.webp), registered in the
+staticfiles manifest so {% background_image %} and {% static_picture %}
+can offer it. Results are recorded in IMAGE_MANIFEST_NAME keyed by the
+source file's hash, so unchanged images are skipped on the next run;
+`manage.py static_image_report` prints the per-file savings.
+"""
+import hashlib
+import json
+import logging
+import posixpath
+import shutil
+import subprocess
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MANIFEST_NAME = 'images.json'
+OPTIMIZED_EXTENSIONS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG'}
+
+
+def jpegtran(data):
+    """data Huffman-optimized and made progressive without decoding, or data itself without jpegtran."""
+    path = shutil.which('jpegtran')
+    if path is None:
+        return data
+    result = subprocess.run(
+        [path, '-copy', 'all', '-optimize', '-progressive'], input=data, capture_output=True, check=True,
+    )
+    return result.stdout
+
+
+def optimize_image(data, pil_format):
+    """Losslessly smaller bytes for a JPEG/PNG, or the input when nothing is gained."""
+    if pil_format == 'JPEG':
+        optimized = jpegtran(data)
+    else:
+        with Image.open(BytesIO(data)) as image:
+            out = BytesIO()
+            image.save(out, 'PNG', optimize=True, icc_profile=image.info.get('icc_profile'))
+        optimized = out.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+def webp_version(data, pil_format):
+    with Image.open(BytesIO(data)) as image:
+        out = BytesIO()
+        if pil_format == 'PNG':
+            image.save(out, 'WEBP', lossless=True, method=6)
+        else:
+            image.save(out, 'WEBP', quality=85, method=6)
+    return out.getvalue()
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            yield from self.optimize_images(paths)
+
+    def load_image_manifest(self):
+        if not self.exists(IMAGE_MANIFEST_NAME):
+            return {}
+        with self.open(IMAGE_MANIFEST_NAME) as fh:
+            return json.loads(fh.read().decode())
+
+    def replace(self, name, data):
+        self.delete(name)
+        self._save(name, ContentFile(data))
+
+    def optimize_images(self, paths):
+        manifest = self.load_image_manifest()
+        for name in sorted(paths):
+            pil_format = OPTIMIZED_EXTENSIONS.get(posixpath.splitext(name)[1].lower())
+            if pil_format is None:
+                continue
+            storage, path = paths[name]
+            with storage.open(path) as fh:
+                source = fh.read()
+            digest = hashlib.sha256(source).hexdigest()
+            hashed_name = self.stored_name(name)
+            # The hashed copy may be the only one (WHITENOISE_KEEP_ONLY_HASHED_FILES)
+            targets = [target for target in {name, hashed_name} if self.exists(target)]
+
+            entry = manifest.get(name)
+            if entry and entry['source'] == digest and all(self.exists(f'{t}.webp') for t in targets):
+                self.register_webp(name, hashed_name)
+                continue
+
+            try:
+                optimized = optimize_image(source, pil_format)
+                webp = webp_version(source, pil_format)
+            except (OSError, SyntaxError, subprocess.CalledProcessError) as exc:
+                # Pillow raises SyntaxError for some corrupt files
+                logger.warning('Could not optimize %s: %s', name, exc)
+                continue
+
+            for target in targets:
+                self.replace(target, optimized)
+                self.replace(f'{target}.webp', webp)
+            self.register_webp(name, hashed_name)
+            manifest[name] = {'source': digest, 'original': len(source), 'optimized': len(optimized), 'webp': len(webp)}
+            logger.info('%s: %d -> %d bytes (webp %d)', name, len(source), len(optimized), len(webp))
+            yield name, hashed_name, True
+
+        self.replace(IMAGE_MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+        # The manifest was saved before the siblings existed
+        self.save_manifest()
+
+    def register_webp(self, name, hashed_name):
+        self.hashed_files[self.hash_key(f'{name}.webp')] = f'{hashed_name}.webp'
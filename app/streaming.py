@@ -0,0 +1,44 @@
+# app/streaming.py
+"""
+Streaming render for the home page: the <head>, with its preload links,
+goes out before any query runs, so the browser starts fetching CSS, scripts,
+fonts and the hero image while the body is still being built.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from .page_cache import CSRF_PLACEHOLDER, fill_page, page_cache_key, render_cacheable, store_page
+
+HEAD_TEMPLATE = 'partials/head.html'
+
+
+def streamed_page(request, name, template_name, get_context):
+    """
+    Like page_cache.cached_page, but a miss streams HEAD_TEMPLATE first and
+    then template_name rendered with head_streamed=True. The joined page is
+    cached, so hits are served whole.
+    """
+    # Must run before the response is returned so the CSRF cookie is set
+    token = get_token(request)
+    key = page_cache_key(name)
+    entry = cache.get(key) if settings.PAGE_CACHE_ENABLED else None
+    if entry is not None:
+        return HttpResponse(fill_page(request, name, entry, token))
+
+    def stream():
+        head = render_to_string(HEAD_TEMPLATE, request=request)
+        yield head
+        context = get_context()
+        context['head_streamed'] = True
+        if not settings.PAGE_CACHE_ENABLED:
+            context['csrf_token'] = CSRF_PLACEHOLDER
+            yield render_to_string(template_name, context, request=request).replace(CSRF_PLACEHOLDER, token)
+            return
+        body = render_cacheable(template_name, context, request)
+        _, post_ids = store_page(key, head + body)
+        yield fill_page(request, name, (body, post_ids), token)
+
+    return StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
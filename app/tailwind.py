@@ -0,0 +1,212 @@
+# app/tailwind.py
+"""
+Build-time replacement for the Tailwind Play CDN (static/tailwind.js).
+
+The Tailwind standalone CLI (the tailwindcss-bin wheel, no Node needed)
+scans settings.TAILWIND_CONTENT and emits only the utilities in use, so
+visitors download a small static stylesheet instead of running the JIT
+compiler on every page view.
+"""
+import json
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+TAILWIND_CSS_PATH = 'css/tailwind.min.css'
+
+# The templates were written against the v3 Play CDN; v4 made borders
+# default to currentColor and buttons to the default cursor. These are the
+# compatibility rules from the v4 upgrade guide.
+V3_COMPAT_CSS = '''
+@layer base {
+  *, ::after, ::before, ::backdrop, ::file-selector-button {
+    border-color: var(--color-gray-200, currentColor);
+  }
+  button:not(:disabled), [role="button"]:not(:disabled) {
+    cursor: pointer;
+  }
+}
+'''
+
+# Same extraction rule as Tailwind's content scanner: any run of characters
+# that is not whitespace, a quote or an angle bracket
+CANDIDATE_RE = re.compile(r'[^<>"\'`\s]*[^<>"\'`\s:]')
+
+# class="..." (and Alpine's :class="...") values, and the class selectors of
+# inline <style> blocks, which define the site's own non-Tailwind classes
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*(["\'])(.*?)\1', re.S)
+STYLE_BLOCK_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S)
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+
+# Leading segment of Tailwind utility names. A class starting with one of
+# these that the CLI emits no rule for is a typo or a v3 utility v4 dropped
+# (bg-opacity-*, flex-shrink-*, ...), and ships unstyled.
+UTILITY_ROOTS = frozenset('''
+    absolute accent align animate appearance aspect backdrop basis bg block blur border bottom box break
+    brightness caret clear col columns content contrast cursor decoration delay divide drop duration ease end
+    fill filter fixed flex float font from gap grayscale grid grow h hidden hue indent inline inset invert
+    isolate italic items justify leading left line list m max mb me min mix ml mr ms mt mx my object
+    opacity order origin outline overflow overscroll p pb pe pl place pointer pr ps pt px py relative resize
+    right ring rotate rounded row saturate scale scroll select self sepia shadow shrink skew snap space
+    start static sticky stroke table text top touch tracking transform transition translate truncate
+    underline uppercase lowercase capitalize via visible invisible w whitespace will z
+'''.split())
+
+# Runs static/tailwind.js in Node's V8 (the engine Chrome runs it in) with
+# just enough of a DOM for it to compile the given class attributes, and
+# times what a browser's main thread does before first paint: compile the
+# script, evaluate it, and build the stylesheet. Layout and style
+# recalculation are not included, so the numbers are a lower bound.
+PLAY_CDN_TIMER = r'''
+const fs = require('fs');
+const vm = require('vm');
+const { performance } = require('perf_hooks');
+
+const input = JSON.parse(fs.readFileSync(0, 'utf8'));
+const elements = input.classes.map((value) => ({ classList: value.split(/\s+/).filter(Boolean) }));
+const style = { textContent: '', isConnected: true };
+let build;
+class MutationObserver {
+  constructor(callback) { build = build || callback; }
+  observe() {}
+}
+const document = {
+  documentElement: {}, body: {}, head: { append() {} },
+  createElement: () => style,
+  querySelectorAll: (selector) => (selector === '[class]' ? elements : []),
+};
+const context = vm.createContext({
+  document, MutationObserver, console: { warn() {}, log() {}, error() {} },
+  setTimeout, clearTimeout, queueMicrotask, TextEncoder, TextDecoder, URL,
+});
+context.window = context.self = context;
+
+(async () => {
+  const start = performance.now();
+  const script = new vm.Script(fs.readFileSync(input.script, 'utf8'));
+  const compiled = performance.now();
+  script.runInContext(context);
+  const evaluated = performance.now();
+  await build([]);
+  const built = performance.now();
+  process.stdout.write(JSON.stringify({
+    compile_ms: compiled - start, evaluate_ms: evaluated - compiled, build_ms: built - evaluated,
+    css_bytes: style.textContent.length,
+  }));
+})();
+'''
+
+
+def cli_path():
+    """The standalone CLI: settings.TAILWIND_CLI, else the one tailwindcss-bin installs."""
+    if settings.TAILWIND_CLI:
+        return settings.TAILWIND_CLI
+    try:
+        from tailwindcss_bin import TailwindcssNotFound, find_tailwindcss_bin
+    except ImportError:
+        raise ImproperlyConfigured('Install tailwindcss-bin or set TAILWIND_CLI to a Tailwind standalone CLI')
+    try:
+        return find_tailwindcss_bin()
+    except TailwindcssNotFound as exc:
+        raise ImproperlyConfigured(f'{exc}; reinstall tailwindcss-bin or set TAILWIND_CLI')
+
+
+def content_files():
+    base = Path(settings.BASE_DIR)
+    files = set()
+    for pattern in settings.TAILWIND_CONTENT:
+        files.update(p for p in base.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def input_css():
+    base = Path(settings.BASE_DIR)
+    # source(none) turns off automatic detection, which would also scan
+    # static/, staticfiles/ and the virtualenv
+    sources = ''.join(f'@source "{(base / pattern).as_posix()}";\n' for pattern in settings.TAILWIND_CONTENT)
+    return f'@import "tailwindcss" source(none);\n{sources}{V3_COMPAT_CSS}'
+
+
+def build_css():
+    """Run the CLI and return the minified stylesheet."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = Path(tmp) / 'tailwind.css', Path(tmp) / 'tailwind.min.css'
+        source.write_text(input_css(), encoding='utf-8')
+        result = subprocess.run(
+            [cli_path(), '--input', str(source), '--output', str(target), '--minify'],
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise RuntimeError(f'tailwindcss exited with {result.returncode}: {result.stderr.strip()}')
+        return target.read_text(encoding='utf-8')
+
+
+def escape_class(name):
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+
+
+def class_attributes(paths):
+    """Class attribute values in the given files, in order."""
+    values = []
+    for path in paths:
+        values.extend(value for _, value in CLASS_ATTR_RE.findall(Path(path).read_text(encoding='utf-8')))
+    return values
+
+
+def unknown_utilities(paths, css):
+    """
+    Classes used in class attributes that look like Tailwind utilities but
+    have no rule in css, sorted.
+    """
+    classes, custom = set(), set()
+    for value in class_attributes(paths):
+        classes.update(CANDIDATE_RE.findall(value))
+    for path in paths:
+        for block in STYLE_BLOCK_RE.findall(Path(path).read_text(encoding='utf-8')):
+            custom.update(SELECTOR_CLASS_RE.findall(block))
+    unknown = []
+    for candidate in sorted(classes - custom - {'container'}):
+        utility = candidate.rsplit(':', 1)[-1].lstrip('-!')
+        if utility.split('-')[0] not in UTILITY_ROOTS:
+            continue
+        if not re.search(re.escape('.' + escape_class(candidate)) + r'(?![\w\\-])', css):
+            unknown.append(candidate)
+    return unknown
+
+
+def output_path():
+    return Path(settings.TAILWIND_BUILD_DIR) / TAILWIND_CSS_PATH
+
+
+def write_css():
+    css = build_css()
+    path = output_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists() or path.read_text(encoding='utf-8') != css:
+        path.write_text(css, encoding='utf-8')
+    return path
+
+
+def time_play_cdn(paths, runs=5):
+    """
+    Median main-thread milliseconds (compile, evaluate, build) of the Play
+    CDN styling the class attributes in paths, one cold Node process per
+    run, or None when node is not installed.
+    """
+    node = shutil.which('node')
+    if node is None:
+        return None
+    # Template syntax inside class attributes is not a class
+    classes = [re.sub(r'{[{%].*?[%}]}', ' ', value) for value in class_attributes(paths)]
+    payload = json.dumps({'script': str(Path(settings.BASE_DIR) / 'static' / 'tailwind.js'), 'classes': classes})
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([node, '-e', PLAY_CDN_TIMER], input=payload, capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
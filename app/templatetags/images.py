@@ -0,0 +1,40 @@
+# app/templatetags/images.py
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from app import images
+
+register = template.Library()
+
+
+@register.filter
+def image_url(image, width=None):
+    """{{ slide.image|image_url }} or {{ slide.image|image_url:640 }}"""
+    return images.image_url(image, width)
+
+
+@register.simple_tag
+def srcset(image, slot):
+    """{% srcset post.image 'card' %}"""
+    return images.image_srcset(image, slot)
+
+
+@register.simple_tag
+def responsive_img(image, slot, alt='', **attrs):
+    """{% responsive_img leader.image 'card' alt=leader.name class='object-fill w-full h-full' %}"""
+    widths = images.IMAGE_SLOTS[slot]['widths']
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" decoding="async"{}>',
+        images.image_url(image, widths[len(widths) // 2]),
+        images.image_srcset(image, slot),
+        images.IMAGE_SLOTS[slot]['sizes'],
+        alt,
+        format_html_join('', ' {}="{}"', attrs.items()),
+    )
+
+
+@register.simple_tag
+def background_css(selector, image, slot, overlay=''):
+    """{% background_css '.hero-bg-1' slide.image 'hero' overlay='linear-gradient(...)' %}"""
+    return mark_safe(images.background_css(selector, image, slot, overlay))
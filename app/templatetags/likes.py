@@ -0,0 +1,14 @@
+# app/templatetags/likes.py
+from django import template
+
+from app.page_cache import LIKES_PLACEHOLDER
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def like_count(context, post):
+    """{% like_count item %} - a placeholder in cached pages, filled in per response"""
+    if context.get('like_placeholders'):
+        return LIKES_PLACEHOLDER.format(post.pk)
+    return post.likes
@@ -0,0 +1,69 @@
+# app/templatetags/media.py
+import mimetypes
+import os
+from pathlib import Path
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.http import urlencode
+
+from app.preload import preload_assets
+from app.ranges import file_etag
+
+register = template.Library()
+
+
+@register.simple_tag
+def audio_url(name):
+    """{% audio_url 'bg_music (1).mp3' %} - versioned so it can be cached for a year"""
+    url = reverse('audio', args=[name])
+    path = Path(os.path.join(settings.AUDIO_ROOT, name))
+    if not path.is_file():
+        return url
+    version = file_etag(path).strip('"')[:12]
+    return f"{url}?{urlencode({'v': version})}"
+
+
+@register.simple_tag
+def preload_links():
+    """{% preload_links %} - <link rel="preload"> for every critical asset"""
+    return format_html_join(
+        '\n    ', '<link rel="preload" href="{}" as="{}"{}>',
+        ((url, kind, format_html(' media="{}"', media) if media else '') for url, kind, media in preload_assets()),
+    )
+
+
+def webp_sibling(name):
+    """The WebP sibling collectstatic made for static image `name`, if it is in the manifest."""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    if not hashed_files:
+        return None
+    sibling = f'{name}.webp'
+    return sibling if staticfiles_storage.hash_key(sibling) in hashed_files else None
+
+
+@register.simple_tag
+def background_image(name):
+    """{% background_image 'images/book.jpeg' %} - a CSS image-set() offering the WebP sibling first"""
+    webp = webp_sibling(name)
+    if webp is None:
+        return format_html('url("{}")', staticfiles_storage.url(name))
+    return format_html(
+        'image-set(url("{}") type("image/webp"), url("{}") type("{}"))',
+        staticfiles_storage.url(webp), staticfiles_storage.url(name), mimetypes.guess_type(name)[0],
+    )
+
+
+@register.simple_tag
+def static_picture(name, alt='', **attrs):
+    """{% static_picture 'lfc_logo.jpeg' alt='lfc-logo' class='rounded-full' %} - <picture> with the WebP sibling"""
+    img = format_html(
+        '<img src="{}" alt="{}"{}>', staticfiles_storage.url(name), alt, format_html_join('', ' {}="{}"', attrs.items()),
+    )
+    webp = webp_sibling(name)
+    if webp is None:
+        return img
+    return format_html('<picture><source srcset="{}" type="image/webp">{}</picture>', staticfiles_storage.url(webp), img)
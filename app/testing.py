@@ -0,0 +1,24 @@
+# app/testing.py
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The default runner with plain static files storage: tests never run
+    collectstatic, so there is no manifest for the hashed storage to read.
+    Used by every `test` command invocation, however it is started.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.storage_override = override_settings(STORAGES={
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        self.storage_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.storage_override.disable()
+        super().teardown_test_environment(**kwargs)
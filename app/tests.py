@@ -1,3 +1,1498 @@
-from django.test import TestCase
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+import cloudinary
+import cloudinary.uploader
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .counters import compact_reviews, drifted_posts, get_likes, reconcile_likes, record_like
+from .derivatives import evict, get_derivative
+from .direct_upload import DirectUploadField, upload_params, upload_url
+from .fake_cloudinary import fake_cloud
+from .images import background_css, image_srcset, image_url, pick_width, url_cache
+from .like_buffer import append_like, apply_likes, flush_likes, pending_likes
+from .like_cookie import COOKIE_NAME as LIKE_COOKIE
+from .like_filter import BloomFilter, filter_key, get_filter, maybe_liked, rebuild_like_filters
+from .management.commands.startup_profile import parse_importtime
+from .models import *
+from .page_cache import CSRF_PLACEHOLDER, get_content_version
+from .perf import QUERY_BUDGETS, regressions, seed_models
+from .ratelimit import bucket_keys, check_shared_cache, client_ip
+from . import snapshot
+from .snapshot import bump_generation, current_snapshot, rebuild_snapshot, snapshot_context
+from .storage import OptimizedStaticFilesStorage
+from .tailwind import build_css, time_play_cdn, unknown_utilities
+from .uploads import claim_photo, pending_photos, upload_photo
+
+
+def seed_content():
+    HeroSlide.objects.create(title='Welcome', subtitle='Raising teens', image='lfc_teens/hero/welcome')
+    Leader.objects.create(name='Jane', position='Pastor', description='Leads', image='lfc_teens/leaders/jane', is_counselor=True)
+    BiblePost.objects.create(scriptures='John 3:16', message='For God so loved', image='lfc_teens/bible/john')
+    Announcement.objects.create(topic='Camp', announcement='Teens camp', date='2025-12-01')
+    Testimony.objects.create(testifier='Tobi', topic='Healing', testimony='God healed me', is_approved=True)
+    MinistryUnit.objects.create(name='Choir', duty='Music', description='Sings', leader='Ada', image='lfc_teens/units/choir')
+    Belief.objects.create(name='Salvation', detail='By grace', image='lfc_teens/beliefs/grace')
+    ContactInfo.objects.create(address='Byazhin', phone_number='0901', email='a@b.com', whatsapp_number='0901', service_times='Sun')
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class HomePageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_content()
+
+    def test_repeat_visit_served_without_queries(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'John 3:16')
+
+    def test_csrf_token_injected_per_response(self):
+        self.client.get(reverse('home'))
+        response = self.client.get(reverse('home'))
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_content_change_bumps_version(self):
+        self.client.get(reverse('home'))
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Leader.objects.create(name='Musa', position='Usher', description='Serves', image='lfc_teens/leaders/musa')
+        self.assertNotEqual(get_content_version(), version)
+        self.assertContains(self.client.get(reverse('home')), 'Musa')
+
+    def test_delete_invalidates_page(self):
+        self.client.get(reverse('home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.all().delete()
+        self.assertNotContains(self.client.get(reverse('home')), 'Teens camp')
+
+    def test_like_keeps_page_and_refreshes_count(self):
+        self.client.get(reverse('home'))
+        version = get_content_version()
+        post = BiblePost.objects.get()
+        record_like(post.id, 'viewer-1')
+        self.assertEqual(get_content_version(), version)
+        # The cached HTML is reused; only the validators and like counts are read again
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, '<span>1</span>', html=False)
+        self.assertNotContains(response, '__lfc_likes_')
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheCommitTests(TransactionTestCase):
+    def test_page_rendered_before_commit_is_not_kept(self):
+        cache.clear()
+        seed_content()
+        self.client.get(reverse('home'))
+        saved, commit = threading.Event(), threading.Event()
+
+        def admin_save():
+            try:
+                with transaction.atomic():
+                    Leader.objects.create(name='Musa', position='Usher', description='Serves', image='lfc_teens/leaders/musa')
+                    saved.set()
+                    commit.wait(10)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=admin_save)
+        writer.start()
+        self.assertTrue(saved.wait(10))
+        # A visitor between the save and its commit still gets the old page
+        self.assertNotContains(self.client.get(reverse('home')), 'Musa')
+        commit.set()
+        writer.join()
+        self.assertContains(self.client.get(reverse('home')), 'Musa')
+
+
+class TailwindBuildTests(TestCase):
+    def build(self, html):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, 'page.html').write_text(html)
+            with override_settings(BASE_DIR=Path(tmp), TAILWIND_CONTENT=['*.html']):
+                return build_css()
+
+    def test_builds_used_utilities_only(self):
+        css = self.build('<p class="mb-4 md:grid-cols-2 hover:bg-red-800 bg-white/50 w-[88%] not-a-class">x</p>')
+        for selector in ('.mb-4{', '.md\\:grid-cols-2{', '.hover\\:bg-red-800:hover{', '.bg-white\\/50{', '.w-\\[88\\%\\]{'):
+            self.assertIn(selector, css)
+        self.assertNotIn('grid-cols-3', css)
+        self.assertNotIn('not-a-class', css)
+
+    def test_template_links_compiled_stylesheet(self):
+        self.assertContains(self.client.get(reverse('home')), 'css/tailwind.min.css')
+
+    def test_templates_use_only_utilities_with_rules(self):
+        call_command('build_tailwind', '--check', stdout=StringIO())
+
+    def test_utility_without_rule_is_reported(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.html') as template:
+            template.write('<style>.card-hover{}</style><p class="mb-4 card-hover bg-opacity-50 fa-heart">x</p>')
+            template.flush()
+            self.assertEqual(unknown_utilities([template.name], '.mb-40{margin:0}.mb-4{margin:0}'), ['bg-opacity-50'])
+            self.assertEqual(unknown_utilities([template.name], '.mb-40{margin:0}'), ['bg-opacity-50', 'mb-4'])
+
+    @skipUnless(shutil.which('node'), 'node is needed to run static/tailwind.js')
+    def test_play_cdn_main_thread_time_is_measured(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.html') as template:
+            template.write('<p class="mb-4 {% if x %}text-red-500{% endif %}">x</p>')
+            template.flush()
+            timings = time_play_cdn([template.name], runs=1)
+        self.assertGreater(timings['build_ms'], 0)
+        # The Play CDN really compiled the page's classes
+        self.assertGreater(timings['css_bytes'], 0)
+
+
+class LikeCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BiblePost.objects.create(scriptures='Psalm 23', message='The Lord is my shepherd', image='lfc_teens/bible/psalm')
+
+    def like(self, client=None):
+        return (client or self.client).post(reverse('add_like'), {'post_id': self.post.id})
+
+    def test_like_counts_once_per_viewer(self):
+        self.like()
+        response = self.like()
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_like_updates_only_counter_column(self):
+        self.like()
+        with CaptureQueriesContext(connection) as queries:
+            record_like(self.post.id, 'another-viewer')
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "app_biblepost"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"message"', updates[0])
+
+    def test_admin_save_keeps_concurrent_likes(self):
+        stale = BiblePost.objects.get(pk=self.post.pk)
+        record_like(self.post.id, 'meanwhile')
+        stale.message = 'He restores my soul'
+        request = RequestFactory().post('/')
+        request.user = User(is_superuser=True, is_staff=True)
+        site._registry[BiblePost].save_model(request, stale, None, change=True)
+        post = BiblePost.objects.get(pk=self.post.pk)
+        self.assertEqual((post.message, post.likes), ('He restores my soul', 1))
+
+    def test_reconcile_recomputes_from_reviews(self):
+        Review.objects.create(bible_post=self.post, reviewer=reviewer_digest('a'))
+        Review.objects.create(bible_post=self.post, reviewer=reviewer_digest('b'))
+        BiblePost.objects.filter(pk=self.post.pk).update(likes=7)
+        self.assertEqual(list(drifted_posts()), [(self.post.pk, 7, 2)])
+        call_command('reconcile_likes', stdout=StringIO())
+        self.assertEqual(get_likes(self.post.pk), 2)
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    def test_parallel_likes_lose_no_increments(self):
+        post = BiblePost.objects.create(scriptures='Acts 2', message='Pentecost', image='lfc_teens/bible/acts')
+
+        def like(n):
+            try:
+                return record_like(post.id, f'viewer-{n}')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(like, range(300)))
+
+        self.assertTrue(all(results))
+        self.assertEqual(get_likes(post.id), 300)
+        self.assertEqual(Review.objects.filter(bible_post=post).count(), 300)
+
+
+class WriteBehindLikeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.journal = Path(tmp.name) / 'likes.journal'
+        settings_override = override_settings(
+            LIKES_WRITE_BEHIND=True, LIKES_FLUSH_INTERVAL=0, LIKES_JOURNAL_PATH=str(self.journal),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.post = BiblePost.objects.create(scriptures='Ruth 1', message='Where you go', image='lfc_teens/bible/ruth')
+
+    def test_like_is_buffered_not_written(self):
+        response = self.client.post(reverse('add_like'), {'post_id': self.post.id})
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(Review.objects.count(), 0)
+        self.assertEqual(pending_likes(), 1)
+
+    def test_flush_dedupes_and_updates_each_post_once(self):
+        other = BiblePost.objects.create(scriptures='Ruth 2', message='Gleaning', image='lfc_teens/bible/ruth2')
+        for reviewer in ('a', 'b', 'b', 'c'):
+            append_like(self.post.id, reviewer)
+        append_like(other.id, 'a')
+        append_like(9999, 'ghost')
+        Review.objects.create(bible_post=self.post, reviewer=reviewer_digest('c'))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush_likes(), 3)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "app_biblepost"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(get_likes(self.post.id), 2)
+        self.assertEqual(get_likes(other.id), 1)
+        self.assertEqual(pending_likes(), 0)
+
+    def test_like_stored_meanwhile_is_not_counted_twice(self):
+        append_like(self.post.id, 'a')
+
+        def checked(post_id, reviewer_id):
+            # A synchronous record_like() lands between the check and the insert
+            record_like(post_id, reviewer_id)
+            return False
+
+        with patch('app.like_buffer.maybe_liked', checked):
+            self.assertEqual(flush_likes(), 0)
+        self.assertEqual(get_likes(self.post.id), 1)
+        self.assertEqual(Review.objects.filter(bible_post=self.post).count(), 1)
+
+    def test_leftover_batch_from_crashed_worker_is_flushed(self):
+        self.journal.parent.mkdir(parents=True, exist_ok=True)
+        (self.journal.parent / 'likes.journal.123.1.flushing').write_text(f'{self.post.id}\tcrashed\n')
+        self.assertEqual(flush_likes(), 1)
+        self.assertTrue(Review.objects.filter(reviewer=reviewer_digest('crashed')).exists())
+
+
+@override_settings(IMAGE_BACKEND='cloudinary')
+class ResponsiveImageTests(TestCase):
+    def test_resized_url_is_bounded_and_auto_formatted(self):
+        url = image_url('lfc_teens/leaders/jane', 480)
+        self.assertIn('/image/upload/c_limit,f_auto,q_auto,w_480/v1/lfc_teens/leaders/jane', url)
+        self.assertTrue(url.startswith('https://'))
+
+    def test_image_url_filter_takes_an_optional_width(self):
+        render = Template('{% load images %}{{ image|image_url }} {{ image|image_url:480 }}').render
+        plain, sized = render(Context({'image': 'lfc_teens/leaders/jane'})).split()
+        self.assertEqual(plain, image_url('lfc_teens/leaders/jane'))
+        self.assertIn('w_480', sized)
+
+    def test_srcset_lists_every_slot_width(self):
+        candidates = image_srcset('lfc_teens/bible/john', 'card').split(', ')
+        self.assertEqual([c.rsplit(' ', 1)[1] for c in candidates], ['320w', '480w', '720w', '960w', '1280w'])
+
+    def test_responsive_img_tag(self):
+        html = Template("{% load images %}{% responsive_img image 'avatar' alt=name class='w-12 h-12' %}").render(
+            Context({'image': 'lfc_teens/testimonies/tobi', 'name': 'Tobi "T"'})
+        )
+        self.assertIn('sizes="48px"', html)
+        self.assertIn('w_144/v1/lfc_teens/testimonies/tobi 144w', html)
+        self.assertIn('alt="Tobi &quot;T&quot;"', html)
+        self.assertIn('class="w-12 h-12"', html)
+        self.assertIn('loading="lazy"', html)
+
+    def test_hero_background_uses_media_queries(self):
+        css = background_css('.hero-bg-1', 'lfc_teens/hero/welcome', 'hero')
+        self.assertIn('.hero-bg-1 { background: url("', css)
+        self.assertIn('w_640/', css.splitlines()[0])
+        self.assertIn('@media (min-width: 641px)', css)
+        self.assertIn('@media (min-width: 1281px)', css)
+
+    def test_home_page_has_no_full_size_images(self):
+        seed_content()
+        response = self.client.get(reverse('home'))
+        self.assertNotContains(response, '/image/upload/v1/')
+        self.assertContains(response, 'srcset=')
+        self.assertContains(response, '.hero-bg-1 { background: linear-gradient(')
+
+    def test_pick_width_for_phone(self):
+        self.assertEqual(pick_width('card', 360, 2), 720)
+        self.assertEqual(pick_width('avatar', 48, 3), 144)
+
+
+class LocalDerivativeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media = Path(tmp.name)
+        settings_override = override_settings(
+            IMAGE_BACKEND='local', MEDIA_ROOT=str(self.media), DERIVATIVE_ROOT=str(self.media / 'derivatives'),
+            DERIVATIVE_CACHE_MAX_BYTES=10 * 1024 * 1024,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        (self.media / 'lfc_teens' / 'leaders').mkdir(parents=True)
+        Image.new('RGB', (1600, 1200), 'navy').save(self.media / 'lfc_teens' / 'leaders' / 'jane.jpg')
+
+    def test_image_url_points_at_local_derivative(self):
+        self.assertEqual(image_url('lfc_teens/leaders/jane', 480), '/img/480/lfc_teens/leaders/jane')
+        self.assertEqual(image_url('lfc_teens/leaders/jane'), '/media/lfc_teens/leaders/jane')
+
+    def test_serves_webp_when_accepted(self):
+        response = self.client.get('/img/480/lfc_teens/leaders/jane', HTTP_ACCEPT='image/avif,image/webp,*/*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Vary'], 'Accept')
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (480, 360))
+
+    def test_jpeg_fallback_and_cache_reuse(self):
+        first = get_derivative('lfc_teens/leaders/jane', 320, 'jpg')
+        self.assertTrue(first.exists())
+        self.assertEqual(get_derivative('lfc_teens/leaders/jane', 320, 'jpg'), first)
+        response = self.client.get('/img/320/lfc_teens/leaders/jane', HTTP_ACCEPT='image/*')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    def test_never_upscales(self):
+        path = get_derivative('lfc_teens/leaders/jane', 1920, 'webp')
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (1600, 1200))
+
+    def test_rejects_unknown_width_missing_image_and_traversal(self):
+        self.assertEqual(self.client.get('/img/333/lfc_teens/leaders/jane').status_code, 404)
+        self.assertEqual(self.client.get('/img/480/lfc_teens/leaders/nobody').status_code, 404)
+        self.assertEqual(self.client.get('/img/480/../../etc/passwd').status_code, 404)
+
+    def test_non_image_source_is_404(self):
+        (self.media / 'lfc_teens' / 'leaders' / 'notes.txt').write_text('not an image')
+        self.assertEqual(self.client.get('/img/480/lfc_teens/leaders/notes').status_code, 404)
+
+    def test_etag_differs_per_format(self):
+        webp = self.client.get('/img/480/lfc_teens/leaders/jane', HTTP_ACCEPT='image/webp')
+        jpeg = self.client.get('/img/480/lfc_teens/leaders/jane', HTTP_ACCEPT='image/*')
+        self.assertNotEqual(webp['ETag'], jpeg['ETag'])
+
+    def test_lru_eviction_keeps_recent_derivatives(self):
+        old = get_derivative('lfc_teens/leaders/jane', 1280, 'jpg')
+        recent = get_derivative('lfc_teens/leaders/jane', 320, 'jpg')
+        os.utime(old, (1, 1))
+        self.assertEqual(evict(recent.stat().st_size), 1)
+        self.assertFalse(old.exists())
+        self.assertTrue(recent.exists())
+
+
+@override_settings(SECTION_PAGE_SIZE=2, PAGE_CACHE_ENABLED=False)
+class SectionPaginationTests(TestCase):
+    def setUp(self):
+        self.posts = [
+            BiblePost.objects.create(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm')
+            for i in range(5)
+        ]
+
+    def test_home_renders_first_page_and_sentinel(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Psalm 4')
+        self.assertContains(response, 'Psalm 3')
+        self.assertNotContains(response, 'Psalm 2')
+        self.assertContains(response, 'hx-trigger="revealed"', count=1)
+
+    def test_fragments_walk_every_item_once(self):
+        seen, url = [], reverse('section_page', args=['posts'])
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page']
+            seen += [post.scriptures for post in page['items']]
+            url = page['next_url']
+        self.assertEqual(seen, [f'Psalm {i}' for i in range(4, -1, -1)])
+
+    def test_cursor_breaks_timestamp_ties_by_id(self):
+        BiblePost.objects.update(created_at=self.posts[0].created_at)
+        url = reverse('section_page', args=['posts'])
+        first = self.client.get(url).context['page']
+        second = self.client.get(first['next_url']).context['page']
+        self.assertEqual([p.pk for p in first['items'] + second['items']], [p.pk for p in reversed(self.posts)][:4])
+
+    def test_page_is_a_single_section_query(self):
+        # The other query is the ETag/Last-Modified lookup
+        with self.assertNumQueries(2):
+            self.client.get(reverse('section_page', args=['posts']) + '?after=2030-01-01T00:00:00%2B00:00~1')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_only_issued_cursors_are_cached(self):
+        cache.clear()
+        url = reverse('section_page', args=['posts'])
+        next_url = self.client.get(url).context['page']['next_url']
+        self.client.get(next_url)
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(next_url), 'Psalm 2')
+        # A cursor the client made up is served but never cached
+        forged = url + '?after=2030-01-01%2000:00:00%2B00:00~5'
+        self.client.get(forged)
+        with self.assertNumQueries(1):
+            self.assertContains(self.client.get(forged), 'Psalm 4')
+
+    def test_bad_cursor_and_unknown_section(self):
+        url = reverse('section_page', args=['posts'])
+        self.assertEqual(self.client.get(url, {'after': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'after': 'not-a-date~3'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('section_page', args=['leaders'])).status_code, 404)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_models(10)
+        cls.post = BiblePost.objects.order_by('pk').first()
+
+    def test_home_query_budget(self):
+        rebuild_snapshot()
+        with self.assertNumQueries(QUERY_BUDGETS['home']):
+            self.client.get(reverse('home'))
+
+    @override_settings(HOME_SNAPSHOT_ENABLED=False)
+    def test_home_queries_do_not_grow_with_rows(self):
+        with self.assertNumQueries(QUERY_BUDGETS['home_live']):
+            self.client.get(reverse('home'))
+        seed_models(40)
+        with self.assertNumQueries(QUERY_BUDGETS['home_live']):
+            self.client.get(reverse('home'))
+
+    def test_add_like_query_budget(self):
+        rebuild_like_filters()
+        form = {'post_id': self.post.id}
+        with self.assertNumQueries(QUERY_BUDGETS['add_like']):
+            self.client.post(reverse('add_like'), form)
+        with self.assertNumQueries(QUERY_BUDGETS['add_like_repeat']):
+            self.client.post(reverse('add_like'), form)
+
+
+class RegressionThresholdTests(TestCase):
+    def run_result(self, p50, queries=None):
+        stats = {'p50_ms': p50, 'p95_ms': p50 * 2}
+        return {'view': stats, 'render': stats, 'queries': queries or {'home': QUERY_BUDGETS['home']}}
+
+    def test_within_threshold_passes(self):
+        self.assertEqual(regressions({'10': self.run_result(11)}, {'10': self.run_result(10)}, 0.25), [])
+
+    def test_slowdown_beyond_threshold_fails(self):
+        problems = regressions({'10': self.run_result(13)}, {'10': self.run_result(10)}, 0.25)
+        self.assertEqual(len(problems), 4)
+        self.assertIn('view p50_ms 10.00 -> 13.00 ms', problems[0])
+
+    def test_query_budget_is_checked_without_baseline(self):
+        problems = regressions({'10': self.run_result(5, {'home': QUERY_BUDGETS['home'] + 1})}, {}, 0.25)
+        self.assertEqual(len(problems), 1)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Postgres seq-scans tables this small regardless of indexes')
+@override_settings(PAGE_CACHE_ENABLED=False)
+class HomeQueryPlanTests(TestCase):
+    def test_section_queries_use_partial_indexes(self):
+        seed_content()
+        out = StringIO()
+        call_command('explain_home', stdout=out)
+        output = out.getvalue()
+        for index in ('biblepost_active_recent_idx', 'announce_active_recent_idx', 'testimony_approved_recent_idx',
+                      'leader_active_order_idx', 'unit_active_order_idx', 'belief_active_order_idx'):
+            self.assertIn(index, output)
+        # ContactInfo is a single row read by rowid with LIMIT 1; any other
+        # scan, the validator query's included, is a missing index
+        scans = [line.split()[1] for line in output.splitlines() if line.endswith('<- full scan')]
+        self.assertEqual(scans, ['app_contactinfo'])
+
+    def test_built_snapshot_does_not_hide_section_queries(self):
+        seed_content()
+        rebuild_snapshot()
+        out = StringIO()
+        call_command('explain_home', stdout=out)
+        self.assertIn('biblepost_active_recent_idx', out.getvalue())
+        self.assertIn('leader_active_order_idx', out.getvalue())
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class HomeSnapshotTests(TestCase):
+    def setUp(self):
+        seed_content()
+
+    def test_snapshot_renders_same_page_from_one_read(self):
+        with override_settings(HOME_SNAPSHOT_ENABLED=False):
+            live = self.client.get(reverse('home')).content
+        rebuild_snapshot()
+        with self.assertNumQueries(QUERY_BUDGETS['home']):
+            snapshot = self.client.get(reverse('home')).content
+        strip = lambda html: re.sub(rb'name="csrfmiddlewaretoken" value="[^"]+"', b'', html)
+        self.assertEqual(strip(snapshot), strip(live))
+
+    def test_image_urls_are_prebuilt(self):
+        rebuild_snapshot()
+        leader = snapshot_context()['leaders'][0]
+        self.assertIn(480, leader.image.urls)
+        with patch.object(CloudinaryResource, 'build_url', side_effect=AssertionError):
+            self.assertTrue(image_url(leader.image, 480))
+
+    def test_missing_snapshot_falls_back_without_writing(self):
+        self.assertFalse(HomeSnapshot.objects.exists())
+        self.assertContains(self.client.get(reverse('home')), 'John 3:16')
+        self.assertFalse(HomeSnapshot.objects.exists())
+        call_command('rebuild_snapshot', stdout=StringIO())
+        self.assertIsNotNone(current_snapshot())
+
+    def test_save_rebuilds_only_affected_sections(self):
+        rebuild_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            Belief.objects.create(name='Holiness', detail='Be holy', image='lfc_teens/beliefs/holy')
+        context = snapshot_context()
+        self.assertEqual([b.name for b in context['belief']], ['Salvation', 'Holiness'])
+        self.assertEqual(context['leaders'][0].name, 'Jane')
+
+    def test_like_leaves_snapshot_and_reads_live_count(self):
+        rebuild_snapshot()
+        post = BiblePost.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            record_like(post.id, 'viewer-1')
+        self.assertFalse(any('app_homesnapshot' in q['sql'] for q in queries))
+        self.assertIsNotNone(current_snapshot())
+        self.assertEqual(snapshot_context()['bible_post']['items'][0].likes, 1)
+
+    def test_behind_snapshot_is_not_written_by_home(self):
+        rebuild_snapshot()
+        bump_generation()
+        self.assertContains(self.client.get(reverse('home')), 'John 3:16')
+        snapshot = HomeSnapshot.objects.get()
+        self.assertEqual((snapshot.generation, snapshot.built_generation), (2, 1))
+
+    def test_change_during_rebuild_keeps_snapshot_behind(self):
+        rebuild_snapshot()
+        bump_generation()
+        dump_section = snapshot.dump_section
+
+        def dump_during_edit(name, value):
+            if name == 'contact_info':
+                # Another edit commits while the rebuild reads live data
+                bump_generation()
+            return dump_section(name, value)
+
+        with patch('app.snapshot.dump_section', dump_during_edit):
+            self.assertFalse(rebuild_snapshot())
+        self.assertIsNone(current_snapshot())
+        self.assertTrue(rebuild_snapshot())
+        self.assertIsNotNone(current_snapshot())
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_content()
+
+    def test_validators_and_cache_control(self):
+        response = self.client.get(reverse('home'))
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_matching_etag_is_304_without_queries(self):
+        etag = self.client.get(reverse('home'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    @override_settings(PAGE_CACHE_ENABLED=False)
+    def test_304_skips_section_queries(self):
+        # Build the snapshot first: its built_at feeds Last-Modified
+        rebuild_snapshot()
+        last_modified = self.client.get(reverse('home'))['Last-Modified']
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('home'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_and_delete_change_etag(self):
+        etag = self.client.get(reverse('home'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Leader.objects.filter(name='Jane').get().save()
+        edited = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(edited.status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            Testimony.objects.all().delete()
+        self.assertNotEqual(self.client.get(reverse('home'))['ETag'], edited['ETag'])
+
+    def test_like_changes_etag(self):
+        etag = self.client.get(reverse('home'))['ETag']
+        record_like(BiblePost.objects.get().id, 'viewer-1')
+        self.assertEqual(self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_fragments_are_conditional(self):
+        url = reverse('section_page', args=['posts'])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class AudioRangeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data = bytes(range(256)) * 1000
+        Path(tmp.name, 'hymn.mp3').write_bytes(self.data)
+        settings_override = override_settings(AUDIO_ROOT=Path(tmp.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = reverse('audio', args=['hymn.mp3'])
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_response_advertises_ranges(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertFalse(response['ETag'].startswith('W/'))
+
+    def test_byte_range(self):
+        response, body = self.get(HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(body, self.data[100:200])
+
+    def test_suffix_and_open_ended_ranges(self):
+        response, body = self.get(HTTP_RANGE='bytes=-500')
+        self.assertEqual(response['Content-Range'], f'bytes {len(self.data) - 500}-{len(self.data) - 1}/{len(self.data)}')
+        self.assertEqual(body, self.data[-500:])
+        response, body = self.get(HTTP_RANGE=f'bytes=-{len(self.data) * 2}')
+        self.assertEqual(body, self.data)
+        response, body = self.get(HTTP_RANGE='bytes=255000-')
+        self.assertEqual(body, self.data[255000:])
+
+    def test_multi_chunk_reads_reassemble_file(self):
+        chunks, start, step = [], 0, 70000
+        while start < len(self.data):
+            response, body = self.get(HTTP_RANGE=f'bytes={start}-{start + step - 1}')
+            self.assertEqual(response.status_code, 206)
+            chunks.append(body)
+            start += step
+        self.assertEqual(b''.join(chunks), self.data)
+
+    def test_unsatisfiable_ranges_are_416(self):
+        for header in (f'bytes={len(self.data)}-', 'bytes=-0'):
+            response, _ = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_malformed_or_multiple_ranges_send_whole_file(self):
+        for header in ('bytes=5-1', 'items=0-5', 'bytes=0-1,5-6'):
+            response, body = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 200, header)
+            self.assertEqual(body, self.data)
+
+    def test_if_range_and_if_none_match(self):
+        etag = self.get()[0]['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)[0].status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')[0].status_code, 200)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+
+    def test_traversal_is_404(self):
+        self.assertEqual(self.client.get('/audio/../settings.py').status_code, 404)
+
+    def test_player_has_no_source_until_played(self):
+        seed_content()
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'preload="none"')
+        self.assertNotContains(response, '<source src=')
+
+
+class StaticImageOptimizationTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = FileSystemStorage(location=Path(tmp.name) / 'src')
+        self.storage = OptimizedStaticFilesStorage(location=Path(tmp.name) / 'out', base_url='/static/')
+        photo = BytesIO()
+        Image.radial_gradient('L').convert('RGB').resize((400, 300)).save(photo, 'JPEG', quality=90)
+        logo = BytesIO()
+        Image.new('RGBA', (64, 64), (200, 30, 30, 255)).save(logo, 'PNG')
+        for name, data in (('images/photo.jpg', photo), ('images/logo.png', logo), ('app.css', BytesIO(b'body{}'))):
+            self.source.save(name, data)
+
+    def collect(self):
+        paths = {}
+        for name in ('images/photo.jpg', 'images/logo.png', 'app.css'):
+            self.storage.delete(name)
+            with self.source.open(name) as fh:
+                self.storage.save(name, fh)
+            paths[name] = (self.source, name)
+        return [name for name, _, _ in self.storage.post_process(paths) if name.startswith('images/')]
+
+    def test_images_are_optimized_with_webp_siblings(self):
+        self.collect()
+        manifest = self.storage.load_image_manifest()
+        self.assertEqual(set(manifest), {'images/photo.jpg', 'images/logo.png'})
+        photo = manifest['images/photo.jpg']
+        self.assertLessEqual(photo['optimized'], photo['original'])
+        hashed = self.storage.stored_name('images/photo.jpg')
+        for name in ('images/photo.jpg', hashed):
+            self.assertEqual(self.storage.size(name), photo['optimized'])
+            with Image.open(self.storage.path(f'{name}.webp')) as webp:
+                self.assertEqual((webp.format, webp.size), ('WEBP', (400, 300)))
+        with Image.open(self.storage.path(hashed)) as optimized, Image.open(self.source.path('images/photo.jpg')) as original:
+            self.assertEqual(optimized.size, original.size)
+
+    def test_webp_siblings_are_in_the_manifest(self):
+        self.collect()
+        hashed = self.storage.stored_name('images/photo.jpg')
+        reloaded = OptimizedStaticFilesStorage(location=self.storage.location, base_url='/static/')
+        self.assertEqual(reloaded.stored_name('images/photo.jpg.webp'), f'{hashed}.webp')
+        self.assertTrue(reloaded.exists(f'{hashed}.webp'))
+        with patch('app.templatetags.media.staticfiles_storage', reloaded):
+            css = Template("{% load media %}{% background_image 'images/photo.jpg' %}").render(Context())
+        self.assertEqual(
+            css, f'image-set(url("/static/{hashed}.webp") type("image/webp"), url("/static/{hashed}") type("image/jpeg"))',
+        )
+
+    def test_background_without_manifest_is_plain_url(self):
+        css = Template("{% load media %}{% background_image 'images/book.jpeg' %}").render(Context())
+        self.assertEqual(css, 'url("/static/images/book.jpeg")')
+
+    @patch('app.storage.shutil.which', return_value=None)
+    def test_jpeg_left_untouched_without_jpegtran(self, which):
+        self.collect()
+        with self.source.open('images/photo.jpg') as fh:
+            self.assertEqual(self.storage.open('images/photo.jpg').read(), fh.read())
+
+    def test_png_round_trip_is_lossless(self):
+        self.collect()
+        with Image.open(self.storage.path('images/logo.png')) as optimized, Image.open(self.source.path('images/logo.png')) as original:
+            self.assertEqual(optimized.convert('RGBA').tobytes(), original.convert('RGBA').tobytes())
+
+    def test_unchanged_images_are_skipped(self):
+        self.collect()
+        with patch('app.storage.optimize_image') as optimize:
+            self.collect()
+        optimize.assert_not_called()
+
+
+@override_settings(HOME_STREAMING=True, PAGE_CACHE_ENABLED=False)
+class StreamingHomeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed_content()
+
+    def normalize(self, html):
+        html = re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', '', html)
+        return [line for line in html.splitlines() if line.strip()]
+
+    def test_head_with_preload_links_is_first_chunk(self):
+        response = self.client.get(reverse('home'))
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[0].rstrip().endswith('</head>'))
+        self.assertIn('rel="preload"', chunks[0])
+        self.assertIn('John 3:16', chunks[1])
+
+    def test_streamed_page_matches_buffered_page(self):
+        # The first render records the hero for later heads
+        b''.join(self.client.get(reverse('home')).streaming_content)
+        streamed = b''.join(self.client.get(reverse('home')).streaming_content).decode()
+        with override_settings(HOME_STREAMING=False):
+            buffered = self.client.get(reverse('home')).content.decode()
+        self.assertNotIn(CSRF_PLACEHOLDER, streamed)
+        self.assertEqual(self.normalize(streamed), self.normalize(buffered))
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_cached_page_served_whole(self):
+        b''.join(self.client.get(reverse('home')).streaming_content)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'John 3:16')
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+
+    def test_hero_preloaded_after_first_render(self):
+        b''.join(self.client.get(reverse('home')).streaming_content)
+        head = next(iter(self.client.get(reverse('home')).streaming_content)).decode()
+        self.assertIn('as="image"', head)
+        self.assertIn('lfc_teens/hero/welcome', head)
+
+    def test_link_header_on_home_only(self):
+        link = self.client.get(reverse('home'))['Link']
+        self.assertIn('rel=preload; as=style', link)
+        self.assertIn('rel=preload; as=script', link)
+        fragment = self.client.get(reverse('section_page', args=['posts']))
+        self.assertNotIn('Link', fragment)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+class SQLiteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('cache_size'), -20000)
+
+    def test_writes_begin_immediate(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class SignedLikeCookieTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BiblePost.objects.create(scriptures='Psalm 23', message='The Lord is my shepherd', image='lfc_teens/bible/psalm')
+
+    def like(self, post=None, **data):
+        return self.client.post(reverse('add_like'), {'post_id': (post or self.post).id, **data})
+
+    def test_no_session_row_for_anonymous_likes(self):
+        self.like()
+        self.assertEqual(Session.objects.count(), 0)
+        self.assertNotIn('sessionid', self.client.cookies)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_repeat_click_only_reads_the_count(self):
+        self.like()
+        with self.assertNumQueries(1):
+            response = self.like()
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_repeat_click_ignores_posted_count(self):
+        self.like()
+        response = self.like(likes='9999')
+        self.assertContains(response, '<span>1</span>')
+        self.assertNotContains(response, '9999')
+
+    def test_tampered_cookie_is_ignored(self):
+        self.like()
+        value = self.client.cookies[LIKE_COOKIE].value
+        viewer, _, rest = value.partition(':')
+        # Add a post to the signed ID list without re-signing
+        other = BiblePost.objects.create(scriptures='Ruth 1', message='Where you go', image='lfc_teens/bible/ruth')
+        self.client.cookies[LIKE_COOKIE] = value.replace(f'{viewer}:', f'{viewer}:{other.id:x}.', 1)
+        response = self.like(other)
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(BiblePost.objects.get(pk=other.pk).likes, 1)
+
+    @override_settings(LIKES_COOKIE_MAX_IDS=300, RATE_LIMIT_ENABLED=False)
+    def test_cookie_stays_under_size_limit(self):
+        posts = BiblePost.objects.bulk_create([
+            BiblePost(scriptures=f'Psalm {i}', message='Selah', image='lfc_teens/bible/psalm') for i in range(350)
+        ])
+        for post in posts:
+            self.like(post)
+        cookie = self.client.cookies[LIKE_COOKIE]
+        self.assertLess(len(cookie.OutputString()), 4096)
+        # Only the most recent likes are remembered; older ones fall back to the database
+        with self.assertNumQueries(1):
+            self.like(posts[-1])
+        self.assertContains(self.like(posts[0]), '<span>1</span>')
+        self.assertEqual(Review.objects.filter(bible_post=posts[0]).count(), 1)
+
+    @override_settings(LIKES_SIGNED_COOKIE=False)
+    def test_session_mode_still_dedupes(self):
+        self.like()
+        self.assertContains(self.like(), '<span>1</span>')
+        self.assertEqual(Session.objects.count(), 1)
+
+
+@override_settings(LIKES_SIGNED_COOKIE=False, LIKE_FILTER_FP_RATE=0.01, LIKE_FILTER_MIN_CAPACITY=16)
+class LikeFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BiblePost.objects.create(scriptures='Psalm 23', message='The Lord is my shepherd', image='lfc_teens/bible/psalm')
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(10000, 0.01)
+        for i in range(10000):
+            bloom.add(f'member-{i}')
+        self.assertTrue(all(f'member-{i}' in bloom for i in range(10000)))
+        false_positives = sum(f'stranger-{i}' in bloom for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+        self.assertLess(len(bloom.bits), 12 * 1024)
+
+    def test_built_from_reviews(self):
+        Review.objects.create(bible_post=self.post, reviewer=reviewer_digest('a'))
+        self.assertEqual(rebuild_like_filters(), 1)
+        bloom = cache.get(filter_key(self.post.id))
+        self.assertIn(reviewer_digest('a'), bloom)
+        self.assertNotIn(reviewer_digest('b'), bloom)
+
+    def test_new_viewer_skips_review_lookup(self):
+        rebuild_like_filters()
+        get_filter(self.post.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('add_like'), {'post_id': self.post.id})
+        self.assertFalse([q for q in queries if 'SELECT 1 AS "a" FROM "app_review"' in q['sql']])
+        self.assertIn(Review.objects.get().reviewer, get_filter(self.post.id))
+
+    def test_repeat_like_confirmed_against_database(self):
+        self.client.post(reverse('add_like'), {'post_id': self.post.id})
+        response = self.client.post(reverse('add_like'), {'post_id': self.post.id})
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_stale_filter_never_inflates_the_counter(self):
+        record_like(self.post.id, 'v')
+        # A filter that has lost the like, e.g. rebuilt before it committed
+        cache.set(filter_key(self.post.id), BloomFilter(16, 0.01), None)
+        self.assertFalse(maybe_liked(self.post.id, 'v'))
+        self.assertEqual(apply_likes({(self.post.id, 'v')}), 0)
+        self.assertEqual(get_likes(self.post.id), 1)
+        self.assertEqual(Review.objects.filter(bible_post=self.post).count(), 1)
+
+    def test_full_filter_is_rebuilt_larger(self):
+        self.assertEqual(get_filter(self.post.id).capacity, 16)
+        for i in range(20):
+            record_like(self.post.id, f'viewer-{i}')
+        bloom = get_filter(self.post.id)
+        self.assertEqual(bloom.capacity, 40)
+        self.assertTrue(all(reviewer_digest(f'viewer-{i}') in bloom for i in range(20)))
+
+
+class ReviewCompactionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.old = BiblePost.objects.create(scriptures='Genesis 1', message='In the beginning', image='lfc_teens/bible/gen')
+        BiblePost.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timezone.timedelta(days=400))
+        self.new = BiblePost.objects.create(scriptures='Psalm 23', message='The Lord is my shepherd', image='lfc_teens/bible/psalm')
+        for post in (self.old, self.new):
+            for reviewer in ('a', 'b', 'c'):
+                record_like(post.id, reviewer)
+
+    def test_reviewer_stored_as_unique_digest(self):
+        review = Review.objects.filter(bible_post=self.new).first()
+        self.assertIsInstance(review.reviewer, int)
+        with self.assertRaises(IntegrityError):
+            Review.objects.create(bible_post=self.new, reviewer=reviewer_digest('a'))
+
+    def test_old_posts_folded_into_counter(self):
+        self.assertEqual(compact_reviews(timezone.now() - timezone.timedelta(days=90)), (1, 3))
+        self.assertFalse(Review.objects.filter(bible_post=self.old).exists())
+        self.assertEqual(Review.objects.filter(bible_post=self.new).count(), 3)
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.likes, self.old.folded_likes), (3, 3))
+
+    def test_reconcile_counts_folded_likes(self):
+        compact_reviews(timezone.now() - timezone.timedelta(days=90))
+        record_like(self.old.id, 'd')
+        self.assertEqual(list(drifted_posts()), [])
+        reconcile_likes()
+        self.assertEqual(get_likes(self.old.id), 4)
+        self.assertEqual(get_likes(self.new.id), 3)
+
+    def test_folded_reviewers_still_deduplicated(self):
+        compact_reviews(timezone.now() - timezone.timedelta(days=90))
+        self.assertIn(reviewer_digest('b'), self.old.folded_reviews)
+        self.assertFalse(record_like(self.old.id, 'a'))
+        self.assertEqual(apply_likes({(self.old.id, 'b'), (self.old.id, 'd')}), 1)
+        self.assertEqual(get_likes(self.old.id), 4)
+        self.assertEqual(list(drifted_posts()), [])
+
+    @override_settings(LIKES_SIGNED_COOKIE=False)
+    def test_repeat_like_on_folded_post_rejected_without_cookie(self):
+        client = Client()
+        client.post(reverse('add_like'), {'post_id': self.old.id})
+        compact_reviews(timezone.now() - timezone.timedelta(days=90))
+        response = client.post(reverse('add_like'), {'post_id': self.old.id})
+        self.assertContains(response, '<span>4</span>')
+        self.assertEqual(get_likes(self.old.id), 4)
+
+    def test_admin_cannot_edit_folded_likes(self):
+        post_admin = site._registry[BiblePost]
+        request = RequestFactory().get('/')
+        request.user = User(is_superuser=True, is_staff=True)
+        form = post_admin.get_form(request, self.old)
+        self.assertNotIn('folded_likes', form.base_fields)
+        self.assertIn('folded_likes', post_admin.get_readonly_fields(request, self.old))
+
+    def test_compacting_again_merges_reviewers(self):
+        before = timezone.now() - timezone.timedelta(days=90)
+        compact_reviews(before)
+        record_like(self.old.id, 'd')
+        self.assertEqual(compact_reviews(before), (1, 1))
+        folded = FoldedReviews.objects.get(pk=self.old.pk)
+        self.assertEqual(sorted(folded.digests()), sorted(reviewer_digest(r) for r in 'abcd'))
+        self.assertFalse(record_like(self.old.id, 'a'))
+        self.assertFalse(record_like(self.old.id, 'd'))
+
+
+@override_settings(
+    RATE_LIMIT_ENABLED=True, RATE_LIMIT_PROXY_COUNT=0,
+    RATE_LIMITS={'add_like': {'ip': (5, 1.0), 'session': (3, 0.5)}},
+)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BiblePost.objects.create(scriptures='Psalm 23', message='The Lord is my shepherd', image='lfc_teens/bible/psalm')
+
+    def like(self, ip='10.0.0.1', client=None):
+        # A fresh client has no cookies, so only its IP bucket applies
+        return (client or Client()).post(reverse('add_like'), {'post_id': self.post.id}, REMOTE_ADDR=ip)
+
+    def test_burst_then_429_without_queries(self):
+        with patch('app.ratelimit.time.time', return_value=1000.0):
+            for _ in range(5):
+                self.assertEqual(self.like().status_code, 200)
+            with self.assertNumQueries(0):
+                response = self.like()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_bucket_refills(self):
+        with patch('app.ratelimit.time.time', return_value=1000.0):
+            for _ in range(5):
+                self.like()
+            self.assertEqual(self.like().status_code, 429)
+        with patch('app.ratelimit.time.time', return_value=1002.0):
+            self.assertEqual(self.like().status_code, 200)
+            self.assertEqual(self.like().status_code, 200)
+            self.assertEqual(self.like().status_code, 429)
+
+    def test_ips_have_separate_buckets(self):
+        with patch('app.ratelimit.time.time', return_value=1000.0):
+            for _ in range(5):
+                self.like('10.0.0.1')
+            self.assertEqual(self.like('10.0.0.1').status_code, 429)
+            self.assertEqual(self.like('10.0.0.2').status_code, 200)
+
+    def test_session_bucket_follows_client_across_ips(self):
+        with patch('app.ratelimit.time.time', return_value=1000.0):
+            # The first like sets the signed like cookie that identifies the visitor
+            for i in range(4):
+                self.assertEqual(self.like(f'10.0.1.{i}', self.client).status_code, 200)
+            response = self.like('10.0.1.9', self.client)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_session_cookie_not_stored_in_cache_keys(self):
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'secret-session-key'
+        keys = bucket_keys('add_like', request)
+        self.assertEqual(len(keys), 2)
+        self.assertFalse(any('secret-session-key' in key for key in keys))
+
+    @override_settings(DEBUG=False)
+    def test_warns_on_per_process_cache(self):
+        with self.assertLogs('app.ratelimit', 'WARNING'):
+            self.assertFalse(check_shared_cache())
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=shared), self.assertNoLogs('app.ratelimit'):
+            self.assertTrue(check_shared_cache())
+
+    @override_settings(RATE_LIMIT_PROXY_COUNT=1)
+    def test_forwarded_for_uses_proxy_appended_address(self):
+        request = RequestFactory().post('/', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+
+
+
+@override_settings(IMAGE_BACKEND='local', RATE_LIMIT_ENABLED=False, UPLOAD_WORKERS=2)
+class TestimonyIntakeTests(TransactionTestCase):
+    # Transactional so the upload thread's own connection sees the committed row
+    UPLOAD_DELAY = 0.5
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # MEDIA_ROOT is the local stand-in for Cloudinary
+        self.media = Path(tmp.name) / 'media'
+        self.spool = Path(tmp.name) / 'spool'
+        overrides = override_settings(MEDIA_ROOT=str(self.media), UPLOAD_SPOOL_DIR=str(self.spool))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def photo(self):
+        out = BytesIO()
+        Image.new('RGB', (40, 30), 'gold').save(out, 'JPEG')
+        return SimpleUploadedFile('me.jpg', out.getvalue(), content_type='image/jpeg')
+
+    def submit(self, **extra):
+        data = {'testifier': 'Ada', 'topic': 'Provision', 'testimony': 'God provided', **extra}
+        return self.client.post(reverse('submit_testimony'), data)
+
+    def slow_store(self, delay):
+        from .uploads import store_image
+
+        def store(*args):
+            time.sleep(delay)
+            return store_image(*args)
+        return patch('app.uploads.store_image', side_effect=store)
+
+    def wait_for_uploads(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while any(self.spool.glob('*')) and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+    def test_stores_pending_testimony(self):
+        response = self.submit()
+        self.assertContains(response, 'Thank you, Ada!')
+        testimony = Testimony.objects.get()
+        self.assertEqual((testimony.topic, testimony.is_approved, testimony.image), ('Provision', False, None))
+
+    def test_invalid_submission_returns_form_with_errors(self):
+        response = self.submit(testimony='')
+        self.assertContains(response, 'This field is required.')
+        self.assertContains(response, 'value="Ada"')
+        self.assertFalse(Testimony.objects.exists())
+
+    def test_rejects_non_image_photo(self):
+        response = self.submit(photo=SimpleUploadedFile('me.jpg', b'not an image'))
+        self.assertContains(response, 'Upload a valid image.')
+        self.assertFalse(Testimony.objects.exists())
+
+    def test_latency_does_not_depend_on_upload_time(self):
+        with self.slow_store(self.UPLOAD_DELAY):
+            start = time.perf_counter()
+            response = self.submit(photo=self.photo())
+            elapsed = time.perf_counter() - start
+            self.assertContains(response, 'Thank you')
+            self.assertIsNone(Testimony.objects.get().image)
+            self.wait_for_uploads()
+
+        self.assertLess(elapsed, self.UPLOAD_DELAY)
+        image = Testimony.objects.get().image
+        self.assertTrue(str(image).startswith('lfc_teens/testimonies/'))
+        self.assertTrue((self.media / f'{image.public_id}.{image.format}').is_file())
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_upload_photos_command_drains_spool(self):
+        self.submit(photo=self.photo())
+        self.assertEqual(len(list(self.spool.iterdir())), 1)
+
+        out = StringIO()
+        call_command('upload_photos', stdout=out)
+        self.assertIn('1 photo(s) uploaded, 0 failed', out.getvalue())
+        self.assertIsNotNone(Testimony.objects.get().image)
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_photo_of_approved_testimony_reaches_home_page(self):
+        cache.clear()
+        self.submit(photo=self.photo())
+        testimony = Testimony.objects.get()
+        testimony.is_approved = True
+        testimony.save()
+        rebuild_snapshot()
+        before = self.client.get(reverse('home'))
+        call_command('upload_photos', stdout=StringIO())
+        image = Testimony.objects.get().image
+        after = self.client.get(reverse('home'))
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertContains(after, image.public_id)
+        self.assertEqual(self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=before['ETag']).status_code, 200)
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_half_written_photo_is_left_alone(self):
+        self.spool.mkdir(parents=True)
+        part = self.spool / '1-abc.jpg.part'
+        part.write_bytes(b'half a JPEG')
+        out = StringIO()
+        call_command('upload_photos', stdout=out)
+        self.assertIn('0 photo(s) uploaded, 0 failed', out.getvalue())
+        self.assertTrue(part.exists())
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_claimed_photo_is_uploaded_once(self):
+        self.submit(photo=self.photo())
+        [path] = pending_photos()
+        claimed = claim_photo(path)
+        self.assertFalse(upload_photo(path))
+        out = StringIO()
+        call_command('upload_photos', stdout=out)
+        self.assertIn('0 photo(s) uploaded', out.getvalue())
+        self.assertEqual(list(self.spool.iterdir()), [claimed])
+        self.assertIsNone(Testimony.objects.get().image)
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_failed_upload_releases_claim(self):
+        self.submit(photo=self.photo())
+        err = StringIO()
+        with patch('app.uploads.store_image', side_effect=OSError('Cloudinary is down')):
+            call_command('upload_photos', stdout=StringIO(), stderr=err)
+        self.assertIn('Cloudinary is down', err.getvalue())
+        self.assertEqual(len(pending_photos()), 1)
+
+    @override_settings(UPLOAD_WORKERS=0, UPLOAD_CLAIM_TIMEOUT=60)
+    def test_stale_claim_is_retried(self):
+        self.submit(photo=self.photo())
+        claimed = claim_photo(pending_photos()[0])
+        os.utime(claimed, (time.time() - 120,) * 2)
+        out = StringIO()
+        call_command('upload_photos', stdout=out)
+        self.assertIn('1 photo(s) uploaded, 0 failed', out.getvalue())
+        self.assertIsNotNone(Testimony.objects.get().image)
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    @override_settings(UPLOAD_WORKERS=0)
+    def test_photo_of_deleted_testimony_is_dropped(self):
+        self.submit(photo=self.photo())
+        Testimony.objects.all().delete()
+        call_command('upload_photos', stdout=StringIO())
+        self.assertEqual(list(self.spool.iterdir()), [])
+        self.assertFalse(self.media.exists())
+
+
+@override_settings(IMAGE_BACKEND='local')
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # MEDIA_ROOT is where the local stand-in for Cloudinary stores uploads
+        self.media = Path(tmp.name)
+        overrides = override_settings(MEDIA_ROOT=str(self.media))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.admin = User.objects.create_superuser('media', 'media@example.com', 'pw')
+        self.client.force_login(self.admin)
+
+    def picker(self, url):
+        # The signed parameters the admin page hands to direct_upload.js
+        html = self.client.get(url).content.decode()
+        match = re.search(r'data-url="([^"]+)" data-params="([^"]+)"', html)
+        return match[1], json.loads(unescape(match[2]))
+
+    def upload(self, params, name='grace.png'):
+        out = BytesIO()
+        Image.new('RGB', (30, 20), 'navy').save(out, 'PNG')
+        return self.client.post(reverse('local_upload'), {**params, 'file': SimpleUploadedFile(name, out.getvalue())})
+
+    def belief_form(self, image):
+        return {'name': 'Grace', 'detail': 'Saved by grace', 'image': image, 'order': 0, 'is_active': 'on'}
+
+    def test_admin_records_public_id_of_direct_upload(self):
+        url, params = self.picker(reverse('admin:app_belief_add'))
+        self.assertEqual(url, reverse('local_upload'))
+        self.assertEqual(params['folder'], 'lfc_teens/beliefs')
+
+        result = self.upload(params).json()
+        self.assertTrue(result['public_id'].startswith('lfc_teens/beliefs/'))
+        self.assertTrue((self.media / f"{result['public_id']}.png").is_file())
+
+        value = f"image/upload/v{result['version']}/{result['public_id']}.png#{result['signature']}"
+        response = self.client.post(reverse('admin:app_belief_add'), self.belief_form(value))
+        self.assertEqual(response.status_code, 302)
+        image = Belief.objects.get().image
+        self.assertEqual((image.public_id, image.format, image.version), (result['public_id'], 'png', str(result['version'])))
+
+    def test_change_form_posts_no_file(self):
+        belief = Belief.objects.create(name='Grace', detail='By grace', image='lfc_teens/beliefs/grace')
+        html = self.client.get(reverse('admin:app_belief_change', args=[belief.pk])).content.decode()
+        self.assertNotIn('multipart/form-data', html)
+        self.assertIn('direct_upload.js', html)
+
+        # The current image comes back signed, so other fields save untouched
+        value = unescape(re.search(r'type="hidden" name="image" id="id_image" value="([^"]+)"', html)[1])
+        response = self.client.post(
+            reverse('admin:app_belief_change', args=[belief.pk]), {**self.belief_form(value), 'detail': 'Changed'},
+        )
+        self.assertEqual(response.status_code, 302)
+        belief.refresh_from_db()
+        self.assertEqual((belief.detail, belief.image.public_id), ('Changed', 'lfc_teens/beliefs/grace'))
+
+    def test_forged_public_id_is_rejected(self):
+        response = self.client.post(
+            reverse('admin:app_belief_add'), self.belief_form('image/upload/v1/lfc_teens/beliefs/someone-else.png#bad'),
+        )
+        self.assertContains(response, 'The upload could not be verified.')
+        self.assertFalse(Belief.objects.exists())
+
+    def test_stand_in_rejects_tampered_or_expired_params(self):
+        _, params = self.picker(reverse('admin:app_belief_add'))
+        self.assertEqual(self.upload({**params, 'folder': 'elsewhere'}).status_code, 401)
+        with patch('app.direct_upload.time.time', return_value=params['timestamp'] + 3601):
+            self.assertEqual(self.upload(params).status_code, 401)
+        self.assertEqual(list(self.media.iterdir()), [])
+
+    def test_stand_in_rejects_non_images(self):
+        _, params = self.picker(reverse('admin:app_belief_add'))
+        response = self.client.post(reverse('local_upload'), {**params, 'file': SimpleUploadedFile('x.png', b'nope')})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['message'], 'Invalid image file')
+
+
+@override_settings(IMAGE_BACKEND='cloudinary', IMAGE_URL_CACHE_SIZE=100)
+class ImageURLCacheTests(TestCase):
+    def setUp(self):
+        url_cache.clear()
+        self.addCleanup(url_cache.clear)
+
+    def test_url_is_built_once(self):
+        leader = Leader.objects.create(name='Jane', position='Pastor', description='Leads', image='lfc_teens/leaders/jane')
+        with patch.object(CloudinaryResource, 'build_url', autospec=True, side_effect=lambda *a, **kw: 'u') as build:
+            urls = {
+                leader.image_url(480),
+                image_url(leader.image, 480),
+                Template('{% load images %}{{ leader.image|image_url:480 }}').render(Context({'leader': leader})),
+            }
+        self.assertEqual((urls, build.call_count), ({'u'}, 1))
+
+    def test_key_includes_version_and_width(self):
+        old = image_url('image/upload/v1/lfc_teens/hero/a.jpg', 640)
+        new = image_url('image/upload/v2/lfc_teens/hero/a.jpg', 640)
+        self.assertIn('/v1/', old)
+        self.assertIn('/v2/', new)
+        self.assertIn('w_1280', image_url('image/upload/v2/lfc_teens/hero/a.jpg', 1280))
+
+    @override_settings(IMAGE_URL_CACHE_SIZE=2)
+    def test_least_recently_used_is_evicted(self):
+        for name in ('a', 'b', 'a', 'c'):
+            image_url(f'lfc_teens/hero/{name}', 640)
+        self.assertEqual(len(url_cache), 2)
+        with patch.object(CloudinaryResource, 'build_url', autospec=True, return_value='u') as build:
+            image_url('lfc_teens/hero/a', 640)
+            image_url('lfc_teens/hero/b', 640)
+        self.assertEqual(build.call_count, 1)
+
+    def test_saving_image_drops_its_urls(self):
+        slide = HeroSlide.objects.create(title='Welcome', subtitle='Hi', image='lfc_teens/hero/welcome')
+        slide.image_url(640)
+        image_url('lfc_teens/hero/other', 640)
+        slide.save()
+        self.assertEqual(len(url_cache), 1)
+
+    def test_replacing_image_drops_the_old_urls(self):
+        slide = HeroSlide.objects.create(title='Welcome', subtitle='Hi', image='lfc_teens/hero/welcome')
+        slide.image_url(640)
+        slide.image = 'lfc_teens/hero/easter'
+        slide.save()
+        self.assertEqual(len(url_cache), 0)
+        slide.image_url(640)
+        slide.delete()
+        self.assertEqual(len(url_cache), 0)
+
+
+@override_settings(IMAGE_BACKEND='cloudinary', CLOUDINARY_FAKE=True, IMAGE_URL_CACHE_SIZE=0)
+class FakeCloudinaryTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        overrides = override_settings(CLOUDINARY_FAKE_ROOT=str(self.root))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cloud = fake_cloud()
+        cloud.__enter__()
+        self.addCleanup(cloud.__exit__, None, None, None)
+
+    def jpeg(self, size=(1200, 800)):
+        out = BytesIO()
+        Image.new('RGB', size, 'teal').save(out, 'JPEG')
+        return out.getvalue()
+
+    def test_sdk_upload_is_stored_on_disk(self):
+        result = cloudinary.uploader.upload(self.jpeg(), folder='lfc_teens/hero')
+        self.assertRegex(result['public_id'], r'^lfc_teens/hero/[a-z0-9]{20}$')
+        self.assertGreater(result['version'], 1_600_000_000)
+        self.assertEqual((result['width'], result['height'], result['format']), (1200, 800, 'jpg'))
+        self.assertTrue((self.root / 'image' / 'upload' / f"{result['public_id']}.jpg").is_file())
+        self.assertEqual(cloudinary.uploader.destroy(result['public_id'])['result'], 'ok')
+        self.assertFalse(any((self.root / 'image' / 'upload').rglob('*.jpg')))
+
+    def test_cloudinary_field_uploads_through_fake(self):
+        belief = Belief.objects.create(
+            name='Grace', detail='By grace', image=SimpleUploadedFile('grace.jpg', self.jpeg()),
+        )
+        belief.refresh_from_db()
+        self.assertTrue(belief.image.public_id.startswith('lfc_teens/beliefs/'))
+        self.assertTrue(belief.image.version)
+
+    def test_serves_transformed_variants(self):
+        result = cloudinary.uploader.upload(self.jpeg(), folder='lfc_teens/bible')
+        url = image_url(CloudinaryResource(result['public_id'], format='jpg', version=str(result['version'])), 480)
+        self.assertTrue(url.startswith('/fake-cloudinary/image/upload/'))
+        self.assertIn('w_480', url)
+
+        webp = self.client.get(url, HTTP_ACCEPT='image/webp')
+        self.assertEqual(webp['Content-Type'], 'image/webp')
+        with Image.open(BytesIO(b''.join(webp.streaming_content))) as image:
+            self.assertEqual((image.format, image.width), ('WEBP', 480))
+        jpeg = self.client.get(url)
+        self.assertEqual(jpeg['Content-Type'], 'image/jpeg')
+        self.assertEqual(self.client.get(url.replace(result['public_id'], 'lfc_teens/bible/missing')).status_code, 404)
+
+    def test_rejects_bad_signature(self):
+        with self.assertRaisesMessage(cloudinary.exceptions.Error, 'Invalid Signature'):
+            cloudinary.uploader.upload(self.jpeg(), api_secret='wrong')
+
+    def test_browser_upload_endpoint(self):
+        # What the admin's direct uploads post to while the fake is active
+        url = upload_url()
+        self.assertEqual(url, '/fake-cloudinary/v1_1/fake/image/upload')
+        params = upload_params({'folder': 'lfc_teens/units'})
+        result = self.client.post(url, {**params, 'file': SimpleUploadedFile('u.jpg', self.jpeg())}).json()
+        value = f"image/upload/v{result['version']}/{result['public_id']}.jpg#{result['signature']}"
+        self.assertEqual(DirectUploadField().clean(value).public_id, result['public_id'])
+
+    def test_paths_stay_inside_the_fake_cloud(self):
+        secret = self.root / 'secret.txt'
+        secret.write_text('SECRET_KEY')
+        with override_settings(CLOUDINARY_FAKE_ROOT=str(self.root / 'cloud' / 'root')):
+            for url in ('/fake-cloudinary/%2E%2E/%2E%2E/secret', '/fake-cloudinary/image/upload/../../../../secret',
+                        '/fake-cloudinary/image/upload/%2E%2E/%2E%2E/%2E%2E/%2E%2E/secret'):
+                self.assertEqual(self.client.get(url).status_code, 404, url)
+            for params in ({'public_id': '../../../../secret'}, {'folder': '../../../..'}, {'type': '../..'}):
+                with self.assertRaises(cloudinary.exceptions.Error):
+                    cloudinary.uploader.upload(self.jpeg((10, 10)), **params)
+            self.assertEqual(cloudinary.uploader.destroy('../../../../secret')['result'], 'not found')
+            with self.assertRaises(cloudinary.exceptions.Error):
+                cloudinary.uploader.upload(self.jpeg((10, 10)), resource_type='..')
+        self.assertEqual(secret.read_text(), 'SECRET_KEY')
+
+    @override_settings(CLOUDINARY_FAKE_UPLOAD_LATENCY=0.2, CLOUDINARY_FAKE_URL_LATENCY=0.01)
+    def test_latency_knobs(self):
+        start = time.perf_counter()
+        result = cloudinary.uploader.upload(self.jpeg((10, 10)))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+        start = time.perf_counter()
+        for _ in range(5):
+            image_url(result['public_id'], 640)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+
+class StartupProfileTests(TestCase):
+    def test_parses_importtime_output(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     _io\n'
+            'import time:      2210 |       5330 |   django.conf\n'
+            'not an import line\n'
+        )
+        self.assertEqual(parse_importtime(stderr), [('_io', 120, 120, 2), ('django.conf', 2210, 5330, 1)])
+
+    def test_settings_import_neither_cloudinary_nor_pillow(self):
+        # What the settings module pulls in on its own, in a fresh interpreter
+        script = 'import sys; import project.settings; print(sorted({m.split(".")[0] for m in sys.modules}))'
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        loaded = result.stdout.strip().splitlines()[-1]
+        self.assertNotIn("'cloudinary'", loaded)
+        self.assertNotIn("'PIL'", loaded)
@@ -0,0 +1,180 @@
+# app/uploads.py
+"""
+Background upload of photos sent with the testimony form.
+
+submit_testimony stores the pending Testimony, spools the photo to
+UPLOAD_SPOOL_DIR as <testimony id>-<token>.<ext> and hands it to a small
+per-process thread pool once the row is committed, so the visitor never
+waits on Cloudinary. The worker uploads the file to the image field's
+storage, records the result with an UPDATE (leaving any admin edits made in
+the meantime alone) and deletes the spooled copy. A photo left behind by a
+failed upload or a restarted worker is retried by `manage.py upload_photos`.
+
+A photo is written as <name>.part and renamed into place once complete,
+and whoever uploads it first renames it to <name>.claimed, so neither a
+half-written file nor one another worker already has is ever uploaded.
+A failed upload renames its claim back; a claim or part file older than
+UPLOAD_CLAIM_TIMEOUT was left by a dead worker and is recovered.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cloudinary.uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from . import snapshot
+from .models import Testimony
+from .page_cache import bump_content_version
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+PART_SUFFIX = '.part'
+CLAIMED_SUFFIX = '.claimed'
+
+
+def spool_dir():
+    return Path(settings.UPLOAD_SPOOL_DIR)
+
+
+def spool_photo(testimony_id, photo):
+    """Keep an uploaded file on local disk until the worker has sent it on."""
+    ext = os.path.splitext(photo.name)[1].lower()
+    path = spool_dir() / f'{int(testimony_id)}-{uuid.uuid4().hex}{ext}'
+    part = path.with_name(path.name + PART_SUFFIX)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if hasattr(photo, 'temporary_file_path'):
+        # Large uploads are already on disk; move rather than copy them
+        shutil.move(photo.temporary_file_path(), part)
+    else:
+        with open(part, 'wb') as out:
+            for chunk in photo.chunks():
+                out.write(chunk)
+    os.replace(part, path)
+    return path
+
+
+def store_image(instance, field_name, path, name):
+    """Upload the file at `path` as `name` for instance.<field_name>; returns the value for its column."""
+    field = instance._meta.get_field(field_name)
+    options = {key: value(instance) if callable(value) else value for key, value in field.options.items()}
+    with open(path, 'rb') as fh:
+        if settings.IMAGE_BACKEND == 'local':
+            # Self-hosted images live in MEDIA_ROOT, where app/derivatives.py reads them
+            return FileSystemStorage().save(f"{options.get('folder', field_name)}/{name}", fh)
+        resource = cloudinary.uploader.upload_resource(
+            fh, type=field.type, resource_type=field.resource_type, **options,
+        )
+        return resource.get_prep_value()
+
+
+def claim_photo(path):
+    """Rename a spooled photo to <name>.claimed; None if another worker got there first."""
+    claimed = path.with_name(path.name + CLAIMED_SUFFIX)
+    try:
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return None
+    # Dates the claim for release_stale_claims()
+    os.utime(claimed)
+    return claimed
+
+
+def upload_photo(path):
+    """Upload one spooled photo. Returns False when its testimony is gone or it was already claimed."""
+    claimed = claim_photo(path)
+    if claimed is None:
+        return False
+    testimony_id, _, name = path.name.partition('-')
+    try:
+        testimony = Testimony.objects.filter(pk=int(testimony_id)).first()
+        if testimony is None:
+            claimed.unlink()
+            return False
+        image = store_image(testimony, 'image', claimed, name)
+    except Exception:
+        # Back in the spool for upload_photos to retry
+        os.replace(claimed, path)
+        raise
+    # update() skips post_save, so set updated_at for the validators and
+    # refresh the cached page and snapshot by hand
+    Testimony.objects.filter(pk=testimony_id).update(image=image, updated_at=timezone.now())
+    if Testimony.objects.filter(pk=testimony_id, is_approved=True).exists():
+        # Approved before the photo arrived, so it is already on the home page
+        bump_content_version()
+        snapshot.content_changed(Testimony)
+    claimed.unlink()
+    return True
+
+
+def release_stale_claims(now=None):
+    """
+    Put photos claimed by a worker that died mid-upload back in the spool
+    and delete part files it never finished. Returns the photos released.
+    """
+    cutoff = (time.time() if now is None else now) - settings.UPLOAD_CLAIM_TIMEOUT
+    released = 0
+    for path in spool_dir().glob('*-*'):
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+            if path.name.endswith(CLAIMED_SUFFIX):
+                os.replace(path, path.with_name(path.name.removesuffix(CLAIMED_SUFFIX)))
+                released += 1
+            elif path.name.endswith(PART_SUFFIX):
+                path.unlink()
+        except FileNotFoundError:
+            # Finished or released by someone else meanwhile
+            continue
+    return released
+
+
+def pending_photos():
+    """Spooled photos ready to upload, leaving out ones being written or uploaded."""
+    return sorted(
+        path for path in spool_dir().glob('*-*')
+        if not path.name.endswith((PART_SUFFIX, CLAIMED_SUFFIX))
+    )
+
+
+def _upload_in_background(path):
+    try:
+        close_old_connections()
+        upload_photo(path)
+    except Exception:
+        logger.exception('Uploading %s failed; upload_photos will retry', path.name)
+    finally:
+        # Uploads are rare, so the pool threads do not keep idle connections
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.UPLOAD_WORKERS, thread_name_prefix='photo-upload',
+                )
+    return _executor
+
+
+def enqueue_photo(path):
+    """
+    Upload `path` on this process's thread pool. With UPLOAD_WORKERS = 0
+    nothing is started and uploads are left to the upload_photos command.
+    """
+    if settings.UPLOAD_WORKERS <= 0:
+        return None
+    return get_executor().submit(_upload_in_background, path)
@@ -4,5 +4,14 @@ from . import views
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('sections/<slug:name>/', views.section_fragment, name='section_page'),
     path('add-like/', views.add_like, name='add_like'),
+    path('testimonies/', views.submit_testimony, name='submit_testimony'),
+    path('uploads/local/', views.local_upload, name='local_upload'),
+    path('fake-cloudinary/v1_1/<str:cloud_name>/<str:resource_type>/<str:action>',
+         views.fake_cloudinary_api, name='fake_cloudinary_api'),
+    path('fake-cloudinary/<str:resource_type>/<str:upload_type>/<path:path>',
+         views.fake_cloudinary_asset, name='fake_cloudinary_asset'),
+    path('audio/<path:name>', views.audio, name='audio'),
+    path('img/<int:width>/<path:name>', views.image_derivative, name='image_derivative'),
 ]
\ No newline at end of file
@@ -1,80 +1,243 @@
 # lfc_teens/views.py
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
-from django.core.exceptions import ObjectDoesNotExist
-from django.views.decorators.http import require_POST
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST, require_safe
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
 import hashlib
+import mimetypes
+import os
+import time
 import uuid
+from pathlib import Path
 from .models import *
+from cloudinary import CloudinaryResource
+from .derivatives import allowed_widths, get_derivative
+from .direct_upload import resource_signature, valid_upload
+from .conditional import content_conditional
+from .forms import TestimonyForm
+from .counters import get_likes, record_like
+from .like_buffer import append_like
+from .like_cookie import read_likes, store_likes
+from .like_filter import has_liked
+from .page_cache import cached_page
+from .preload import remember_hero
+from .ranges import ranged_file_response
+from .ratelimit import rate_limit
+from .sections import SECTIONS, InvalidCursor, issued_cursor, section_page
+from .snapshot import live_context, snapshot_context
+from .streaming import streamed_page
+from .uploads import enqueue_photo, spool_photo
 
+def home_context():
+    if settings.HOME_SNAPSHOT_ENABLED:
+        # The page cache fills in like counts itself
+        context = snapshot_context(live_like_counts=not settings.PAGE_CACHE_ENABLED)
+    else:
+        context = live_context()
+    remember_hero(context['hero'])
+    return context
+
+@content_conditional
+@cache_control(private=True, no_cache=True)
 def home(request):
+    if settings.HOME_STREAMING:
+        return streamed_page(request, 'home', 'index.html', home_context)
+    if settings.PAGE_CACHE_ENABLED:
+        return cached_page(request, 'home', 'index.html', home_context)
+    return render(request, 'index.html', home_context())
+
+@require_GET
+@content_conditional
+@cache_control(private=True, no_cache=True)
+def section_fragment(request, name):
+    # Next page of a home-page section, requested by the htmx scroll sentinel
+    if name not in SECTIONS:
+        raise Http404('Unknown section')
+    after = request.GET.get('after', '')
+    get_context = lambda: {'page': section_page(name, after)}
     try:
-        contact_info = ContactInfo.objects.first()
-    except ObjectDoesNotExist:
-        contact_info = None
-
-    context = {
-        'hero': HeroSlide.objects.filter(is_active=True),
-        'leaders': Leader.objects.filter(is_active=True),
-        'bible_post': BiblePost.objects.filter(is_active=True),
-        'announcement': Announcement.objects.filter(is_active=True),
-        'testimony': Testimony.objects.filter(is_approved=True),
-        'unit': MinistryUnit.objects.filter(is_active=True),
-        'belief': Belief.objects.filter(is_active=True),
-        'counselors': Leader.objects.filter(is_active=True, is_counselor=True),
-        'contact_info': contact_info,
-    }
-    return render(request, 'index.html', context)
+        # Only cursors the server handed out are cached, keyed on a digest:
+        # made-up ones would fill the cache and need not be key-safe
+        if settings.PAGE_CACHE_ENABLED and (not after or issued_cursor(after)):
+            key = f"section:{name}:{hashlib.sha256(after.encode()).hexdigest()[:32]}"
+            return cached_page(request, key, 'partials/section_page.html', get_context)
+        return render(request, 'partials/section_page.html', get_context())
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+
+def viewer_hash(request, viewer_id):
+    # Combine IP address + user agent + viewer ID for uniqueness
+    ip_address = request.META.get('REMOTE_ADDR', '')
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    fingerprint_string = f"{ip_address}{user_agent}{viewer_id}"
+    return hashlib.md5(fingerprint_string.encode()).hexdigest()
+
+def like_button(likes):
+    return HttpResponse(f'''
+        <button class="like-btn text-green-600 cursor-default flex items-center space-x-1" disabled>
+            <i class="fas fa-heart"></i>
+            <span>{likes}</span>
+        </button>
+    ''')
+
+def save_like(post_id, reviewer_id):
+    if settings.LIKES_WRITE_BEHIND:
+        # Buffer the like; the next flush writes it and the count catches up
+        append_like(post_id, reviewer_id)
+        return get_likes(post_id) + 1
+    # First time liking - store the review and bump the counter atomically
+    record_like(post_id, reviewer_id)
+    return get_likes(post_id)
 
 @require_POST
+@rate_limit('add_like')
 def add_like(request):
+    if settings.LIKES_SIGNED_COOKIE:
+        return add_like_signed(request)
+
     post_id = request.POST.get('post_id')
-    bible_post = get_object_or_404(BiblePost, id=post_id)
-    
-    # Create a unique viewer ID using browser fingerprinting
-    # Combine IP address + user agent + session ID for uniqueness
-    ip_address = request.META.get('REMOTE_ADDR', '')
-    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    bible_post = get_object_or_404(BiblePost.objects.only('id'), id=post_id)
     
     # Get or create session ID
     if 'viewer_id' not in request.session:
         request.session['viewer_id'] = str(uuid.uuid4())
         request.session.modified = True
     
-    session_id = request.session['viewer_id']
-    
     # Create a unique fingerprint for this viewer
-    fingerprint_string = f"{ip_address}{user_agent}{session_id}"
-    viewer_hash = hashlib.md5(fingerprint_string.encode()).hexdigest()
+    viewer = viewer_hash(request, request.session['viewer_id'])
     
     # Check if this viewer already liked this post
-    existing_like = Review.objects.filter(
-        bible_post=bible_post, 
-        reviewer_id=viewer_hash
-    ).first()
-    
-    if existing_like:
-        # Viewer already liked this post - show current count
-        return HttpResponse(f'''
-            <button class="like-btn text-green-600 cursor-default flex items-center space-x-1" disabled>
-                <i class="fas fa-heart"></i>
-                <span>{bible_post.reviews}</span>
-            </button>
-        ''')
+    if has_liked(bible_post.id, viewer):
+        likes = get_likes(bible_post.id)
     else:
-        # First time liking - add the like
-        Review.objects.create(
-            bible_post=bible_post,
-            reviewer_id=viewer_hash
-        )
-        
-        # Update like count
-        bible_post.reviews += 1
-        bible_post.save()
-        
-        return HttpResponse(f'''
-            <button class="like-btn text-green-600 cursor-default flex items-center space-x-1" disabled>
-                <i class="fas fa-heart"></i>
-                <span>{bible_post.reviews}</span>
-            </button>
-        ''')
\ No newline at end of file
+        likes = save_like(bible_post.id, viewer)
+    return like_button(likes)
+
+def add_like_signed(request):
+    viewer_id, liked = read_likes(request)
+    post_id = request.POST.get('post_id', '')
+    if post_id.isdigit() and int(post_id) in liked:
+        # Repeat click: the cookie settles it, so only the count is read
+        return like_button(get_likes(int(post_id)))
+
+    bible_post = get_object_or_404(BiblePost.objects.only('id'), id=post_id)
+    viewer = viewer_hash(request, viewer_id)
+    # Older likes drop out of the cookie, so check the filter (and Review) too
+    likes = get_likes(bible_post.id) if has_liked(bible_post.id, viewer) else save_like(bible_post.id, viewer)
+    response = like_button(likes)
+    store_likes(response, viewer_id, liked + [bible_post.id])
+    return response
+
+@require_POST
+@rate_limit('submit_testimony')
+def submit_testimony(request):
+    form = TestimonyForm(request.POST, request.FILES)
+    if not form.is_valid():
+        # Swapped back in place with the errors; htmx ignores 4xx bodies
+        return render(request, 'partials/testimony_form.html', {'form': form})
+
+    # Held for review; an admin approves it before it is shown
+    testimony = form.save()
+    photo = form.cleaned_data['photo']
+    if photo:
+        path = spool_photo(testimony.pk, photo)
+        transaction.on_commit(lambda: enqueue_photo(path))
+    return render(request, 'partials/testimony_received.html', {'testimony': testimony})
+
+def upload_error(message, status):
+    # Cloudinary's error shape, which static/direct_upload.js reports
+    return JsonResponse({'error': {'message': message}}, status=status)
+
+@csrf_exempt
+@require_POST
+def local_upload(request):
+    # Stand-in for Cloudinary's upload API when IMAGE_BACKEND = 'local':
+    # the admin's direct uploads land here instead of api.cloudinary.com
+    if settings.IMAGE_BACKEND != 'local':
+        raise Http404('Uploads go to Cloudinary')
+    if not valid_upload(request.POST.dict()):
+        return upload_error('Invalid or expired signature', 401)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return upload_error('Missing required parameter - file', 400)
+    from PIL import Image
+    try:
+        with Image.open(upload) as image:
+            width, height = image.size
+            image.verify()
+    except Exception:
+        return upload_error('Invalid image file', 400)
+
+    upload.seek(0)
+    ext = os.path.splitext(upload.name)[1].lower() or '.jpg'
+    name = FileSystemStorage().save(f"{request.POST.get('folder', 'uploads')}/{uuid.uuid4().hex}{ext}", upload)
+    public_id, ext = os.path.splitext(name)
+    resource = CloudinaryResource(public_id, format=ext[1:], version=str(int(time.time())))
+    return JsonResponse({
+        'public_id': resource.public_id, 'version': int(resource.version), 'format': resource.format,
+        'resource_type': 'image', 'type': 'upload', 'width': width, 'height': height, 'bytes': upload.size,
+        'secure_url': request.build_absolute_uri(settings.MEDIA_URL + name),
+        'signature': resource_signature(resource),
+    })
+
+@csrf_exempt
+@require_POST
+def fake_cloudinary_api(request, cloud_name, resource_type, action):
+    # Upload API of the offline fake cloud (CLOUDINARY_FAKE), for uploads
+    # sent straight from the browser
+    if not settings.CLOUDINARY_FAKE:
+        raise Http404('Fake Cloudinary is off')
+    from . import fake_cloudinary
+    upload = request.FILES.get('file')
+    status, result = fake_cloudinary.handle(
+        action, resource_type, request.POST.dict(), upload and upload.name, upload and upload.read(),
+    )
+    return JsonResponse(result, status=status)
+
+@require_safe
+def fake_cloudinary_asset(request, resource_type, upload_type, path):
+    # Delivery URLs of the offline fake cloud, transformed like Cloudinary's
+    if not settings.CLOUDINARY_FAKE:
+        raise Http404('Fake Cloudinary is off')
+    # Only imported when the fake cloud is in use, to keep worker boot lean
+    from . import fake_cloudinary
+    accepts_webp = 'image/webp' in request.headers.get('Accept', '')
+    found = fake_cloudinary.variant(resource_type, upload_type, path, accepts_webp)
+    if found is None:
+        raise Http404('Asset not found')
+    file, ext = found
+    response = FileResponse(open(file, 'rb'), content_type=mimetypes.guess_type(f'asset.{ext}')[0])
+    response['Cache-Control'] = 'public, max-age=86400'
+    response['Vary'] = 'Accept'
+    return response
+
+@require_GET
+def image_derivative(request, width, name):
+    # Self-hosted counterpart of Cloudinary's w_<width>,c_limit,f_auto
+    if width not in allowed_widths():
+        raise Http404('Unsupported width')
+    ext = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpg'
+    path = get_derivative(name, width, ext)
+    if path is None:
+        raise Http404('Image not found')
+
+    response = FileResponse(open(path, 'rb'), content_type=f'image/{"webp" if ext == "webp" else "jpeg"}')
+    response['Cache-Control'] = 'public, max-age=86400'
+    response['Vary'] = 'Accept'
+    # Distinct per representation: the WebP and JPEG bodies share a URL
+    response['ETag'] = f'"{path.name}"'
+    return response
+
+@require_safe
+def audio(request, name):
+    # Background audio with Range support; the player only fetches it once
+    # the visitor presses play
+    root = Path(settings.AUDIO_ROOT).resolve()
+    path = (root / name).resolve()
+    if root not in path.parents or not path.is_file():
+        raise Http404('Audio not found')
+    return ranged_file_response(request, path)
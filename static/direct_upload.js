@@ -0,0 +1,40 @@
+// Admin image fields: send the chosen file straight to storage with the
+// signed parameters the server rendered, then record the upload's public ID
+// (see app/direct_upload.py). The file itself is never posted to Django.
+document.addEventListener('change', function (event) {
+    const picker = event.target;
+    if (!picker.matches('input[data-direct-upload]') || !picker.files.length) {
+        return;
+    }
+    const widget = picker.closest('.direct-upload');
+    const hidden = widget.querySelector('input[type=hidden]');
+    const status = widget.querySelector('.direct-upload-status');
+    const preview = widget.querySelector('.direct-upload-preview');
+    const submits = picker.form.querySelectorAll('[type=submit]');
+
+    const body = new FormData();
+    Object.entries(JSON.parse(picker.dataset.params)).forEach(([key, value]) => body.append(key, value));
+    body.append('file', picker.files[0]);
+
+    status.textContent = 'Uploading…';
+    submits.forEach((button) => { button.disabled = true; });
+    fetch(picker.dataset.url, { method: 'POST', body: body })
+        .then((response) => response.json())
+        .then((result) => {
+            if (result.error) {
+                throw new Error(result.error.message);
+            }
+            hidden.value = `${result.resource_type}/${result.type}/v${result.version}/`
+                + `${result.public_id}.${result.format}#${result.signature}`;
+            preview.src = result.secure_url;
+            preview.hidden = false;
+            status.textContent = 'Uploaded';
+        })
+        .catch((error) => {
+            picker.value = '';
+            status.textContent = `Upload failed: ${error.message}`;
+        })
+        .finally(() => {
+            submits.forEach((button) => { button.disabled = false; });
+        });
+});